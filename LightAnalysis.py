@@ -0,0 +1,979 @@
+import bpy
+import os
+import numpy as np
+from bpy.types import Operator
+from bpy.props import EnumProperty, FloatProperty, IntProperty
+from bpy.app.handlers import persistent
+from mathutils import Vector
+
+from . import LightEditor
+from .LightEditor import (
+    apply_light_visibility,
+    draw_main_row,
+    draw_extra_params,
+    light_contribution_cache,
+    get_light_contributions,
+    find_emissive_objects,
+    emission_gate,
+    emission_strength_socket,
+)
+
+# -------------------------------------------------------------------------
+# Light arrays
+# -------------------------------------------------------------------------
+LIGHT_TYPE_CODES = {'POINT': 0, 'SUN': 1, 'SPOT': 2, 'AREA': 3}
+
+def gather_light_arrays(objs):
+    """Pack the parameters the analyses need into NumPy arrays.
+
+    Energy and color come from one foreach_get each over bpy.data.lights;
+    everything that only exists on some light subtypes (spot cone, custom
+    distance) is read per object, since foreach_get can't address subtype
+    properties on a mixed collection.
+    """
+    n = len(objs)
+    data = bpy.data.lights
+    energy_column = np.empty(len(data), dtype=np.float32)
+    data.foreach_get("energy", energy_column)
+    if "exposure" in bpy.types.Light.bl_rna.properties:
+        exposure_column = np.empty(len(data), dtype=np.float32)
+        data.foreach_get("exposure", exposure_column)
+        energy_column *= np.exp2(exposure_column)
+    color_column = np.empty(len(data) * 3, dtype=np.float32)
+    data.foreach_get("color", color_column)
+    color_column = color_column.reshape(-1, 3)
+    data_index = {light.as_pointer(): i for i, light in enumerate(data)}
+
+    rows = np.empty(n, dtype=np.int64)
+    types = np.empty(n, dtype=np.int8)
+    spot_size = np.full(n, np.pi, dtype=np.float32)
+    spot_blend = np.zeros(n, dtype=np.float32)
+    cutoff = np.full(n, np.inf, dtype=np.float32)
+    matrices = np.empty((n, 4, 4), dtype=np.float32)
+    for i, obj in enumerate(objs):
+        light = obj.data
+        rows[i] = data_index[light.as_pointer()]
+        types[i] = LIGHT_TYPE_CODES.get(light.type, 0)
+        if light.type == 'SPOT':
+            spot_size[i] = light.spot_size
+            spot_blend[i] = light.spot_blend
+        if getattr(light, "use_custom_distance", False):
+            cutoff[i] = light.cutoff_distance
+        matrices[i] = obj.matrix_world
+
+    return {
+        "positions": matrices[:, :3, 3],
+        # Lights shine down their local -Z axis.
+        "directions": -matrices[:, :3, 2] / np.maximum(np.linalg.norm(matrices[:, :3, 2], axis=1), 1e-12)[:, None],
+        "types": types,
+        "energy": energy_column[rows] if n else np.empty(0, dtype=np.float32),
+        "color": color_column[rows] if n else np.empty((0, 3), dtype=np.float32),
+        "spot_size": spot_size,
+        "spot_blend": spot_blend,
+        "cutoff": cutoff,
+    }
+
+def influence_spheres(arrays, threshold):
+    """Bounding spheres of each light's region of influence.
+
+    The range is where the light's peak intensity (power / 4pi for point and
+    spot lights, power / pi for one-sided area lights) falls to ``threshold``
+    W/m², capped by a custom cutoff distance. Spot lights are bounded by
+    their cone instead of the full sphere. Sun lights get an infinite radius.
+    """
+    types = arrays["types"]
+    intensity = np.where(types == LIGHT_TYPE_CODES['AREA'], arrays["energy"] / np.pi, arrays["energy"] / (4.0 * np.pi))
+    reach = np.sqrt(np.maximum(intensity, 0.0) / threshold)
+    reach = np.minimum(reach, arrays["cutoff"])
+
+    centers = arrays["positions"].copy()
+    radii = reach.astype(np.float32)
+
+    # Tightest sphere around a cone of slant length r and half-angle t:
+    # narrow cones (t <= 45deg) pass through apex and rim, wide ones are
+    # centered on the cap.
+    half = np.minimum(arrays["spot_size"] * 0.5, np.pi * 0.5)
+    spot = types == LIGHT_TYPE_CODES['SPOT']
+    narrow = spot & (half <= np.pi * 0.25)
+    wide = spot & ~narrow
+    narrow_r = reach / (2.0 * np.cos(half))
+    centers[narrow] += arrays["directions"][narrow] * narrow_r[narrow, None]
+    radii[narrow] = narrow_r[narrow]
+    centers[wide] += arrays["directions"][wide] * (reach * np.cos(half))[wide, None]
+    radii[wide] = (reach * np.sin(half))[wide]
+
+    radii[types == LIGHT_TYPE_CODES['SUN']] = np.inf
+    return centers, radii
+
+# -------------------------------------------------------------------------
+# Camera frustum
+# -------------------------------------------------------------------------
+def camera_frustum_corners(scene, camera):
+    """World-space near and far corners of a camera's view frustum.
+
+    Returns None for panoramic cameras, which have no planar frustum.
+    """
+    cam = camera.data
+    if cam.type == 'PANO':
+        return None
+    frame = [Vector(v) for v in cam.view_frame(scene=scene)]
+    near, far = cam.clip_start, cam.clip_end
+    if cam.type == 'ORTHO':
+        near_c = [Vector((v.x, v.y, -near)) for v in frame]
+        far_c = [Vector((v.x, v.y, -far)) for v in frame]
+    else:
+        near_c = [v * (near / -v.z) for v in frame]
+        far_c = [v * (far / -v.z) for v in frame]
+    mw = camera.matrix_world
+    return (np.array([mw @ v for v in near_c], dtype=np.float64),
+            np.array([mw @ v for v in far_c], dtype=np.float64))
+
+def frustum_planes(near_c, far_c):
+    """Six planes (normals, offsets) bounding a frustum, normals pointing inwards."""
+    a = np.array([near_c[0], near_c[1], near_c[2], near_c[3], near_c[0], far_c[0]])
+    b = np.array([near_c[1], near_c[2], near_c[3], near_c[0], near_c[1], far_c[1]])
+    c = np.array([far_c[0], far_c[1], far_c[2], far_c[3], near_c[2], far_c[2]])
+    normals = np.cross(b - a, c - a)
+    normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-12)[:, None]
+    offsets = -np.einsum('ij,ij->i', normals, a)
+    # Corner order differs between camera types; orient on the centroid.
+    centroid = np.vstack((near_c, far_c)).mean(axis=0)
+    flip = normals @ centroid + offsets < 0.0
+    normals[flip] *= -1.0
+    offsets[flip] *= -1.0
+    return normals, offsets
+
+def spheres_outside_frustum(centers, radii, normals, offsets):
+    """True for every sphere entirely behind at least one frustum plane."""
+    distances = centers @ normals.T + offsets
+    return np.any(distances < -radii[:, None], axis=1)
+
+def find_out_of_view_lights(context, camera=None):
+    """Lights whose whole influence sphere lies outside the camera frustum."""
+    scene = context.scene
+    camera = camera or scene.camera
+    if not camera:
+        return None
+    corners = camera_frustum_corners(scene, camera)
+    if corners is None:
+        return None
+    objs = [obj for obj in context.view_layer.objects if obj.type == 'LIGHT' and obj.data.type != 'SUN']
+    if not objs:
+        return []
+    centers, radii = influence_spheres(gather_light_arrays(objs), scene.light_editor_influence_threshold)
+    normals, offsets = frustum_planes(*corners)
+    outside = spheres_outside_frustum(centers, radii, normals, offsets)
+    return [objs[i] for i in np.flatnonzero(outside)]
+
+# -------------------------------------------------------------------------
+# Contribution estimate
+# -------------------------------------------------------------------------
+# Rec. 709 luminance weights, to rank colored lights by perceived brightness.
+LUMINANCE = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+# Distances are clamped to 10 cm so a vertex sitting on a light can't dominate.
+MIN_DISTANCE_SQ = 0.01
+
+def sample_scene_points(context, max_samples, camera=None):
+    """World-space points and normals subsampled from visible mesh vertices.
+
+    Vertex coordinates and normals are read with foreach_get and strided so
+    the total stays near ``max_samples``. With a camera, only points inside
+    its frustum are kept. Modifiers are ignored (original mesh data).
+    """
+    objs = [obj for obj in context.view_layer.objects
+            if obj.type == 'MESH' and not obj.hide_render and obj.visible_get()]
+    counts = [len(obj.data.vertices) for obj in objs]
+    total = sum(counts)
+    if not total:
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.float32)
+    step = max(1, int(np.ceil(total / max_samples)))
+
+    points, normals = [], []
+    for obj, count in zip(objs, counts):
+        if not count:
+            continue
+        vertices = obj.data.vertices
+        co = np.empty(count * 3, dtype=np.float32)
+        no = np.empty(count * 3, dtype=np.float32)
+        vertices.foreach_get("co", co)
+        vertices.foreach_get("normal", no)
+        co = co.reshape(-1, 3)[::step]
+        no = no.reshape(-1, 3)[::step]
+        mw = np.array(obj.matrix_world, dtype=np.float32)
+        nm = np.array(obj.matrix_world.to_3x3().inverted_safe().transposed(), dtype=np.float32)
+        points.append(co @ mw[:3, :3].T + mw[:3, 3])
+        no = no @ nm.T
+        normals.append(no / np.maximum(np.linalg.norm(no, axis=1), 1e-12)[:, None])
+    points = np.concatenate(points)
+    normals = np.concatenate(normals)
+
+    if camera is not None:
+        corners = camera_frustum_corners(context.scene, camera)
+        if corners is not None:
+            plane_normals, offsets = frustum_planes(*corners)
+            inside = np.all(points @ plane_normals.T + offsets >= 0.0, axis=1)
+            points, normals = points[inside], normals[inside]
+    return points, normals
+
+def estimate_irradiance(arrays, points, normals, chunk_elements=2_000_000):
+    """Mean unoccluded irradiance each light delivers to the sample points.
+
+    Lights x points are evaluated with broadcasting, a chunk of lights at a
+    time to bound memory: inverse-square falloff with the receiver's cosine,
+    a smoothstep spot cone, the emitter cosine for area lights and plain
+    irradiance for suns. Weighted by color luminance. No shadows.
+    """
+    n = len(arrays["types"])
+    scores = np.zeros(n, dtype=np.float64)
+    if not n or not len(points):
+        return scores
+    luminance = arrays["color"] @ LUMINANCE
+    chunk = max(1, chunk_elements // len(points))
+    for start in range(0, n, chunk):
+        sl = slice(start, start + chunk)
+        types = arrays["types"][sl]
+        energy = arrays["energy"][sl]
+        dirs = arrays["directions"][sl]
+
+        d = points[None, :, :] - arrays["positions"][sl, None, :]
+        dist_sq = np.einsum('cpk,cpk->cp', d, d)
+        dist = np.sqrt(dist_sq)
+        d /= np.maximum(dist, 1e-6)[..., None]
+        cos_receiver = np.clip(-np.einsum('cpk,pk->cp', d, normals), 0.0, None)
+        cos_axis = np.einsum('cpk,ck->cp', d, dirs)
+
+        area = types == LIGHT_TYPE_CODES['AREA']
+        intensity = np.where(area, energy / np.pi, energy / (4.0 * np.pi))[:, None] * np.ones_like(cos_axis)
+        intensity[area] *= np.clip(cos_axis[area], 0.0, None)
+
+        spot = types == LIGHT_TYPE_CODES['SPOT']
+        if spot.any():
+            cos_half = np.cos(arrays["spot_size"][sl][spot] * 0.5)
+            width = np.maximum(arrays["spot_blend"][sl][spot] * (1.0 - cos_half), 1e-6)
+            t = np.clip((cos_axis[spot] - cos_half[:, None]) / width[:, None], 0.0, 1.0)
+            intensity[spot] *= t * t * (3.0 - 2.0 * t)
+
+        irradiance = intensity * cos_receiver / np.maximum(dist_sq, MIN_DISTANCE_SQ)
+        irradiance[dist > arrays["cutoff"][sl, None]] = 0.0
+
+        sun = types == LIGHT_TYPE_CODES['SUN']
+        if sun.any():
+            sun_cos = np.clip(-(normals @ dirs[sun].T).T, 0.0, None)
+            irradiance[sun] = energy[sun, None] * sun_cos
+
+        scores[sl] = irradiance.mean(axis=1) * luminance[sl]
+    return scores
+
+def estimate_light_contributions(context):
+    """Rank every light in the view layer by estimated irradiance on the shot.
+
+    Returns [(obj, share)] sorted by descending share of the total.
+    """
+    scene = context.scene
+    objs = [obj for obj in context.view_layer.objects if obj.type == 'LIGHT']
+    if not objs:
+        return []
+    points, normals = sample_scene_points(context, scene.light_editor_contribution_samples, scene.camera)
+    scores = estimate_irradiance(gather_light_arrays(objs), points, normals)
+    total = scores.sum()
+    shares = scores / total if total > 0 else scores
+    order = np.argsort(-shares, kind='stable')
+    return [(objs[i], float(shares[i])) for i in order]
+
+# -------------------------------------------------------------------------
+# Emission sampling cost
+# -------------------------------------------------------------------------
+# Cycles puts every triangle of a material with emission sampling enabled
+# into the light tree, so cost scales with triangle count, not object count.
+EMISSION_SAMPLING_ITEMS = [
+    ('NONE', "None", "Do not use this material's emission for direct light sampling"),
+    ('AUTO', "Auto", "Let Cycles choose front, back or both faces"),
+    ('FRONT', "Front", "Sample front faces only"),
+    ('BACK', "Back", "Sample back faces only"),
+    ('FRONT_BACK', "Front and Back", "Sample both faces"),
+]
+
+def get_emission_sampling(mat):
+    """The material's Cycles emission sampling method, or None if unavailable."""
+    cycles = getattr(mat, "cycles", None)
+    return getattr(cycles, "emission_sampling", None)
+
+def emission_strength(node):
+    """Unlinked strength x color luminance (x gate factor) of an emission or Principled node.
+
+    A linked strength or color is unknown here and counts as 1.0.
+    """
+    strength = emission_strength_socket(node)
+    if node.type == 'EMISSION':
+        color = node.inputs.get("Color")
+    else:
+        color = node.inputs.get("Emission Color") or node.inputs.get("Emission")
+    value = float(strength.default_value) if strength and not strength.is_linked else 1.0
+    gate = emission_gate(node)
+    if gate:
+        value *= float(gate.inputs[1].default_value)
+    if color and not color.is_linked:
+        value *= float(np.dot(np.array(color.default_value[:3], dtype=np.float32), LUMINANCE))
+    return value
+
+def _mesh_slot_totals(mesh, slot_count):
+    """Triangle count and area per material slot of a mesh, via foreach_get.
+
+    A polygon with n corners is split into n - 2 triangles.
+    """
+    polygons = mesh.polygons
+    n = len(polygons)
+    if not n or not slot_count:
+        return np.zeros(slot_count, dtype=np.int64), np.zeros(slot_count, dtype=np.float64)
+    material_index = np.empty(n, dtype=np.int32)
+    loop_totals = np.empty(n, dtype=np.int32)
+    areas = np.empty(n, dtype=np.float32)
+    polygons.foreach_get("material_index", material_index)
+    polygons.foreach_get("loop_total", loop_totals)
+    polygons.foreach_get("area", areas)
+    np.clip(material_index, 0, slot_count - 1, out=material_index)
+    tris = np.bincount(material_index, weights=loop_totals - 2, minlength=slot_count)
+    area = np.bincount(material_index, weights=areas, minlength=slot_count)
+    return tris.astype(np.int64), area
+
+def analyze_emission_cost(context):
+    """Per emissive material: triangles, area and emitted power in the view layer.
+
+    Power is estimated as world-space area x strength, with object scale
+    applied as the 2/3 power of the matrix determinant. Meshes shared by
+    several objects are read once. Returns rows sorted by triangle count.
+    """
+    strengths = {}
+    for obj, mat, node in find_emissive_objects(context):
+        strengths[mat.name] = max(strengths.get(mat.name, 0.0), emission_strength(node))
+    if not strengths:
+        return []
+
+    rows = {name: {"material": name, "triangles": 0, "area": 0.0, "objects": 0} for name in strengths}
+    mesh_totals = {}
+    for obj in context.view_layer.objects:
+        if obj.type != 'MESH':
+            continue
+        slots = [slot.material.name if slot.material else None for slot in obj.material_slots]
+        if not any(name in rows for name in slots):
+            continue
+        key = obj.data.as_pointer()
+        if key not in mesh_totals:
+            mesh_totals[key] = _mesh_slot_totals(obj.data, len(slots))
+        tris, area = mesh_totals[key]
+        scale = abs(np.linalg.det(np.array(obj.matrix_world.to_3x3()))) ** (2.0 / 3.0)
+        for i, name in enumerate(slots):
+            row = rows.get(name)
+            if row is None or i >= len(tris) or not tris[i]:
+                continue
+            row["triangles"] += int(tris[i])
+            row["area"] += float(area[i]) * scale
+            row["objects"] += 1
+
+    result = []
+    total_power = 0.0
+    for name, row in rows.items():
+        row["power"] = row["area"] * strengths[name]
+        total_power += row["power"]
+        result.append(row)
+    for row in result:
+        row["share"] = row["power"] / total_power if total_power > 0 else 0.0
+    result.sort(key=lambda r: (-r["triangles"], r["material"].lower()))
+    return result
+
+# Results per scene name: [row, ...] as returned by analyze_emission_cost.
+_emission_cost_cache = {}
+
+# -------------------------------------------------------------------------
+# Environment (HDRI) analysis
+# -------------------------------------------------------------------------
+# Longest side an HDRI is block-averaged down to before analysis.
+ENV_ANALYSIS_WIDTH = 256
+# Pixels brighter than this fraction of the peak count towards the sun.
+SUN_THRESHOLD = 0.5
+
+# Reused across analyses so a large HDRI doesn't allocate a new buffer each time.
+_pixel_buffer = np.empty(0, dtype=np.float32)
+
+def find_environment_texture(world):
+    """The image-backed Environment Texture feeding the world's Surface, if any."""
+    if not world or not world.use_nodes:
+        return None
+    output = next((n for n in world.node_tree.nodes if n.type == 'OUTPUT_WORLD' and n.is_active_output), None)
+    surface = output.inputs.get("Surface") if output else None
+    if not surface or not surface.is_linked:
+        return None
+    stack, visited = [surface.links[0].from_node], set()
+    while stack:
+        node = stack.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+        if node.type == 'TEX_ENVIRONMENT' and node.image:
+            return node
+        for socket in node.inputs:
+            for link in socket.links:
+                stack.append(link.from_node)
+    return None
+
+def environment_image_id(image):
+    """An image's name, absolute path and size; no disk access."""
+    path = bpy.path.abspath(image.filepath, library=image.library) if image.filepath else ""
+    return (image.name, path, tuple(image.size))
+
+def environment_image_key(image):
+    """Cache key for an image: environment_image_id() plus a change stamp.
+
+    Blender doesn't expose an image generation counter, so the file's
+    modification time (or the packed data size) stands in for it, and a
+    dirty image is never considered up to date. Reads the disk, so it is
+    only called when analysing, never from draw().
+    """
+    name, path, size = environment_image_id(image)
+    if image.packed_file:
+        stamp = image.packed_file.size
+    else:
+        try:
+            stamp = os.path.getmtime(path)
+        except OSError:
+            stamp = None
+    if image.is_dirty:
+        stamp = None
+    return (name, path, size, stamp)
+
+def _equirect_directions(height, width):
+    """Unit directions for every pixel centre of an equirectangular map.
+
+    Matches Blender's mapping, u = 0.5 - atan2(y, x) / 2pi: the image centre
+    looks down +X and u grows towards -Y. v runs from the nadir (row 0 is the
+    bottom of the image) to the zenith.
+    """
+    u = (np.arange(width, dtype=np.float32) + 0.5) / width
+    v = (np.arange(height, dtype=np.float32) + 0.5) / height
+    phi = (u - 0.5) * 2.0 * np.pi
+    theta = (v - 0.5) * np.pi
+    cos_t = np.cos(theta)[:, None]
+    return np.stack((
+        cos_t * np.cos(phi)[None, :],
+        -cos_t * np.sin(phi)[None, :],
+        np.broadcast_to(np.sin(theta)[:, None], (height, width)),
+    ), axis=-1), np.cos(theta)
+
+def analyze_environment_image(image):
+    """Average luminance, dominant sun direction/color and sun energy share.
+
+    Pixels are read into a reused float32 buffer with one foreach_get and
+    block-averaged down to ENV_ANALYSIS_WIDTH. Rows are weighted by the
+    cosine of their latitude so the poles don't count more than the horizon.
+    """
+    global _pixel_buffer
+    width, height = image.size
+    channels = image.channels
+    if not width or not height or channels < 3:
+        return None
+    size = width * height * channels
+    if _pixel_buffer.size < size:
+        _pixel_buffer = np.empty(size, dtype=np.float32)
+    pixels = _pixel_buffer[:size]
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, channels)[..., :3]
+
+    factor = max(1, width // ENV_ANALYSIS_WIDTH)
+    h, w = height // factor, width // factor
+    if factor > 1:
+        pixels = pixels[:h * factor, :w * factor].reshape(h, factor, w, factor, 3).mean(axis=(1, 3))
+    dirs, row_weight = _equirect_directions(h, w)
+    weight = np.broadcast_to(row_weight[:, None], (h, w))
+    lum = pixels @ LUMINANCE
+
+    total = float((lum * weight).sum())
+    average = total / float(weight.sum())
+    peak = float(lum.max())
+    sun = lum >= peak * SUN_THRESHOLD
+    sun_energy = lum * weight * sun
+    sun_total = float(sun_energy.sum())
+    direction = (dirs * sun_energy[..., None]).sum(axis=(0, 1))
+    norm = np.linalg.norm(direction)
+    color = (pixels * (weight * sun)[..., None]).sum(axis=(0, 1))
+    return {
+        "average": average,
+        "peak": peak,
+        "sun_direction": tuple((direction / norm).tolist()) if norm > 0 else (0.0, 0.0, 1.0),
+        "sun_color": tuple((color / max(float(color.max()), 1e-12)).tolist()),
+        "sun_share": sun_total / total if total > 0 else 0.0,
+    }
+
+def environment_strength(world):
+    """Unlinked Background strength downstream of the texture (1.0 if none)."""
+    strength = 1.0
+    for node in world.node_tree.nodes:
+        if node.type == 'BACKGROUND':
+            socket = node.inputs.get("Strength")
+            if socket and not socket.is_linked:
+                strength = float(socket.default_value)
+            break
+    return strength
+
+# Image results keyed by environment_image_key(), so each HDRI is only read once.
+_environment_image_cache = {}
+# Per scene name: {"key", "strength", "env_irradiance", "light_irradiance"}.
+_environment_cache = {}
+
+def analyze_environment(context):
+    """Analyse the world HDRI (cached per image) and weigh it against the lights.
+
+    A uniform environment of radiance L delivers pi * L of irradiance to any
+    surface; that is compared with the lights' mean unoccluded irradiance on
+    the same sample points the contribution estimate uses.
+    """
+    scene = context.scene
+    node = find_environment_texture(scene.world)
+    if node is None:
+        return None
+    key = environment_image_key(node.image)
+    stats = _environment_image_cache.get(key)
+    if stats is None or key[3] is None:
+        stats = analyze_environment_image(node.image)
+        if stats is None:
+            return None
+        _environment_image_cache[key] = stats
+
+    strength = environment_strength(scene.world)
+    objs = [obj for obj in context.view_layer.objects
+            if obj.type == 'LIGHT' and not obj.hide_render]
+    light_irradiance = 0.0
+    if objs:
+        points, normals = sample_scene_points(context, scene.light_editor_contribution_samples)
+        light_irradiance = float(estimate_irradiance(gather_light_arrays(objs), points, normals).sum())
+    result = {
+        "key": key,
+        "strength": strength,
+        "env_irradiance": np.pi * stats["average"] * strength,
+        "light_irradiance": light_irradiance,
+    }
+    _environment_cache[scene.name] = result
+    return result
+
+# Results per scene name: {"names", "camera", "frame", "hidden"}. "hidden"
+# holds each culled light's hide_render from before the one-click hide.
+_out_of_view_cache = {}
+
+# -------------------------------------------------------------------------
+# Operators
+# -------------------------------------------------------------------------
+class LE_OT_AnalyzeOutOfView(Operator):
+    """Find lights whose influence lies entirely outside the active camera's view"""
+    bl_idname = "le.analyze_out_of_view"
+    bl_label = "Find Out of View Lights"
+
+    def execute(self, context):
+        scene = context.scene
+        culled = find_out_of_view_lights(context)
+        if culled is None:
+            self.report({'WARNING'}, "Needs an active perspective or orthographic camera")
+            return {'CANCELLED'}
+        previous = _out_of_view_cache.get(scene.name, {})
+        _out_of_view_cache[scene.name] = {
+            "names": sorted((obj.name for obj in culled), key=str.lower),
+            "camera": scene.camera.name,
+            "frame": scene.frame_current,
+            "hidden": previous.get("hidden", {}),
+        }
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        self.report({'INFO'}, f"{len(culled)} light(s) out of view")
+        return {'FINISHED'}
+
+class LE_OT_HideOutOfView(Operator):
+    """Disable the out of view lights in renders, or restore them"""
+    bl_idname = "le.hide_out_of_view"
+    bl_label = "Hide Out of View Lights"
+    bl_options = {'UNDO'}
+
+    def execute(self, context):
+        result = _out_of_view_cache.get(context.scene.name)
+        if not result:
+            return {'CANCELLED'}
+        objects = context.view_layer.objects
+        if result["hidden"]:
+            changes = []
+            for name, hide_render in result["hidden"].items():
+                obj = objects.get(name)
+                if obj is not None:
+                    changes.append((obj, obj.hide_viewport, hide_render))
+            result["hidden"] = {}
+        else:
+            culled = [objects[name] for name in result["names"] if name in objects]
+            result["hidden"] = {obj.name: obj.hide_render for obj in culled}
+            changes = [(obj, obj.hide_viewport, True) for obj in culled]
+        apply_light_visibility(changes)
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        return {'FINISHED'}
+
+class LE_OT_EstimateContribution(Operator):
+    """Estimate how much each light contributes to what the active camera sees"""
+    bl_idname = "le.estimate_contribution"
+    bl_label = "Estimate Light Contribution"
+
+    def execute(self, context):
+        scene = context.scene
+        ranked = estimate_light_contributions(context)
+        light_contribution_cache[scene.name] = {
+            "frame": scene.frame_current,
+            "camera": scene.camera.name if scene.camera else "",
+            "shares": {obj.session_uid: share for obj, share in ranked},
+            "ranked": [(obj.name, share) for obj, share in ranked],
+        }
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        self.report({'INFO'}, f"Estimated contribution of {len(ranked)} light(s)")
+        return {'FINISHED'}
+
+class LE_OT_PruneLowContribution(Operator):
+    """Disable in renders every light contributing less than a share of the total"""
+    bl_idname = "le.prune_low_contribution"
+    bl_label = "Prune Low Contribution Lights"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    min_share: FloatProperty(
+        name="Minimum Share",
+        description="Lights below this share of the total irradiance are disabled for rendering",
+        default=0.5,
+        min=0.0,
+        max=100.0,
+        subtype='PERCENTAGE'
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        shares = get_light_contributions(context.scene)
+        if shares is None:
+            self.report({'WARNING'}, "Estimate the light contribution for this frame and camera first")
+            return {'CANCELLED'}
+        limit = self.min_share / 100.0
+        # Lights the estimate didn't cover (added since, or outside it) are left alone.
+        pruned = [obj for obj in context.view_layer.objects
+                  if obj.type == 'LIGHT' and obj.session_uid in shares and shares[obj.session_uid] < limit]
+        changed = apply_light_visibility((obj, obj.hide_viewport, True) for obj in pruned)
+        self.report({'INFO'}, f"Disabled {changed} light(s) in renders")
+        return {'FINISHED'}
+
+class LE_OT_AnalyzeEmissionCost(Operator):
+    """Count light-tree triangles and estimate emitted power per emissive material"""
+    bl_idname = "le.analyze_emission_cost"
+    bl_label = "Analyze Emission Cost"
+
+    def execute(self, context):
+        rows = analyze_emission_cost(context)
+        _emission_cost_cache[context.scene.name] = rows
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        self.report({'INFO'}, f"{sum(r['triangles'] for r in rows):,} emissive triangle(s) "
+                              f"in {len(rows)} material(s)")
+        return {'FINISHED'}
+
+class LE_OT_SetEmissionSampling(Operator):
+    """Set Cycles emission sampling on many emissive materials at once"""
+    bl_idname = "le.set_emission_sampling"
+    bl_label = "Set Emission Sampling"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    method: EnumProperty(
+        name="Sampling",
+        items=EMISSION_SAMPLING_ITEMS,
+        default='NONE'
+    )
+    target: EnumProperty(
+        name="Materials",
+        items=[
+            ('LOW_VALUE', "Low Value", "Analyzed materials with many triangles but little emitted power"),
+            ('SELECTED', "Selected Objects", "Emissive materials on the selected objects"),
+        ],
+        default='LOW_VALUE'
+    )
+    max_share: FloatProperty(
+        name="Maximum Power Share",
+        description="Only materials emitting less than this share of the total power are changed",
+        default=1.0,
+        min=0.0,
+        max=100.0,
+        subtype='PERCENTAGE'
+    )
+    min_triangles: IntProperty(
+        name="Minimum Triangles",
+        description="Only materials with at least this many emissive triangles are changed",
+        default=1000,
+        min=0
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "method")
+        layout.prop(self, "target")
+        if self.target == 'LOW_VALUE':
+            layout.prop(self, "max_share")
+            layout.prop(self, "min_triangles")
+
+    def _materials(self, context):
+        if self.target == 'SELECTED':
+            selected = context.selected_objects
+            return {mat for obj, mat, node in find_emissive_objects(context, selected)}
+        rows = _emission_cost_cache.get(context.scene.name) or []
+        names = {r["material"] for r in rows
+                 if r["share"] * 100.0 < self.max_share and r["triangles"] >= self.min_triangles}
+        return {bpy.data.materials[name] for name in names if name in bpy.data.materials}
+
+    def execute(self, context):
+        changed = 0
+        for mat in self._materials(context):
+            current = get_emission_sampling(mat)
+            if current is None:
+                self.report({'WARNING'}, "Emission sampling requires Cycles (Blender 3.5 or newer)")
+                return {'CANCELLED'}
+            if current != self.method:
+                mat.cycles.emission_sampling = self.method
+                changed += 1
+        self.report({'INFO'}, f"Set emission sampling to {self.method} on {changed} material(s)")
+        return {'FINISHED'}
+
+class LE_OT_AnalyzeEnvironment(Operator):
+    """Measure the environment HDRI: brightness, sun direction and share of the lighting"""
+    bl_idname = "le.analyze_environment"
+    bl_label = "Analyze Environment"
+
+    def execute(self, context):
+        result = analyze_environment(context)
+        if result is None:
+            self.report({'WARNING'}, "The world has no image Environment Texture")
+            return {'CANCELLED'}
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        return {'FINISHED'}
+
+# -------------------------------------------------------------------------
+# Drawing (called from LIGHT_PT_editor)
+# -------------------------------------------------------------------------
+def draw_out_of_view_group(panel, layout, context):
+    scene = context.scene
+    if not scene.camera:
+        return
+    result = _out_of_view_cache.get(scene.name)
+    key = "out_of_view"
+    collapsed = LightEditor.group_collapse_dict.get(key, False)
+
+    box = layout.box()
+    row = box.row(align=True)
+    if result:
+        hidden = bool(result["hidden"])
+        row.operator("le.hide_out_of_view", text="",
+                     icon='RESTRICT_RENDER_ON' if hidden else 'RESTRICT_RENDER_OFF', depress=hidden)
+    row.operator("le.analyze_out_of_view", text="", icon='FILE_REFRESH')
+    row.operator("light_editor.toggle_group", text="", emboss=True,
+                 icon='RIGHTARROW' if collapsed else 'DOWNARROW_HLT').group_key = key
+    if not result:
+        row.label(text="Out of View (not analyzed)", icon='HIDE_ON')
+        return
+    stale = result["camera"] != scene.camera.name or result["frame"] != scene.frame_current
+    row.label(text=f"Out of View ({len(result['names'])}){' - outdated' if stale else ''}", icon='HIDE_ON')
+
+    if collapsed or not result["names"]:
+        return
+    lb = box.box()
+    objects = context.view_layer.objects
+    for name in result["names"]:
+        obj = objects.get(name)
+        if obj is None or obj.type != 'LIGHT':
+            continue
+        draw_main_row(lb, obj)
+        if obj.light_expanded:
+            draw_extra_params(panel, lb.box(), obj, obj.data)
+
+def draw_contribution_group(layout, context, max_rows=25):
+    scene = context.scene
+    result = light_contribution_cache.get(scene.name)
+    key = "contribution"
+    collapsed = LightEditor.group_collapse_dict.get(key, False)
+
+    box = layout.box()
+    row = box.row(align=True)
+    row.operator("le.estimate_contribution", text="", icon='FILE_REFRESH')
+    if result:
+        row.operator("le.prune_low_contribution", text="", icon='RESTRICT_RENDER_ON')
+    row.operator("light_editor.toggle_group", text="", emboss=True,
+                 icon='RIGHTARROW' if collapsed else 'DOWNARROW_HLT').group_key = key
+    if not result:
+        row.label(text="Contribution (not estimated)", icon='SORTSIZE')
+        return
+    stale = get_light_contributions(scene) is None
+    row.label(text=f"Contribution{' - outdated' if stale else ''}", icon='SORTSIZE')
+
+    if collapsed or not result["ranked"]:
+        return
+    table = box.box()
+    for name, share in result["ranked"][:max_rows]:
+        row = table.row(align=True)
+        row.operator("le.select_light", text="", icon='RESTRICT_SELECT_OFF').name = name
+        row.label(text=name, icon='LIGHT')
+        row.label(text=f"{share * 100:.2f}%")
+    if len(result["ranked"]) > max_rows:
+        table.label(text=f"... and {len(result['ranked']) - max_rows} more")
+
+def draw_emission_cost_group(layout, context, max_rows=25):
+    rows = _emission_cost_cache.get(context.scene.name)
+    key = "emission_cost"
+    collapsed = LightEditor.group_collapse_dict.get(key, False)
+
+    box = layout.box()
+    row = box.row(align=True)
+    row.operator("le.analyze_emission_cost", text="", icon='FILE_REFRESH')
+    if rows:
+        row.operator("le.set_emission_sampling", text="", icon='SETTINGS')
+    row.operator("light_editor.toggle_group", text="", emboss=True,
+                 icon='RIGHTARROW' if collapsed else 'DOWNARROW_HLT').group_key = key
+    if rows is None:
+        row.label(text="Emission Cost (not analyzed)", icon='SHADING_RENDERED')
+        return
+    row.label(text=f"Emission Cost ({sum(r['triangles'] for r in rows):,} tris)", icon='SHADING_RENDERED')
+
+    if collapsed or not rows:
+        return
+    table = box.box()
+    for r in rows[:max_rows]:
+        mat = bpy.data.materials.get(r["material"])
+        if not mat:
+            continue
+        line = table.row(align=True)
+        line.label(text=mat.name, icon='MATERIAL')
+        line.label(text=f"{r['triangles']:,}")
+        line.label(text=f"{r['share'] * 100:.1f}%")
+        if get_emission_sampling(mat) is not None:
+            line.prop(mat.cycles, "emission_sampling", text="")
+    if len(rows) > max_rows:
+        table.label(text=f"... and {len(rows) - max_rows} more")
+
+def draw_environment_analysis(box, context):
+    """Extra rows for draw_environment_single_row; reads caches only."""
+    scene = context.scene
+    node = find_environment_texture(scene.world)
+    if node is None:
+        return
+    result = _environment_cache.get(scene.name)
+    stats = _environment_image_cache.get(result["key"]) if result else None
+    current = result is not None and result["key"][:3] == environment_image_id(node.image)
+
+    row = box.row(align=True)
+    row.operator("le.analyze_environment", text="", icon='FILE_REFRESH')
+    if not stats or not current:
+        row.label(text=f"{node.image.name} (not analyzed)", icon='IMAGE_DATA')
+        return
+    total = result["env_irradiance"] + result["light_irradiance"]
+    share = result["env_irradiance"] / total if total > 0 else 1.0
+    row.label(text=f"{node.image.name}: avg {stats['average'] * result['strength']:.3g}, "
+                   f"{share * 100:.0f}% of lighting", icon='IMAGE_DATA')
+    if stats["sun_share"] > 0.0:
+        row = box.row(align=True)
+        x, y, z = stats["sun_direction"]
+        elevation = np.degrees(np.arcsin(np.clip(z, -1.0, 1.0)))
+        azimuth = np.degrees(np.arctan2(y, x))
+        r, g, b = stats["sun_color"]
+        row.label(text=f"Sun: {stats['sun_share'] * 100:.0f}% of HDRI, "
+                       f"elev {elevation:.0f}°, azim {azimuth:.0f}°, "
+                       f"RGB {r:.2f} {g:.2f} {b:.2f}", icon='LIGHT_SUN')
+
+@persistent
+def LE_clear_environment_analysis(scene, depsgraph=None):
+    """Drop environment results when an image or world changes.
+
+    This is where they are validated, so draw() only ever reads the caches.
+    """
+    if depsgraph is None:
+        return
+    images, worlds = set(), set()
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Image):
+            images.add(update.id.original.name)
+        elif isinstance(update.id, bpy.types.World):
+            worlds.add(update.id.original.name)
+    if images:
+        for key in [key for key in _environment_image_cache if key[0] in images]:
+            del _environment_image_cache[key]
+        for name in [name for name, result in _environment_cache.items() if result["key"][0] in images]:
+            del _environment_cache[name]
+    if worlds:
+        for name in list(_environment_cache):
+            world = getattr(bpy.data.scenes.get(name), "world", None)
+            if world is None or world.name in worlds:
+                del _environment_cache[name]
+
+@persistent
+def LE_clear_analysis_on_load(dummy):
+    """Analysis results refer to the previous file's objects; drop them."""
+    _out_of_view_cache.clear()
+    _emission_cost_cache.clear()
+    _environment_cache.clear()
+
+# -------------------------------------------------------------------------
+# Registration
+# -------------------------------------------------------------------------
+classes = (
+    LE_OT_AnalyzeOutOfView,
+    LE_OT_HideOutOfView,
+    LE_OT_EstimateContribution,
+    LE_OT_PruneLowContribution,
+    LE_OT_AnalyzeEmissionCost,
+    LE_OT_SetEmissionSampling,
+    LE_OT_AnalyzeEnvironment,
+)
+
+def register():
+    bpy.types.Scene.light_editor_influence_threshold = FloatProperty(
+        name="Influence Threshold",
+        description="Irradiance (W/m²) below which a light is considered to have no influence",
+        default=0.01,
+        min=1e-6,
+        precision=4
+    )
+    bpy.types.Scene.light_editor_contribution_samples = IntProperty(
+        name="Samples",
+        description="Approximate number of surface points used to estimate light contribution",
+        default=20000,
+        min=100
+    )
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    if LE_clear_analysis_on_load not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(LE_clear_analysis_on_load)
+    if LE_clear_environment_analysis not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(LE_clear_environment_analysis)
+
+def unregister():
+    if LE_clear_analysis_on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(LE_clear_analysis_on_load)
+    if LE_clear_environment_analysis in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(LE_clear_environment_analysis)
+    _out_of_view_cache.clear()
+    _emission_cost_cache.clear()
+    _environment_cache.clear()
+    _environment_image_cache.clear()
+    for cls in reversed(classes):
+        try:
+            bpy.utils.unregister_class(cls)
+        except (RuntimeError, ValueError):
+            pass
+    for prop in ("light_editor_influence_threshold", "light_editor_contribution_samples"):
+        if hasattr(bpy.types.Scene, prop):
+            try:
+                delattr(bpy.types.Scene, prop)
+            except (AttributeError, TypeError):
+                pass
@@ -0,0 +1,336 @@
+import bpy
+import numpy as np
+from bpy.types import Operator, Panel
+from bpy.props import StringProperty, EnumProperty, FloatProperty, FloatVectorProperty, IntProperty
+
+from .LightEditor import get_group_lights
+
+# -------------------------------------------------------------------------
+# Patterns
+# -------------------------------------------------------------------------
+# A pattern turns (lights, frames) into a factor array of shape (n, f): 1.0
+# keeps a light's current value, 0.0 drives it fully to the target (zero
+# power, the target color, or off). Lights are ordered by name, which is
+# the order a chase runs in.
+
+def _smoothstep(t):
+    return t * t * (3.0 - 2.0 * t)
+
+def flicker_factors(n, frames, amount, speed, seed):
+    """Smooth value noise: random knots every ``speed`` frames, eased between."""
+    rng = np.random.default_rng(seed)
+    pos = (frames - frames[0]) / max(speed, 1e-3)
+    knots = rng.random((n, int(np.ceil(pos[-1])) + 2), dtype=np.float32)
+    i0 = np.floor(pos).astype(np.int64)
+    t = _smoothstep(pos - i0).astype(np.float32)
+    noise = knots[:, i0] * (1.0 - t) + knots[:, i0 + 1] * t
+    return 1.0 - amount * noise
+
+def chase_factors(n, frames, amount, speed, width):
+    """A pulse travelling through the lights once every ``speed`` frames."""
+    phase = np.arange(n, dtype=np.float32)[:, None] / max(n, 1)
+    x = np.mod((frames - frames[0])[None, :] / max(speed, 1e-3) - phase, 1.0)
+    distance = np.minimum(x, 1.0 - x)
+    pulse = np.clip(1.0 - distance / max(width * 0.5, 1e-3), 0.0, 1.0)
+    return 1.0 - amount + amount * _smoothstep(pulse)
+
+def fade_factors(n, frames, fade_from, fade_to, stagger):
+    """Eased fade from one factor to another, each light ``stagger`` frames later."""
+    span = frames[-1] - frames[0]
+    duration = max(span - stagger * (n - 1), 1.0)
+    offset = np.arange(n, dtype=np.float32)[:, None] * stagger
+    t = np.clip(((frames - frames[0])[None, :] - offset) / duration, 0.0, 1.0)
+    return fade_from + (fade_to - fade_from) * _smoothstep(t)
+
+# -------------------------------------------------------------------------
+# F-curve writing
+# -------------------------------------------------------------------------
+# FCurveKeyframePoint.interpolation enum values, for foreach_set.
+INTERPOLATION_CONSTANT = 0
+INTERPOLATION_LINEAR = 1
+
+def _ensure_fcurves(id_data):
+    """The F-curve collection that animates ``id_data``, created on demand."""
+    anim = id_data.animation_data or id_data.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(f"{id_data.name}Action")
+    action = anim.action
+    if hasattr(anim, "action_slot"):
+        # Slotted actions (Blender 4.4+) keep F-curves in per-slot channelbags.
+        from bpy_extras import anim_utils
+        if anim.action_slot is None:
+            anim.action_slot = action.slots.new(id_data.id_type, id_data.name)
+        return anim_utils.action_ensure_channelbag_for_slot(action, anim.action_slot).fcurves
+    return action.fcurves
+
+def _existing_fcurves(id_data):
+    anim = id_data.animation_data
+    if not anim or not anim.action:
+        return None
+    if hasattr(anim, "action_slot"):
+        from bpy_extras import anim_utils
+        if anim.action_slot is None:
+            return None
+        channelbag = anim_utils.action_get_channelbag_for_slot(anim.action, anim.action_slot)
+        return channelbag.fcurves if channelbag else None
+    return anim.action.fcurves
+
+def write_fcurve(fcurves, data_path, index, frames, values, interpolation):
+    """Replace the keys of one F-curve inside [frames[0], frames[-1]].
+
+    The F-curve is edited in place: keys outside the range keep their
+    handles, easing and interpolation, and its modifiers, group and flags
+    stay as they are. The new keys are added with a single
+    keyframe_points.add and written with foreach_set instead of one
+    keyframe_insert per key. Returns the number of keys added.
+    """
+    coords = np.column_stack((frames, values)).astype(np.float32)
+    fc = fcurves.find(data_path, index=index) or fcurves.new(data_path, index=index)
+    points = fc.keyframe_points
+    if len(points):
+        old = np.empty(len(points) * 2, dtype=np.float32)
+        points.foreach_get("co", old)
+        frame = old[0::2]
+        for i in np.flatnonzero((frame >= frames[0]) & (frame <= frames[-1]))[::-1]:
+            points.remove(points[int(i)], fast=True)
+    first = len(points)
+    points.add(len(coords))
+    co = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get("co", co)
+    co[first * 2:] = coords.ravel()
+    points.foreach_set("co", co)
+    modes = np.empty(len(points), dtype=np.int32)
+    points.foreach_get("interpolation", modes)
+    modes[first:] = interpolation
+    points.foreach_set("interpolation", modes)
+    fc.update()
+    return len(coords)
+
+def _state_changes(states):
+    """Indices where a boolean track changes, plus its first sample."""
+    keep = np.ones(len(states), dtype=bool)
+    keep[1:] = states[1:] != states[:-1]
+    return keep
+
+def bake_light_animation(objs, channel, frames, factors, target_color=(0.0, 0.0, 0.0)):
+    """Key ``channel`` on every light from a (lights, frames) factor array.
+
+    Energy and color are read for all lights with one foreach_get, scaled
+    with broadcasting and written as linear keys on the light data. The
+    enabled state keys hide_viewport/hide_render on the objects with
+    constant interpolation, only where the state changes. Light data shared
+    by several objects is keyed once. Returns the number of keys written.
+    """
+    keys = 0
+    if channel == 'ENABLED':
+        for obj, track in zip(objs, factors):
+            hidden = track < 0.5
+            keep = _state_changes(hidden)
+            fcurves = _ensure_fcurves(obj)
+            for path in ("hide_viewport", "hide_render"):
+                keys += write_fcurve(fcurves, path, 0, frames[keep], hidden[keep].astype(np.float32),
+                                     INTERPOLATION_CONSTANT)
+        return keys
+
+    lights, rows = [], []
+    seen = set()
+    for obj, row in zip(objs, factors):
+        if obj.data.as_pointer() in seen:
+            continue
+        seen.add(obj.data.as_pointer())
+        lights.append(obj.data)
+        rows.append(row)
+    factors = np.asarray(rows, dtype=np.float32)
+    data_index = {light.as_pointer(): i for i, light in enumerate(bpy.data.lights)}
+    idx = np.array([data_index[light.as_pointer()] for light in lights], dtype=np.int64)
+
+    if channel == 'ENERGY':
+        column = np.empty(len(bpy.data.lights), dtype=np.float32)
+        bpy.data.lights.foreach_get("energy", column)
+        values = column[idx, None] * factors
+        for light, track in zip(lights, values):
+            keys += write_fcurve(_ensure_fcurves(light), "energy", 0, frames, track, INTERPOLATION_LINEAR)
+    elif channel == 'COLOR':
+        column = np.empty(len(bpy.data.lights) * 3, dtype=np.float32)
+        bpy.data.lights.foreach_get("color", column)
+        base = column.reshape(-1, 3)[idx]
+        target = np.asarray(target_color, dtype=np.float32)
+        values = target + (base[:, None, :] - target) * factors[..., None]
+        for light, track in zip(lights, values):
+            fcurves = _ensure_fcurves(light)
+            for i in range(3):
+                keys += write_fcurve(fcurves, "color", i, frames, track[:, i], INTERPOLATION_LINEAR)
+    return keys
+
+def clear_light_animation(objs, channel):
+    """Remove the F-curves a bake of ``channel`` would have written."""
+    if channel == 'ENABLED':
+        targets = [(obj, ("hide_viewport", "hide_render")) for obj in objs]
+    else:
+        path = "energy" if channel == 'ENERGY' else "color"
+        targets = [(light, (path,)) for light in {obj.data for obj in objs}]
+    removed = 0
+    for id_data, paths in targets:
+        fcurves = _existing_fcurves(id_data)
+        if fcurves is None:
+            continue
+        for fc in [fc for fc in fcurves if fc.data_path in paths]:
+            fcurves.remove(fc)
+            removed += 1
+    return removed
+
+# -------------------------------------------------------------------------
+# Operators
+# -------------------------------------------------------------------------
+CHANNEL_ITEMS = [
+    ('ENERGY', "Power", "Key light power"),
+    ('COLOR', "Color", "Key light color, blending towards the target color"),
+    ('ENABLED', "Enabled", "Key viewport and render visibility (off below half strength)"),
+]
+
+class LE_OT_BakeLightAnimation(Operator):
+    """Key a procedural flicker, chase or fade on every light in the selection or group"""
+    bl_idname = "le.bake_light_animation"
+    bl_label = "Bake Light Animation"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    group_key: StringProperty(default="", options={'HIDDEN'})  # empty = selected lights
+    pattern: EnumProperty(
+        name="Pattern",
+        items=[
+            ('FLICKER', "Flicker", "Smooth random flicker, different per light"),
+            ('CHASE', "Chase", "A pulse running through the lights in name order"),
+            ('FADE', "Fade", "Eased fade, optionally staggered per light"),
+        ],
+        default='FLICKER'
+    )
+    channel: EnumProperty(name="Channel", items=CHANNEL_ITEMS, default='ENERGY')
+    frame_start: IntProperty(name="Start", default=1)
+    frame_end: IntProperty(name="End", default=250)
+    frame_step: IntProperty(name="Step", description="Frames between keys", default=1, min=1)
+    amount: FloatProperty(name="Amount", description="Depth of the effect", default=0.5, min=0.0, max=1.0)
+    speed: FloatProperty(name="Speed", description="Frames between flicker changes, or per chase cycle",
+                         default=4.0, min=0.1)
+    width: FloatProperty(name="Width", description="Fraction of the chase cycle a light is lit",
+                         default=0.25, min=0.01, max=1.0)
+    fade_from: FloatProperty(name="From", default=1.0, min=0.0)
+    fade_to: FloatProperty(name="To", default=0.0, min=0.0)
+    stagger: FloatProperty(name="Stagger", description="Frames between one light's fade and the next",
+                           default=0.0, min=0.0)
+    seed: IntProperty(name="Seed", default=0, min=0)
+    target_color: FloatVectorProperty(name="Target Color", subtype='COLOR', size=3, min=0.0,
+                                      default=(0.0, 0.0, 0.0))
+
+    def invoke(self, context, event):
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.row().prop(self, "pattern", expand=True)
+        layout.prop(self, "channel")
+        row = layout.row(align=True)
+        row.prop(self, "frame_start")
+        row.prop(self, "frame_end")
+        row.prop(self, "frame_step")
+        if self.pattern == 'FADE':
+            row = layout.row(align=True)
+            row.prop(self, "fade_from")
+            row.prop(self, "fade_to")
+            layout.prop(self, "stagger")
+        else:
+            layout.prop(self, "amount")
+            layout.prop(self, "speed")
+            if self.pattern == 'CHASE':
+                layout.prop(self, "width")
+            else:
+                layout.prop(self, "seed")
+        if self.channel == 'COLOR':
+            layout.prop(self, "target_color")
+
+    def execute(self, context):
+        objs = sorted(get_group_lights(context, self.group_key), key=lambda x: x.name.lower())
+        if not objs:
+            self.report({'WARNING'}, "No lights to animate")
+            return {'CANCELLED'}
+        if self.frame_end <= self.frame_start:
+            self.report({'WARNING'}, "End frame must be after the start frame")
+            return {'CANCELLED'}
+        frames = np.arange(self.frame_start, self.frame_end + 1, self.frame_step, dtype=np.float32)
+        if frames[-1] != self.frame_end:
+            frames = np.append(frames, np.float32(self.frame_end))
+
+        n = len(objs)
+        if self.pattern == 'FLICKER':
+            factors = flicker_factors(n, frames, self.amount, self.speed, self.seed)
+        elif self.pattern == 'CHASE':
+            factors = chase_factors(n, frames, self.amount, self.speed, self.width)
+        else:
+            factors = fade_factors(n, frames, self.fade_from, self.fade_to, self.stagger)
+
+        keys = bake_light_animation(objs, self.channel, frames, factors, self.target_color)
+        context.scene.frame_set(context.scene.frame_current)
+        self.report({'INFO'}, f"Baked {keys:,} key(s) on {n} light(s)")
+        return {'FINISHED'}
+
+class LE_OT_ClearLightAnimation(Operator):
+    """Remove power, color or enabled keys from every light in the selection or group"""
+    bl_idname = "le.clear_light_animation"
+    bl_label = "Clear Light Animation"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    group_key: StringProperty(default="", options={'HIDDEN'})  # empty = selected lights
+    channel: EnumProperty(name="Channel", items=CHANNEL_ITEMS, default='ENERGY')
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        objs = get_group_lights(context, self.group_key)
+        if not objs:
+            self.report({'WARNING'}, "No lights selected")
+            return {'CANCELLED'}
+        removed = clear_light_animation(objs, self.channel)
+        self.report({'INFO'}, f"Removed {removed} F-curve(s)")
+        return {'FINISHED'}
+
+# -------------------------------------------------------------------------
+# Panel
+# -------------------------------------------------------------------------
+class LE_PT_LightAnimation(Panel):
+    bl_label = "Light Animation"
+    bl_idname = "LE_PT_light_animation"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Light Editor"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        selected = sum(1 for obj in context.selected_objects if obj.type == 'LIGHT')
+        layout.label(text=f"{selected} selected light(s)", icon='LIGHT')
+        row = layout.row(align=True)
+        row.enabled = selected > 0
+        row.operator("le.bake_light_animation", text="Bake Pattern", icon='KEYINGSET')
+        row.operator("le.clear_light_animation", text="", icon='X')
+
+# -------------------------------------------------------------------------
+# Registration
+# -------------------------------------------------------------------------
+classes = (
+    LE_OT_BakeLightAnimation,
+    LE_OT_ClearLightAnimation,
+    LE_PT_LightAnimation,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        try:
+            bpy.utils.unregister_class(cls)
+        except (RuntimeError, ValueError):
+            pass
@@ -0,0 +1,308 @@
+import bpy
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from bpy.types import Operator, Panel
+from bpy.props import BoolProperty, StringProperty
+
+from .LightRig import (
+    RIG_FORMAT,
+    RIG_VERSION,
+    light_record,
+    object_record,
+    emissive_record,
+    world_record,
+    link_records,
+)
+from .LightRender import background_command
+
+# -------------------------------------------------------------------------
+# Library snapshots
+# -------------------------------------------------------------------------
+# A snapshot is a rig file (see LightRig) built from a .blend without opening
+# it: a background Blender links only the datablocks lighting depends on
+# through bpy.data.libraries.load. Every material and world is linked (no
+# geometry comes with them), so emissive materials are always compared.
+# Light objects can't be told apart from other objects by name alone, so by
+# default only objects that share a light datablock's name or own a BB_
+# linking collection are linked; a full snapshot links every object, which
+# also finds renamed lights at the cost of loading all the geometry. Light
+# datablocks left without an object in scope are listed in the snapshot
+# header and reported with the diff, so a renamed light never drops out
+# silently.
+#
+# Both sides of a diff are written by write_snapshot() from the same
+# selection, so comparing a file with itself opened gives an empty diff:
+# light data only counts when an object in scope uses it, and every
+# material and world in the file is included on both sides.
+LINK_PREFIXES = ("BB_Light Linking for ", "BB_Shadow Linking for ")
+
+def _material_emission_nodes(mat):
+    """Emission/Principled nodes reachable from a material's active output."""
+    if not mat.use_nodes or not mat.node_tree:
+        return []
+    output = next((n for n in mat.node_tree.nodes if n.type == 'OUTPUT_MATERIAL' and n.is_active_output), None)
+    surface = output.inputs.get("Surface") if output else None
+    if not surface or not surface.is_linked:
+        return []
+    found, stack, visited = [], [link.from_node for link in surface.links], set()
+    while stack:
+        node = stack.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+        if node.type == 'EMISSION' or (node.type == 'BSDF_PRINCIPLED' and node.inputs.get("Emission Strength")):
+            found.append(node)
+        for socket in node.inputs:
+            stack.extend(link.from_node for link in socket.links)
+    return sorted(found, key=lambda n: n.name)
+
+def snapshot_object_names(object_names, light_names, collection_names, full_objects=False):
+    """Names of the objects a snapshot covers, chosen the same way on both sides."""
+    if full_objects:
+        return list(object_names)
+    linked_lights = {name.split(" for ", 1)[1] for name in collection_names if name.startswith(LINK_PREFIXES)}
+    return [name for name in object_names if name in light_names or name in linked_lights]
+
+def write_snapshot(out_path, objects, lights, materials, worlds, source):
+    """Write the rig records of ``objects``, ``materials`` and ``worlds`` to a snapshot file.
+
+    ``lights`` are all the file's light datablocks; those no light object in
+    ``objects`` uses are listed in the header as "unmatched_lights".
+    """
+    objs = sorted((obj for obj in objects if obj and obj.type == 'LIGHT'), key=lambda o: o.name)
+    used = {obj.data for obj in objs}
+    unmatched = sorted(light.name for light in lights if light and light not in used)
+    with open(out_path, "w", encoding="utf-8") as f:
+        def write(record):
+            f.write(json.dumps(record, separators=(",", ":")))
+            f.write("\n")
+        write({"type": "header", "format": RIG_FORMAT, "version": RIG_VERSION,
+               "blender": list(bpy.app.version), "source": source, "unmatched_lights": unmatched})
+        for light in sorted(used, key=lambda l: l.name):
+            write(light_record(light))
+        for obj in objs:
+            write(object_record(obj))
+        for mat in sorted((m for m in materials if m), key=lambda m: m.name):
+            for node in _material_emission_nodes(mat):
+                write(emissive_record(mat, node))
+        for world in sorted((w for w in worlds if w), key=lambda w: w.name):
+            write(world_record(world))
+        for obj in objs:
+            for record in link_records(obj):
+                write(record)
+
+def snapshot_library(blend_path, out_path, full_objects=False):
+    """Link a file's lighting datablocks and write them as a rig snapshot."""
+    with bpy.data.libraries.load(blend_path, link=True) as (data_from, data_to):
+        data_to.lights = list(data_from.lights)
+        data_to.materials = list(data_from.materials)
+        data_to.worlds = list(data_from.worlds)
+        data_to.collections = [name for name in data_from.collections if name.startswith(LINK_PREFIXES)]
+        data_to.objects = snapshot_object_names(data_from.objects, set(data_from.lights),
+                                                data_from.collections, full_objects)
+    write_snapshot(out_path, data_to.objects, data_to.lights, data_to.materials, data_to.worlds, blend_path)
+
+def snapshot_current(context, out_path, full_objects=False):
+    """Snapshot of the open file, in the same scope as snapshot_library."""
+    names = set(snapshot_object_names((obj.name for obj in bpy.data.objects),
+                                      {light.name for light in bpy.data.lights},
+                                      [coll.name for coll in bpy.data.collections], full_objects))
+    write_snapshot(out_path, [obj for obj in bpy.data.objects if obj.name in names],
+                   bpy.data.lights, bpy.data.materials, bpy.data.worlds, bpy.data.filepath)
+
+# -------------------------------------------------------------------------
+# Diff
+# -------------------------------------------------------------------------
+def record_key(record):
+    kind = record["type"]
+    if kind == "emissive":
+        return (kind, f"{record['material']} / {record['node']}")
+    if kind == "link":
+        return (kind, f"{record['light']} ({record['kind']})")
+    if kind == "lightgroups":
+        return (kind, record["view_layer"])
+    return (kind, record["name"])
+
+def load_snapshot(path):
+    """The header and {record_key: record} for every record of a snapshot file."""
+    records = {}
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(next(f, "{}"))
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                records[record_key(record)] = record
+    return header, records
+
+def _same(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return isinstance(a, (int, float)) and isinstance(b, (int, float)) and abs(a - b) <= 1e-6 * max(1.0, abs(a))
+    if isinstance(a, list) and isinstance(b, list) and a and all(isinstance(v, (int, float)) for v in a + b):
+        return len(a) == len(b) and np.allclose(a, b, rtol=1e-6, atol=1e-7)
+    return a == b
+
+def diff_snapshots(old, new):
+    """Sorted added/removed/changed records between two snapshots.
+
+    Changed entries list [field, old value, new value] for each field that
+    differs. Fields that only exist on one side count as changed too.
+    """
+    added = sorted(k for k in new if k not in old)
+    removed = sorted(k for k in old if k not in new)
+    changed = []
+    for key in sorted(k for k in old if k in new):
+        a, b = old[key], new[key]
+        fields = [[field, a.get(field), b.get(field)]
+                  for field in sorted(set(a) | set(b))
+                  if field != "type" and not _same(a.get(field), b.get(field))]
+        if fields:
+            changed.append({"type": key[0], "name": key[1], "fields": fields})
+    return {
+        "added": [{"type": k[0], "name": k[1]} for k in added],
+        "removed": [{"type": k[0], "name": k[1]} for k in removed],
+        "changed": changed,
+    }
+
+def diff_lighting_files(context, old_path, new_path, full_objects=False):
+    """Diff the lighting of two .blend files; an empty new_path means the open file.
+
+    Each library is snapshotted by its own background Blender, both running
+    in parallel.
+    """
+    with tempfile.TemporaryDirectory(prefix="le_diff_") as tmp:
+        jobs = []
+        snapshots = []
+        for i, path in enumerate((old_path, new_path)):
+            out = os.path.join(tmp, f"snapshot_{i}.jsonl")
+            snapshots.append(out)
+            if not path:
+                snapshot_current(context, out, full_objects)
+                continue
+            args = ["--snapshot", bpy.path.abspath(path), out] + (["--full"] if full_objects else [])
+            jobs.append((path, subprocess.Popen(background_command("LightDiff", args),
+                                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)))
+        for path, process in jobs:
+            _, err = process.communicate()
+            if process.returncode != 0:
+                raise RuntimeError(f"Could not read {path}: {err.decode(errors='replace').strip()[-300:]}")
+        (old_header, old), (new_header, new) = (load_snapshot(path) for path in snapshots)
+        diff = diff_snapshots(old, new)
+        # Light data whose object wasn't in scope on either side: most likely
+        # lights not named after their data, which only All Objects finds.
+        # With All Objects on, it is light data no object uses at all.
+        unmatched = set() if full_objects else (set(old_header.get("unmatched_lights", []))
+                                                | set(new_header.get("unmatched_lights", [])))
+        diff["unmatched_lights"] = sorted(unmatched)
+        return diff
+
+def main(argv=None):
+    """Background entry point: ``--snapshot <blend> <out.jsonl> [--full]``."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if argv and argv[0] == "--snapshot":
+        snapshot_library(argv[1], argv[2], "--full" in argv[3:])
+
+# -------------------------------------------------------------------------
+# UI
+# -------------------------------------------------------------------------
+# Last diff result, shown in the panel.
+_last_diff = {}
+
+class LE_OT_DiffLightingFiles(Operator):
+    """Compare lights, emissives and link collections between two .blend files"""
+    bl_idname = "le.diff_lighting_files"
+    bl_label = "Diff Lighting"
+
+    old_path: StringProperty(name="Old File", subtype='FILE_PATH')
+    new_path: StringProperty(name="New File", subtype='FILE_PATH',
+                             description="Leave empty to compare against the open file")
+    report_path: StringProperty(name="Save Report", subtype='FILE_PATH',
+                                description="Optional JSON file receiving the full diff")
+    full_objects: BoolProperty(
+        name="All Objects",
+        description="Link every object, which also finds lights not named after their data "
+                    "(slower: loads all geometry)",
+        default=False
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=400)
+
+    def execute(self, context):
+        if not self.old_path:
+            self.report({'WARNING'}, "Choose the file to compare against")
+            return {'CANCELLED'}
+        try:
+            diff = diff_lighting_files(context, self.old_path, self.new_path, self.full_objects)
+        except (OSError, RuntimeError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if self.report_path:
+            with open(bpy.path.abspath(self.report_path), "w", encoding="utf-8") as f:
+                json.dump(diff, f, indent=2)
+        _last_diff.clear()
+        _last_diff.update(diff, old=os.path.basename(self.old_path),
+                          new=os.path.basename(self.new_path) or "open file")
+        summary = f"{len(diff['added'])} added, {len(diff['removed'])} removed, {len(diff['changed'])} changed"
+        if diff["unmatched_lights"]:
+            self.report({'WARNING'}, f"{summary}; {len(diff['unmatched_lights'])} light(s) without an "
+                                     "object named after their data were skipped (use All Objects)")
+        else:
+            self.report({'INFO'}, summary)
+        return {'FINISHED'}
+
+class LE_PT_LightingDiff(Panel):
+    bl_label = "Lighting Diff"
+    bl_idname = "LE_PT_lighting_diff"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Light Editor"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    max_rows = 30
+
+    def draw(self, context):
+        layout = self.layout
+        layout.operator("le.diff_lighting_files", icon='FILE_BLEND')
+        if not _last_diff:
+            return
+        layout.label(text=f"{_last_diff['old']} → {_last_diff['new']}", icon='ARROW_LEFTRIGHT')
+        if _last_diff.get("unmatched_lights"):
+            layout.label(text=f"{len(_last_diff['unmatched_lights'])} light(s) skipped, not named after "
+                              "their data", icon='ERROR')
+        rows = ([('ADD', f"{e['type']}: {e['name']}") for e in _last_diff["added"]]
+                + [('REMOVE', f"{e['type']}: {e['name']}") for e in _last_diff["removed"]]
+                + [('MODIFIER', f"{e['type']}: {e['name']} ({', '.join(f[0] for f in e['fields'])})")
+                   for e in _last_diff["changed"]])
+        if not rows:
+            layout.label(text="No lighting differences", icon='CHECKMARK')
+            return
+        box = layout.box()
+        for icon, text in rows[:self.max_rows]:
+            box.label(text=text, icon=icon)
+        if len(rows) > self.max_rows:
+            box.label(text=f"... and {len(rows) - self.max_rows} more")
+
+# -------------------------------------------------------------------------
+# Registration
+# -------------------------------------------------------------------------
+classes = (
+    LE_OT_DiffLightingFiles,
+    LE_PT_LightingDiff,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    _last_diff.clear()
+    for cls in reversed(classes):
+        try:
+            bpy.utils.unregister_class(cls)
+        except (RuntimeError, ValueError):
+            pass
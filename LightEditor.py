@@ -6,11 +6,15 @@ from bpy.props import (
     FloatProperty,
     StringProperty,
     EnumProperty,
-    PointerProperty
+    PointerProperty,
+    FloatVectorProperty
 )
 from bpy.app.handlers import persistent
 from bpy.app.translations import contexts as i18n_contexts
 import re, os
+import numpy as np
+from contextlib import contextmanager
+from mathutils.kdtree import KDTree
 
 # --- Global State Tracking (UI visuals, operator states) ---
 isolate_env_header_state = False
@@ -27,11 +31,30 @@ other_groups_original_state = {}
 emissive_material_cache = {}
 group_mat_checkbox_state = {}
 environment_checkbox_state = {'environment': True}
-_surface_link_backup = None
-_volume_link_backup = None
 _light_isolate_state_backup = {}
 emissive_isolate_icon_state = {}
 _emissive_link_backup = {}
+# Per-scene result of the light contribution estimate (see LightAnalysis):
+# {"frame", "camera", "shares": {session_uid: share of total irradiance}}
+light_contribution_cache = {}
+
+# UI state that belongs to one view layer: which groups are collapsed,
+# soloed or switched off. Every (scene, view layer) keeps its own set of these
+# dicts in _layer_states and activate_layer_state() rebinds the module-level
+# names above to the active layer's set, so switching render layers neither
+# resets the panel nor leaks one layer's toggles into another.
+LAYER_STATE_NAMES = (
+    "group_checkbox_1_state",
+    "group_lights_original_state",
+    "group_collapse_dict",
+    "collections_with_lights",
+    "group_checkbox_2_state",
+    "other_groups_original_state",
+    "group_mat_checkbox_state",
+    "emissive_isolate_icon_state",
+)
+_layer_states = {}
+_active_layer_key = None
 
 # Re-entrancy guard: set while the depsgraph handler reconciles light_enabled
 # from hide_viewport/hide_render, so update_light_enabled() doesn't write the
@@ -46,7 +69,7 @@ def is_blender_4_5_or_higher():
 
 class UnifiedOnOffManager:
     def __init__(self):
-        # Backups for lights, emissive‐socket values, and environment links
+        # Backups for lights, emissive‐socket values, and environment factors
         self._light_backup = {}
         self._material_backup = {}
         self._env_backup = {}
@@ -61,6 +84,7 @@ class UnifiedOnOffManager:
         if except_mode in {UnifiedIsolateMode.LIGHT_ROW, UnifiedIsolateMode.LIGHT_GROUP} and except_identifier:
             keep_lights = except_identifier[0]
 
+        to_disable = []
         for obj in bpy.data.objects:
             if obj.type == 'LIGHT':
                 # backup
@@ -68,17 +92,22 @@ class UnifiedOnOffManager:
                     obj.hide_viewport, obj.hide_render, getattr(obj, "light_enabled", True)
                 )
                 if obj.name not in keep_lights:
-                    obj.hide_viewport = True
-                    obj.hide_render = True
-                    obj.light_enabled = False
+                    to_disable.append(obj)
+        set_lights_enabled(to_disable, False)
 
         # --- Disable all emissive sockets except the isolated one ---
+        # With gates the factor is zeroed, which also covers linked strengths.
+        # Gates only go on nodes that actually emit in this view layer, so
+        # unrelated materials keep their topology.
+        if context.scene.light_editor_emission_gates:
+            for obj, mat, node in find_emissive_objects(context):
+                install_emission_gate(mat, node)
         for mat in bpy.data.materials:
-            if not mat.use_nodes:
+            if not mat.use_nodes or mat.library:
                 continue
             for node in mat.node_tree.nodes:
                 # catch both pure Emission nodes and Principled BSDF emission sockets
-                strength_socket = node.inputs.get("Strength") or node.inputs.get("Emission Strength")
+                strength_socket = emission_toggle_socket(node)
                 if not strength_socket:
                     continue
 
@@ -89,32 +118,26 @@ class UnifiedOnOffManager:
                     self._material_backup[ident] = strength_socket.default_value
                     strength_socket.default_value = 0.0
 
-        # --- Disconnect world Surface & Volume ---
+        # --- Close the world's Surface & Volume controls ---
         world = context.scene.world
-        if world and world.use_nodes:
-            nt = world.node_tree
-            output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
-            if output:
-                for name in ("Surface", "Volume"):
-                    sock = output.inputs.get(name)
-                    if sock and sock.is_linked and sock.links:
-                        link = sock.links[0]
-                        self._env_backup[name] = (link.from_node.name, link.from_socket.name)
-                        nt.links.remove(link)
+        for name in ENV_SOCKETS:
+            control = install_environment_control(world, name)
+            if control:
+                self._env_backup[name] = control.inputs[0].default_value
+                set_environment_factor(world, name, 0.0)
 
         # --- Redraw all areas ---
         for area in context.screen.areas:
             area.tag_redraw()
 
     def restore_all(self):
-        """Restore lights, emissive‐socket values, and world links from backup."""
+        """Restore lights, emissive‐socket values, and world factors from backup."""
         # Restore lights
-        for obj in bpy.data.objects:
-            if obj.type == 'LIGHT' and obj.name in self._light_backup:
-                vp, rp, en = self._light_backup[obj.name]
-                obj.hide_viewport = vp
-                obj.hide_render = rp
-                obj.light_enabled = en
+        apply_light_visibility(
+            (obj, *self._light_backup[obj.name][:2])
+            for obj in bpy.data.objects
+            if obj.type == 'LIGHT' and obj.name in self._light_backup
+        )
 
         # Restore emissive sockets
         for ident, val in self._material_backup.items():
@@ -125,23 +148,14 @@ class UnifiedOnOffManager:
             node = mat.node_tree.nodes.get(node_name)
             if not node:
                 continue
-            strength_socket = node.inputs.get("Strength") or node.inputs.get("Emission Strength")
+            strength_socket = emission_toggle_socket(node)
             if strength_socket:
                 strength_socket.default_value = val
 
-        # Restore world links
+        # Restore world factors
         world = bpy.context.scene.world
-        if world and world.use_nodes:
-            nt = world.node_tree
-            output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
-            if output:
-                for name, (from_n, from_s) in self._env_backup.items():
-                    src = nt.nodes.get(from_n)
-                    dst = output.inputs.get(name)
-                    if src and dst and not dst.is_linked:
-                        out_sock = src.outputs.get(from_s)
-                        if out_sock:
-                            nt.links.new(out_sock, dst)
+        for name, factor in self._env_backup.items():
+            set_environment_factor(world, name, factor)
 
         # Clear backups
         self._light_backup.clear()
@@ -159,6 +173,13 @@ class UnifiedIsolateMode:
     ENVIRONMENT_SURFACE = "ENVIRONMENT_SURFACE"
     ENVIRONMENT_VOLUME = "ENVIRONMENT_VOLUME"
 
+# World output inputs left on by each environment isolate mode.
+ENV_ISOLATE_SOCKETS = {
+    UnifiedIsolateMode.ENVIRONMENT: ("Surface", "Volume"),
+    UnifiedIsolateMode.ENVIRONMENT_SURFACE: ("Surface",),
+    UnifiedIsolateMode.ENVIRONMENT_VOLUME: ("Volume",),
+}
+
 class UnifiedIsolateManager:
     def __init__(self):
         self._backup = {}
@@ -185,25 +206,25 @@ class UnifiedIsolateManager:
         self._active_mode = mode
         self._active_identifier = identifier
 
+        # Gates go in before the backup, so it records gate factors.
+        if context.scene.light_editor_emission_gates:
+            for obj, mat, node in find_emissive_objects(context):
+                install_emission_gate(mat, node)
+
         # Initialize backup for all relevant states
         for obj in context.view_layer.objects:
             if obj.type == 'LIGHT':
                 self._backup[obj.name] = (obj.hide_viewport, obj.hide_render)
         for obj, mat, node in find_emissive_objects(context):
             key = (mat.name, node.name)
-            s = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+            s = emission_toggle_socket(node)
             if s:
                 self._backup[key] = s.default_value
         world = context.scene.world
-        if world and world.use_nodes:
-            nt = world.node_tree
-            output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
-            if output:
-                for name in ("Surface", "Volume"):
-                    sock = output.inputs.get(name)
-                    if sock and sock.is_linked and sock.links:
-                        link = sock.links[0]
-                        self._backup[f"env_link_{name}"] = (link.from_node.name, link.from_socket.name)
+        for name in ENV_SOCKETS:
+            control = install_environment_control(world, name)
+            if control:
+                self._backup[f"env_factor_{name}"] = control.inputs[0].default_value
 
         # Turn everything off except the one we're isolating
         _unified_on_off_manager.force_all_off(context, except_mode=mode, except_identifier=identifier)
@@ -219,28 +240,19 @@ class UnifiedIsolateManager:
             _, node_name = identifier if identifier else (None, None)
             for obj, mat, node in find_emissive_objects(context):
                 if (mat.name, node.name) == identifier:
-                    s = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+                    s = emission_toggle_socket(node)
                     if s:
                         s.default_value = self._backup[(mat.name, node.name)]
-        elif mode == UnifiedIsolateMode.ENVIRONMENT:
-            world = context.scene.world
-            if world and world.use_nodes:
-                nt = world.node_tree
-                output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
-                if output:
-                    for name in ("Surface", "Volume"):
-                        if f"env_link_{name}" in self._backup:
-                            from_node_name, from_socket_name = self._backup[f"env_link_{name}"]
-                            from_node = nt.nodes.get(from_node_name)
-                            from_socket = from_node.outputs.get(from_socket_name) if from_node else None
-                            to_socket = output.inputs.get(name)
-                            if from_socket and to_socket and not to_socket.is_linked:
-                                nt.links.new(from_socket, to_socket)
+        elif mode in ENV_ISOLATE_SOCKETS:
+            for name in ENV_ISOLATE_SOCKETS[mode]:
+                if f"env_factor_{name}" in self._backup:
+                    set_environment_factor(world, name, self._backup[f"env_factor_{name}"])
 
         self._redraw_areas(context)
 
     def deactivate(self, context):
         # Restore everything from backup
+        light_changes = []
         for key, val in self._backup.items():
             if isinstance(key, tuple):  # Emissive nodes
                 mat_name, node_name = key
@@ -248,27 +260,16 @@ class UnifiedIsolateManager:
                 if mat and mat.use_nodes:
                     node = mat.node_tree.nodes.get(node_name)
                     if node:
-                        s = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+                        s = emission_toggle_socket(node)
                         if s:
                             s.default_value = val
-            elif key.startswith("env_link_"):  # Environment links
-                world = context.scene.world
-                if world and world.use_nodes:
-                    nt = world.node_tree
-                    output = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
-                    if output:
-                        socket_name = key.replace("env_link_", "")
-                        from_node_name, from_socket_name = val
-                        from_node = nt.nodes.get(from_node_name)
-                        from_socket = from_node.outputs.get(from_socket_name) if from_node else None
-                        to_socket = output.inputs.get(socket_name)
-                        if from_socket and to_socket and not to_socket.is_linked:
-                            nt.links.new(from_socket, to_socket)
+            elif key.startswith("env_factor_"):  # Environment controls
+                set_environment_factor(context.scene.world, key[len("env_factor_"):], val)
             else:  # Lights
                 obj = bpy.data.objects.get(key)
                 if obj and obj.type == 'LIGHT':
-                    obj.hide_viewport, obj.hide_render = val
-                    obj.light_enabled = not (val[0] and val[1])
+                    light_changes.append((obj, *val))
+        apply_light_visibility(light_changes)
 
         self._backup.clear()
         self._active_mode = None
@@ -280,12 +281,41 @@ _unified_isolate_manager = UnifiedIsolateManager()
 _unified_on_off_manager = UnifiedOnOffManager()
 
 
+def layer_key(view_layer):
+    """Key of a view layer's partition in the per-layer caches."""
+    return (view_layer.id_data.name, view_layer.name)
+
+def activate_layer_state(view_layer):
+    """Point the module-level UI state dicts at ``view_layer``'s own set."""
+    global _active_layer_key
+    key = layer_key(view_layer)
+    if key == _active_layer_key:
+        return
+    state = _layer_states.get(key)
+    if state is None:
+        # The first layer seen adopts whatever state was built up before.
+        g = globals()
+        state = {name: (g[name] if _active_layer_key is None else {}) for name in LAYER_STATE_NAMES}
+        _layer_states[key] = state
+    globals().update(state)
+    _active_layer_key = key
+
+def reset_layer_states():
+    """Drop every layer's UI state, e.g. when a different file is loaded."""
+    global _active_layer_key
+    _layer_states.clear()
+    _active_layer_key = None
+    globals().update({name: {} for name in LAYER_STATE_NAMES})
+
 def update_render_layer(self, context):
     """Update the context to the selected render layer."""
     selected_layer_name = self.light_editor_selected_render_layer
     view_layer = context.scene.view_layers.get(selected_layer_name)
     if view_layer and context.window.view_layer != view_layer:
         context.window.view_layer = view_layer
+    if view_layer:
+        activate_layer_state(view_layer)
+        schedule_layer_prefetch()
 
 def get_render_layer_items(self, context):
     """Generate items for the render layer enum property."""
@@ -327,6 +357,51 @@ def update_light_enabled(self, context):
     if self.hide_render != hidden:
         self.hide_render = hidden
 
+@contextmanager
+def bulk_light_update():
+    """Suppress update_light_enabled() for a batch of visibility writes.
+
+    Group operators write dozens of lights in a row; letting each
+    light_enabled write fire its update callback doubles every hide flag
+    write. Inside this block the caller owns all three flags.
+    """
+    global _syncing_visibility
+    previous = _syncing_visibility
+    _syncing_visibility = True
+    try:
+        yield
+    finally:
+        _syncing_visibility = previous
+
+def apply_light_visibility(changes):
+    """Apply (obj, hide_viewport, hide_render) triples as a single batch.
+
+    Only flags that actually differ are written, and light_enabled is
+    reconciled once per object from the final flags using the same rule as
+    the depsgraph handler, so the handler finds nothing left to do. Returns
+    the number of objects that changed.
+    """
+    changed = 0
+    with bulk_light_update():
+        for obj, hide_viewport, hide_render in changes:
+            hide_viewport, hide_render = bool(hide_viewport), bool(hide_render)
+            enabled = not (hide_viewport or hide_render)
+            if (obj.hide_viewport == hide_viewport and obj.hide_render == hide_render
+                    and obj.light_enabled == enabled):
+                continue
+            if obj.hide_viewport != hide_viewport:
+                obj.hide_viewport = hide_viewport
+            if obj.hide_render != hide_render:
+                obj.hide_render = hide_render
+            if obj.light_enabled != enabled:
+                obj.light_enabled = enabled
+            changed += 1
+    return changed
+
+def set_lights_enabled(objs, enabled):
+    """Turn many lights on or off at once (both viewport and render)."""
+    return apply_light_visibility((obj, not enabled, not enabled) for obj in objs)
+
 def update_light_turn_off_others(self, context):
     global group_checkbox_2_state, emissive_isolate_icon_state
     scene = context.scene
@@ -389,13 +464,18 @@ def get_all_collections(obj):
             all_collections.add(" > ".join(path))
     return sorted(all_collections)
 
-def find_emissive_objects(context, search_objects=None):
-    """Find all objects with emissive materials, including all reachable emissive nodes."""
+def find_emissive_objects(context, search_objects=None, view_layer=None):
+    """Find all objects with emissive materials, including all reachable emissive nodes.
+
+    Results are cached per (scene, view layer), so any layer can be scanned
+    ahead of time by passing it as ``view_layer``.
+    """
     global emissive_material_cache
 
-    objects_to_search = search_objects if search_objects is not None else context.view_layer.objects
+    view_layer = view_layer or context.view_layer
+    objects_to_search = search_objects if search_objects is not None else view_layer.objects
     use_cache = (search_objects is None)
-    cache_key = f"{context.view_layer.name}_{len(bpy.data.materials)}_{len(bpy.data.objects)}" if use_cache else None
+    cache_key = (*layer_key(view_layer), len(bpy.data.materials), len(bpy.data.objects)) if use_cache else None
 
     if use_cache and cache_key in emissive_material_cache:
         return emissive_material_cache[cache_key]
@@ -436,14 +516,329 @@ def find_emissive_objects(context, search_objects=None):
                 emissive_objs.append((obj, mat, node))
 
     if use_cache:
-        if not emissive_objs:
-            if cache_key in emissive_material_cache:
-                del emissive_material_cache[cache_key]
-        else:
-            emissive_material_cache[cache_key] = emissive_objs
+        # Empty results are cached too: a layer without emissives shouldn't
+        # be rescanned on every redraw.
+        emissive_material_cache[cache_key] = emissive_objs
 
     return emissive_objs
 
+# Update types that can change which objects are emissive: a new node link or
+# material slot assignment. Transforms, view layer switches and light edits
+# leave every layer's emissive scan valid.
+_EMISSIVE_ID_TYPES = (bpy.types.Material, bpy.types.NodeTree, bpy.types.Collection)
+
+def prefetch_layer_caches():
+    """Timer: fill the caches of view layers that aren't on screen, one per tick.
+
+    Runs on the main thread (bpy isn't thread safe) but in small steps, so a
+    later switch to any of these layers draws from warm caches.
+    """
+    try:
+        scene = bpy.context.scene
+        window = bpy.context.window
+        active = window.view_layer if window else bpy.context.view_layer
+    except AttributeError:
+        return None
+    if scene is None:
+        return None
+    for view_layer in scene.view_layers:
+        if view_layer == active:
+            continue
+        key = (*layer_key(view_layer), len(bpy.data.materials), len(bpy.data.objects))
+        if key not in emissive_material_cache:
+            find_emissive_objects(bpy.context, view_layer=view_layer)
+            return 0.05
+    return None
+
+def schedule_layer_prefetch():
+    """Queue prefetch_layer_caches unless it's already pending."""
+    if not bpy.app.timers.is_registered(prefetch_layer_caches):
+        bpy.app.timers.register(prefetch_layer_caches, first_interval=0.5)
+
+class LightSpatialIndex:
+    """KD-tree over light world positions for the proximity filter.
+
+    Built once per (scene, view layer); after that the depsgraph handler only
+    reports lights whose transform changed, and just those positions are
+    re-read before the tree is re-balanced. Lights are keyed by session_uid
+    so renaming one doesn't drop it from the filter.
+    """
+    def __init__(self):
+        self._key = None
+        self._uids = []
+        self._names = []
+        self._index = {}
+        self._positions = []
+        self._moved = set()
+        self._tree = None
+
+    def invalidate(self):
+        self._key = None
+
+    def mark_moved(self, uid):
+        if uid in self._index:
+            self._moved.add(uid)
+
+    def _ensure(self, context):
+        # Same cheap structure signature as the emissive cache: adding or
+        # deleting objects changes the counts and forces a full rebuild.
+        key = (*layer_key(context.view_layer), len(bpy.data.objects), len(bpy.data.lights))
+        if key != self._key:
+            lights = [obj for obj in context.view_layer.objects if obj.type == 'LIGHT']
+            self._uids = [obj.session_uid for obj in lights]
+            self._names = [obj.name for obj in lights]
+            self._index = {uid: i for i, uid in enumerate(self._uids)}
+            self._positions = [obj.matrix_world.translation.copy() for obj in lights]
+            self._moved.clear()
+            self._tree = None
+            self._key = key
+        elif self._moved:
+            objects = context.view_layer.objects
+            for uid in self._moved:
+                i = self._index[uid]
+                obj = objects.get(self._names[i])
+                if obj is None or obj.session_uid != uid:
+                    # Renamed since the last build: fall back to a full rebuild.
+                    self._key = None
+                    return self._ensure(context)
+                self._positions[i] = obj.matrix_world.translation.copy()
+            self._moved.clear()
+            self._tree = None
+        if self._tree is None:
+            tree = KDTree(len(self._positions))
+            for i, co in enumerate(self._positions):
+                tree.insert(co, i)
+            tree.balance()
+            self._tree = tree
+
+    def find_range(self, context, centers, radius):
+        """Return the session_uids of lights within ``radius`` of any center."""
+        self._ensure(context)
+        found = set()
+        for center in centers:
+            for _co, i, _dist in self._tree.find_range(center, radius):
+                found.add(self._uids[i])
+        return found
+
+# One index per (scene, view layer), so switching layers doesn't throw the
+# other layer's tree away.
+_light_spatial_indices = {}
+
+def spatial_index_for(view_layer):
+    return _light_spatial_indices.setdefault(layer_key(view_layer), LightSpatialIndex())
+
+def get_proximity_centers(context):
+    """World-space centers for the current proximity filter mode."""
+    scene = context.scene
+    mode = scene.light_editor_proximity
+    if mode == 'SELECTION':
+        return [obj.matrix_world.translation for obj in context.selected_objects]
+    if mode == 'CURSOR':
+        return [scene.cursor.location]
+    if mode == 'CAMERA' and scene.camera:
+        return [scene.camera.matrix_world.translation]
+    return []
+
+def get_nearby_lights(context):
+    """session_uids of lights passing the proximity and light-linking filters,
+    or None when both are off."""
+    scene = context.scene
+    nearby = None
+    if getattr(scene, "light_editor_proximity", 'OFF') != 'OFF':
+        centers = get_proximity_centers(context)
+        nearby = (spatial_index_for(context.view_layer).find_range(context, centers, scene.light_editor_proximity_radius)
+                  if centers else set())
+    if getattr(scene, "light_editor_affecting_active", False):
+        active = context.view_layer.objects.active
+        if active is None:
+            return set()
+        from .Linking import lights_affecting
+        names = lights_affecting(active, scene)
+        linked = {obj.session_uid for obj in context.view_layer.objects if obj.name in names}
+        nearby = linked if nearby is None else nearby & linked
+    return nearby
+
+# --- Group registry ---
+# Every group header the panel draws is recorded here with the members it
+# resolved to, so the group operators act on exactly what the panel showed
+# instead of slicing the group_key apart and rescanning the scene. Groups
+# are kept per view layer and dropped when objects or materials are added or
+# removed; a key that isn't registered is resolved on demand. A group holds
+# names and session_uids only, never ID references: each member is looked up
+# by name in the view layer when an operator runs and kept only if its
+# session_uid still matches (as LightSpatialIndex does), so an object deleted
+# or renamed since the last draw is skipped instead of handed out freed.
+class LightGroup:
+    """Members of one Light Editor group: lights and emitters by session_uid."""
+    __slots__ = ("key", "collection", "uids", "names", "lights", "emitters", "materials", "selection")
+
+    def __init__(self, key, lights=(), emissive_pairs=(), collection=None):
+        self.key = key
+        self.collection = collection  # collection name for "coll_" groups
+        self.uids = set()
+        self.names = {}  # session_uid -> object name
+        self.lights = []
+        self.emitters = []
+        self.materials = set()  # material names
+        self.selection = None  # (selection generation, selected member count)
+        for obj in lights:
+            self.uids.add(obj.session_uid)
+            self.names[obj.session_uid] = obj.name
+            self.lights.append(obj.session_uid)
+        for obj, mat, node in emissive_pairs:
+            if obj.session_uid not in self.uids:
+                self.uids.add(obj.session_uid)
+                self.names[obj.session_uid] = obj.name
+                self.emitters.append(obj.session_uid)
+            self.materials.add(mat.name)
+
+    def _resolve(self, view_layer, uids):
+        objects = view_layer.objects
+        found = []
+        for uid in uids:
+            obj = objects.get(self.names[uid])
+            if obj is not None and obj.session_uid == uid:
+                found.append(obj)
+        return found
+
+    def light_objects(self, view_layer):
+        return self._resolve(view_layer, self.lights)
+
+    def emitter_objects(self, view_layer):
+        return self._resolve(view_layer, self.emitters)
+
+    def members(self, view_layer):
+        return self._resolve(view_layer, self.lights + self.emitters)
+
+    def material_datablocks(self):
+        return [mat for mat in map(bpy.data.materials.get, sorted(self.materials)) if mat]
+
+# {layer_key: (signature, {group_key: LightGroup})}
+_group_registry = {}
+
+def _registry_signature():
+    return (len(bpy.data.objects), len(bpy.data.materials))
+
+def _layer_groups(view_layer):
+    key = layer_key(view_layer)
+    signature = _registry_signature()
+    entry = _group_registry.get(key)
+    if entry is None or entry[0] != signature:
+        entry = _group_registry[key] = (signature, {})
+    return entry[1]
+
+def register_group(view_layer, key, lights=(), emissive_pairs=(), collection=None):
+    """Record the members a group header was drawn with; returns the group."""
+    group = LightGroup(key, lights, emissive_pairs, collection)
+    groups = _layer_groups(view_layer)
+    previous = groups.get(key)
+    if previous is not None and previous.uids == group.uids:
+        group.selection = previous.selection
+    groups[key] = group
+    return group
+
+# Groups whose membership follows the selection. The registry can't tell
+# when the selection changed without a redraw, so these are always resolved.
+SELECTION_GROUP_KEYS = {"", "selected_lights", "not_selected_lights", "selected_emissives", "not_selected_emissives"}
+
+def get_group(context, key):
+    """The group ``key`` as last drawn in this view layer, or resolved now."""
+    if key in SELECTION_GROUP_KEYS:
+        return resolve_group(context, key)
+    group = _layer_groups(context.view_layer).get(key)
+    return group if group is not None else resolve_group(context, key)
+
+def resolve_group(context, key):
+    """Build a group from its key with the panel's filters applied.
+
+    Only needed for groups the panel hasn't drawn (e.g. when it is closed).
+    An empty key means the selected lights.
+    """
+    filter_str = context.scene.light_editor_filter.lower()
+    lights = [obj for obj in context.view_layer.objects
+              if obj.type == 'LIGHT' and (not filter_str or re.search(filter_str, obj.name, re.I))]
+    nearby = get_nearby_lights(context)
+    if nearby is not None:
+        lights = [obj for obj in lights if obj.session_uid in nearby]
+    pairs = [(o, m, n) for o, m, n in find_emissive_objects(context)
+             if not filter_str or re.search(filter_str, o.name, re.I) or re.search(filter_str, m.name, re.I)]
+
+    def unassigned(obj):
+        return len(obj.users_collection) == 1 and obj.users_collection[0].name == "Scene Collection"
+
+    selected = selected_uids(context.view_layer)
+    if not key or key == "selected_lights":
+        return LightGroup(key, [obj for obj in lights if obj.session_uid in selected])
+    if key == "not_selected_lights":
+        return LightGroup(key, [obj for obj in lights if obj.session_uid not in selected])
+    if key == "selected_emissives":
+        return LightGroup(key, emissive_pairs=[p for p in pairs if p[0].session_uid in selected])
+    if key == "not_selected_emissives":
+        return LightGroup(key, emissive_pairs=[p for p in pairs if p[0].session_uid not in selected])
+    if key == "all_lights_alpha":
+        return LightGroup(key, lights)
+    if key in ("all_emissives_alpha", "kind_EMISSIVE"):
+        return LightGroup(key, emissive_pairs=pairs)
+    if key.startswith("kind_"):
+        return LightGroup(key, [obj for obj in lights if obj.data.type == key[5:]])
+    if key == "coll_No Collection":
+        return LightGroup(key, [obj for obj in lights if unassigned(obj)],
+                          [p for p in pairs if unassigned(p[0])])
+    if key.startswith("coll_"):
+        collection = bpy.data.collections.get(key[5:])
+        if not collection:
+            return LightGroup(key)
+        members = set(collection.all_objects)
+        return LightGroup(key, [obj for obj in lights if obj in members],
+                          [p for p in pairs if collection in p[0].users_collection[:]],
+                          collection=collection.name)
+    return LightGroup(key)
+
+# --- Selection cache ---
+# The selected session_uids of each view layer, dropped whenever the
+# depsgraph or the message bus reports a selection change, plus a selected
+# member count cached on each registered group. A redraw without a selection
+# change then costs one comparison per group header instead of a
+# select_get() per object.
+_selection_generation = 0
+_selected_uids = {}
+_selection_msgbus_owner = object()
+
+def invalidate_selection(*args):
+    global _selection_generation
+    _selection_generation += 1
+    _selected_uids.clear()
+
+def selected_uids(view_layer):
+    """session_uids of the objects selected in ``view_layer``."""
+    key = layer_key(view_layer)
+    uids = _selected_uids.get(key)
+    if uids is None:
+        uids = _selected_uids[key] = frozenset(obj.session_uid for obj in view_layer.objects.selected)
+    return uids
+
+def is_group_selected(view_layer, group):
+    """True if every member of ``group`` is selected."""
+    if not group.uids:
+        return False
+    if group.selection is None or group.selection[0] != _selection_generation:
+        count = len(selected_uids(view_layer).intersection(group.uids))
+        group.selection = (_selection_generation, count)
+    return group.selection[1] == len(group.uids)
+
+def subscribe_selection_changes():
+    """Drop the selection cache when the active object changes.
+
+    Subscriptions don't survive loading a file, so this runs again on load.
+    """
+    bpy.msgbus.clear_by_owner(_selection_msgbus_owner)
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.LayerObjects, "active"),
+        owner=_selection_msgbus_owner,
+        args=(),
+        notify=invalidate_selection,
+    )
+
 
 class LE_OT_ShowNodes(bpy.types.Operator):
     """Open this node tree in a Shader Editor"""
@@ -499,11 +894,7 @@ def draw_emissive_row(box, obj, mat, emissive_nodes):
     collapsed = group_collapse_dict.get(group_key, False)
 
     # --- Toggle & Isolate (header) ---
-    enabled = any(
-        (n.inputs.get("Strength") or n.inputs.get("Emission Strength")).default_value > 0 or
-        (n.inputs.get("Strength") or n.inputs.get("Emission Strength")).is_linked
-        for n in emissive_nodes
-    )
+    enabled = any(emission_enabled(n) for n in emissive_nodes)
     icon = 'OUTLINER_OB_LIGHT' if enabled else 'LIGHT_DATA'
     op_toggle = row.operator("le.toggle_emission", text="", icon=icon, depress=enabled)
     op_toggle.mat_name = mat.name
@@ -528,7 +919,7 @@ def draw_emissive_row(box, obj, mat, emissive_nodes):
 
     # Determine if single-node linked case
     color_input    = first_node.inputs.get("Color") if first_node.type == 'EMISSION' else first_node.inputs.get("Emission Color")
-    strength_input = first_node.inputs.get("Strength") if first_node.type == 'EMISSION' else first_node.inputs.get("Emission Strength")
+    strength_input = emission_strength_socket(first_node)
     linked_case = (not multiple_nodes) and ((color_input and color_input.is_linked) or (strength_input and strength_input.is_linked))
 
     # --- Header columns: equal for multi-node or linked single-node ---
@@ -582,10 +973,10 @@ def draw_emissive_row(box, obj, mat, emissive_nodes):
             sub_row = sub_box.row(align=True)
             sub_row.label(text="", icon='BLANK1')
 
-            s_in = subnode.inputs.get("Strength") if subnode.type == 'EMISSION' else subnode.inputs.get("Emission Strength")
-            val = s_in.default_value if s_in else 0.0
-            ico = 'OUTLINER_OB_LIGHT' if (s_in and (s_in.is_linked or val > 0)) else 'LIGHT_DATA'
-            op_n = sub_row.operator("le.toggle_emission", text="", icon=ico, depress=(val > 0))
+            s_in = emission_strength_socket(subnode)
+            on = emission_enabled(subnode)
+            ico = 'OUTLINER_OB_LIGHT' if on else 'LIGHT_DATA'
+            op_n = sub_row.operator("le.toggle_emission", text="", icon=ico, depress=on)
             op_n.mat_name  = mat.name
             op_n.node_name = subnode.name
 
@@ -756,108 +1147,164 @@ def draw_extra_params(self, box, obj, light):
 
 
 
+# --- Managed environment controls ---
+# Same idea as the emission gates below, for the world: a Mix Shader sits
+# between each World Output input and the shader that fed it. The world's own
+# shader goes into the second shader input and the first stays empty, so Fac
+# 1 is on and 0 is off. Switching or isolating the environment is then a
+# value write instead of removing and re-adding links, which made EEVEE
+# recompile the world and Cycles rebuild its light tree on every click, and
+# the state lives in the .blend instead of in module globals.
+ENV_CONTROL_PREFIX = "LE Environment: "
+ENV_CONTROL_LABEL = "Light Editor Environment"
+ENV_SOCKETS = ("Surface", "Volume")
+# Factors saved by the header toggle, so switching back on restores them.
+ENV_SAVED_PROP = "le_environment_saved"
+
+def world_output(world):
+    """The world's active World Output node, or None."""
+    if not world or not world.use_nodes or not world.node_tree:
+        return None
+    outputs = [n for n in world.node_tree.nodes if n.type == 'OUTPUT_WORLD']
+    return next((n for n in outputs if n.is_active_output), outputs[0] if outputs else None)
+
+def environment_control(world, name):
+    """The managed control feeding the World Output's ``name`` input, or None."""
+    output = world_output(world)
+    socket = output.inputs.get(name) if output else None
+    if not socket or not socket.is_linked:
+        return None
+    source = socket.links[0].from_node
+    if source.bl_idname == 'ShaderNodeMixShader' and source.label == ENV_CONTROL_LABEL:
+        return source
+    return None
+
+def environment_source(world, name):
+    """The socket the world's own ``name`` shader is plugged into."""
+    control = environment_control(world, name)
+    if control:
+        return control.inputs[2]
+    output = world_output(world)
+    return output.inputs.get(name) if output else None
+
+def environment_factor(world, name):
+    """Control factor of ``name``; 1 for a linked input without a control."""
+    control = environment_control(world, name)
+    if control:
+        return control.inputs[0].default_value
+    socket = environment_source(world, name)
+    return 1.0 if socket and socket.is_linked else 0.0
+
+def environment_enabled(world, name):
+    """True if ``name`` has a shader and its control is open."""
+    socket = environment_source(world, name)
+    return bool(socket and socket.is_linked) and environment_factor(world, name) > 0
+
+def environment_is_on(world):
+    return any(environment_enabled(world, name) for name in ENV_SOCKETS)
+
+def install_environment_control(world, name):
+    """Insert the control in front of the World Output's ``name`` input (once).
+
+    Returns the control, or None when the input has nothing to switch or the
+    world is linked from a library.
+    """
+    control = environment_control(world, name)
+    output = world_output(world)
+    socket = output.inputs.get(name) if output else None
+    if control or not socket or not socket.is_linked or world.library:
+        return control
+    nt = world.node_tree
+    from_socket = socket.links[0].from_socket
+    control = nt.nodes.new('ShaderNodeMixShader')
+    control.name = ENV_CONTROL_PREFIX + name
+    control.label = ENV_CONTROL_LABEL
+    control.parent = output.parent
+    control.location = (output.location.x - 180, output.location.y - 60 * ENV_SOCKETS.index(name))
+    control.hide = True
+    control.inputs[0].default_value = 1.0
+    nt.links.new(from_socket, control.inputs[2])
+    nt.links.new(control.outputs[0], socket)
+    return control
+
+def set_environment_factor(world, name, factor):
+    """Write the control factor of ``name``; False if there is nothing to switch."""
+    control = install_environment_control(world, name)
+    if not control:
+        return False
+    if control.inputs[0].default_value != factor:
+        control.inputs[0].default_value = factor
+    return True
+
+def environment_link(world, name):
+    """``"node\tsocket"`` of the shader feeding ``name``, or "" when it is off."""
+    socket = environment_source(world, name)
+    if not socket or not socket.is_linked or environment_factor(world, name) <= 0:
+        return ""
+    link = socket.links[0]
+    return f"{link.from_node.name}\t{link.from_socket.name}"
+
+def set_environment_link(world, name, stored):
+    """Match ``name`` to a stored environment_link() value; True if it changed.
+
+    Switching off only closes the control; a different shader is linked in
+    behind it.
+    """
+    if environment_link(world, name) == stored:
+        return False
+    if not stored:
+        return set_environment_factor(world, name, 0.0)
+    socket = environment_source(world, name)
+    if not socket:
+        return False
+    link = socket.links[0] if socket.is_linked else None
+    if not link or f"{link.from_node.name}\t{link.from_socket.name}" != stored:
+        node_name, socket_name = stored.split("\t", 1)
+        from_node = world.node_tree.nodes.get(node_name)
+        from_socket = from_node.outputs.get(socket_name) if from_node else None
+        if not from_socket:
+            return False
+        world.node_tree.links.new(from_socket, socket)
+    set_environment_factor(world, name, 1.0)
+    return True
+
 class LE_OT_ToggleEnvironment(bpy.types.Operator):
     """Toggle the environment lighting on/off."""
     bl_idname = "le.toggle_environment"
     bl_label = "Toggle Environment Lighting"
 
     def execute(self, context):
-        global environment_checkbox_state, _surface_link_backup, _volume_link_backup
         world = context.scene.world
-        if not world or not world.use_nodes:
-            self.report({'WARNING'}, "No world or world shader found")
-            return {'CANCELLED'}
-        nt = world.node_tree
-        background_node = next((n for n in nt.nodes if n.type == 'BACKGROUND'), None)
-        if not background_node:
-            self.report({'WARNING'}, "No Background node found in world shader")
+        if not world_output(world):
+            self.report({'WARNING'}, "No world with a World Output node found")
             return {'CANCELLED'}
-        strength_input = background_node.inputs.get("Strength")
-        if not strength_input:
-            self.report({'WARNING'}, "Background node has no Strength input")
+        if world.library:
+            self.report({'WARNING'}, f"World {world.name} is linked from a library")
             return {'CANCELLED'}
-        output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
-        if not output_node:
-            self.report({'WARNING'}, "No World Output node found")
-            return {'CANCELLED'}
-        is_on = environment_checkbox_state.get('environment', True)
-        if is_on:
-            # Store current state and disable
-            world['original_environment_strength'] = strength_input.default_value
-            strength_input.default_value = 0.0
-            # Disconnect Surface and Volume inputs
-            for socket_name in ("Surface", "Volume"):
-                socket = output_node.inputs.get(socket_name)
-                if socket and socket.is_linked and socket.links:
-                    try:
-                        link = socket.links[0]
-                        if link.is_valid:
-                            if socket_name == "Surface":
-                                _surface_link_backup = (link.from_node.name, link.from_socket.name)
-                            else:
-                                _volume_link_backup = (link.from_node.name, link.from_socket.name)
-                            nt.links.remove(link)
-                    except Exception as e:
-                        self.report({'WARNING'}, f"Failed to remove link for {socket_name}: {e}")
+        if environment_is_on(world):
+            world[ENV_SAVED_PROP] = {name: environment_factor(world, name) for name in ENV_SOCKETS}
+            for name in ENV_SOCKETS:
+                set_environment_factor(world, name, 0.0)
         else:
-            # Restore state
-            restored_strength = world.get('original_environment_strength', 1.0)
-            strength_input.default_value = restored_strength
-            # Reconnect Surface and Volume inputs
-            for socket_name, backup in [("Surface", _surface_link_backup), ("Volume", _volume_link_backup)]:
-                if backup:
-                    node_name, socket_name_from = backup
-                    from_node = nt.nodes.get(node_name)
-                    from_socket = from_node.outputs.get(socket_name_from) if from_node else None
-                    to_socket = output_node.inputs.get(socket_name)
-                    if from_socket and to_socket and not to_socket.is_linked:
-                        try:
-                            nt.links.new(from_socket, to_socket)
-                        except Exception as e:
-                            self.report({'WARNING'}, f"Failed to restore link for {socket_name}: {e}")
-                    # Clear backup after restoration (optional, keeps it clean)
-                    if socket_name == "Surface":
-                        _surface_link_backup = None
-                    else:
-                        _volume_link_backup = None
-        environment_checkbox_state['environment'] = not is_on
+            saved = world.get(ENV_SAVED_PROP) or {}
+            names = [name for name in ENV_SOCKETS if saved.get(name, 0.0) > 0] or ENV_SOCKETS
+            for name in names:
+                set_environment_factor(world, name, saved.get(name) or 1.0)
+            if ENV_SAVED_PROP in world:
+                del world[ENV_SAVED_PROP]
+            # Older versions switched off by zeroing the Background strength.
+            if "original_environment_strength" in world:
+                background = next((n for n in world.node_tree.nodes if n.type == 'BACKGROUND'), None)
+                if background and background.inputs.get("Strength"):
+                    background.inputs["Strength"].default_value = world["original_environment_strength"]
+                del world["original_environment_strength"]
+        environment_checkbox_state['environment'] = environment_is_on(world)
         # Redraw relevant areas
         for area in context.screen.areas:
             if area.type in ('VIEW_3D', 'NODE_EDITOR'):
                 area.tag_redraw()
         return {'FINISHED'}
 
-def execute(self, context):
-    global isolate_env_header_state, isolate_env_surface_state, isolate_env_volume_state
-    global env_isolated_ui_state  # ← ADD THIS
-
-    flag_map = {
-        "HEADER": "isolate_env_header_state",
-        "SURFACE": "isolate_env_surface_state",
-        "VOLUME": "isolate_env_volume_state",
-    }
-    mode_map = {
-        "HEADER": UnifiedIsolateMode.ENVIRONMENT,
-        "SURFACE": UnifiedIsolateMode.ENVIRONMENT_SURFACE,
-        "VOLUME": UnifiedIsolateMode.ENVIRONMENT_VOLUME,
-    }
-
-    unified_mode = mode_map.get(self.mode, UnifiedIsolateMode.ENVIRONMENT)
-    is_currently_active = _unified_isolate_manager.is_active(unified_mode)
-
-    if not is_currently_active:
-        globals()[flag_map[self.mode]] = True
-        if self.mode == "HEADER":
-            env_isolated_ui_state = True  # ← SET TRUE when activated
-        _unified_isolate_manager.activate(context, unified_mode)
-    else:
-        globals()[flag_map[self.mode]] = False
-        if self.mode == "HEADER":
-            env_isolated_ui_state = False  # ← SET FALSE when deactivated
-        _unified_isolate_manager.deactivate(context)
-
-    return {'FINISHED'}
-
 class LE_OT_SelectEnvironment(bpy.types.Operator):
     """Select the environment world in the Shader Editor."""
     bl_idname = "le.select_environment"
@@ -891,115 +1338,182 @@ class LE_OT_SelectGroup(bpy.types.Operator):
     group_key: bpy.props.StringProperty()
 
     def execute(self, context):
-        objects_to_select = []
-        objects_in_group = []
-        deselect_all_flag = False
-        filter_str = context.scene.light_editor_filter.lower()
-
-        # Handle different group types
-        if self.group_key.startswith("coll_"):
-            coll_name = self.group_key[5:]
-            if coll_name == "No Collection":
-                for obj in context.view_layer.objects:
-                    if obj.type == 'LIGHT' or (obj.type == 'MESH' and any(mat in [m for o, m, n in find_emissive_objects(context)] for mat in obj.material_slots)):
-                        objects_in_group.append(obj)
-                        if len(obj.users_collection) == 1 and obj.users_collection[0].name == "Scene Collection":
-                            if (not filter_str or re.search(filter_str, obj.name, re.I)) and (obj.type != 'LIGHT' or obj.light_enabled):
-                                objects_to_select.append(obj)
-            else:
-                collection = bpy.data.collections.get(coll_name)
-                if collection:
-                    for obj in collection.all_objects:
-                        if obj.type == 'LIGHT' or (obj.type == 'MESH' and any(mat in [m for o, m, n in find_emissive_objects(context)] for mat in obj.material_slots)):
-                            objects_in_group.append(obj)
-                            if (not filter_str or re.search(filter_str, obj.name, re.I)) and (obj.type != 'LIGHT' or obj.light_enabled):
-                                objects_to_select.append(obj)
-        elif self.group_key.startswith("kind_"):
-            kind = self.group_key[5:]
-            if kind == "EMISSIVE":
-                for obj, mat, node in find_emissive_objects(context):
-                    if not filter_str or re.search(filter_str, obj.name, re.I) or re.search(filter_str, mat.name, re.I):
-                        objects_in_group.append(obj)
-                        objects_to_select.append(obj)
-            else:
-                for obj in context.view_layer.objects:
-                    if obj.type == 'LIGHT' and obj.data.type == kind:
-                        if obj.light_enabled:
-                            objects_in_group.append(obj)
-                        if (not filter_str or re.search(filter_str, obj.name, re.I)) and obj.light_enabled:
-                            objects_to_select.append(obj)
-        elif self.group_key == "all_lights_alpha":
-            for obj in context.view_layer.objects:
-                if obj.type == 'LIGHT' and obj.light_enabled:
-                    objects_in_group.append(obj)
-                    if not filter_str or re.search(filter_str, obj.name, re.I):
-                        objects_to_select.append(obj)
-        elif self.group_key == "all_emissives_alpha":
-            for obj, mat, node in find_emissive_objects(context):
-                if not filter_str or re.search(filter_str, obj.name, re.I) or re.search(filter_str, mat.name, re.I):
-                    objects_in_group.append(obj)
-                    objects_to_select.append(obj)
-        elif self.group_key == "selected_lights":
-            for obj in context.view_layer.objects:
-                if obj.type == 'LIGHT' and obj.select_get() and obj.light_enabled:
-                    objects_in_group.append(obj)
-                    if not filter_str or re.search(filter_str, obj.name, re.I):
-                        objects_to_select.append(obj)
-        elif self.group_key == "selected_emissives":
-            for obj, mat, node in find_emissive_objects(context):
-                if obj.select_get():
-                    if not filter_str or re.search(filter_str, obj.name, re.I) or re.search(filter_str, mat.name, re.I):
-                        objects_in_group.append(obj)
-                        objects_to_select.append(obj)
-        elif self.group_key == "not_selected_lights":
-            for obj in context.view_layer.objects:
-                if obj.type == 'LIGHT' and not obj.select_get() and obj.light_enabled:
-                    objects_in_group.append(obj)
-                    if not filter_str or re.search(filter_str, obj.name, re.I):
-                        objects_to_select.append(obj)
-        elif self.group_key == "not_selected_emissives":
-            for obj, mat, node in find_emissive_objects(context):
-                if not obj.select_get():
-                    if not filter_str or re.search(filter_str, obj.name, re.I) or re.search(filter_str, mat.name, re.I):
-                        objects_in_group.append(obj)
-                        objects_to_select.append(obj)
-        elif self.group_key == "env_header":
+        if self.group_key == "env_header":
             self.report({'INFO'}, "Selected world: {}".format(context.scene.world.name))
             for area in context.screen.areas:
                 if area.type == 'NODE_EDITOR':
                     area.spaces.active.node_tree = context.scene.world.node_tree
             return {'FINISHED'}
 
-        # --- Determine Action: Select or Deselect All ---
-        selected_objects = [obj for obj in objects_in_group if obj.name in context.view_layer.objects and obj.select_get()]
-        if objects_in_group and all(obj.select_get() for obj in objects_in_group if obj.name in context.view_layer.objects):
-            deselect_all_flag = True
+        # Switched-off lights are left out of both the selection and the check.
+        # Group members always come from this view layer, so they need no
+        # per-object membership test.
+        view_layer = context.view_layer
+        objects = view_layer.objects
+        group = [obj for obj in get_group(context, self.group_key).members(view_layer)
+                 if obj.type != 'LIGHT' or obj.light_enabled]
+
+        # Clicking a fully selected group deselects everything, otherwise the
+        # selection becomes exactly the group. Only objects whose state
+        # differs from that target are touched.
+        selected = context.selected_objects
+        deselect_all = bool(group) and all(obj.select_get() for obj in group)
+        target = set() if deselect_all else set(group)
+        changed = 0
+        for obj in selected:
+            if obj not in target:
+                obj.select_set(False)
+                changed += 1
+        for obj in target:
+            if not obj.select_get():
+                obj.select_set(True)
+                changed += 1
+        if target and objects.active is None:
+            objects.active = group[0]
+        if changed:
+            invalidate_selection()
 
-        # --- Perform Action ---
-        any_selected = False
-        if deselect_all_flag:
-            bpy.ops.object.select_all(action='DESELECT')
+        if deselect_all:
             self.report({'INFO'}, f"Deselected all objects in group: {self.group_key}")
+        elif group:
+            self.report({'INFO'}, f"Selected {len(group)} objects in group: {self.group_key}")
         else:
-            bpy.ops.object.select_all(action='DESELECT')
-            for obj in objects_to_select:
-                if obj.name in context.view_layer.objects:
-                    obj.select_set(True)
-                    any_selected = True
-                    if not context.view_layer.objects.active:
-                        context.view_layer.objects.active = obj
-            if any_selected:
-                self.report({'INFO'}, f"Selected {len(objects_to_select)} objects in group: {self.group_key}")
-            else:
-                self.report({'INFO'}, f"No selectable objects found in group: {self.group_key}")
+            self.report({'INFO'}, f"No selectable objects found in group: {self.group_key}")
 
         # Redraw the UI to update icons
-        for area in context.screen.areas:
-            if area.type in ('VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'):
-                area.tag_redraw()
+        if changed:
+            for area in context.screen.areas:
+                if area.type in ('VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'):
+                    area.tag_redraw()
 
         return {'FINISHED'}
-                        
+
+# --- Managed emission gates ---
+# Alternative to unlinking Strength sockets: a Math (Multiply) node is put in
+# front of an emissive node's strength once. Its first input takes whatever
+# fed the socket before (link or value) and its second input is the on/off/
+# dim factor, so toggling afterwards is a value write that EEVEE and Cycles
+# pick up without recompiling the shader.
+EMISSION_GATE_PREFIX = "LE Gate: "
+EMISSION_GATE_LABEL = "Light Editor Gate"
+
+def _strength_input(node):
+    return node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
+
+def emission_gate(node):
+    """The managed gate node feeding ``node``'s strength, or None."""
+    socket = _strength_input(node)
+    if not socket or not socket.is_linked:
+        return None
+    source = socket.links[0].from_node
+    if source.bl_idname == 'ShaderNodeMath' and source.label == EMISSION_GATE_LABEL:
+        return source
+    return None
+
+def emission_backup_key(mat, node):
+    """Key of a node's strength in _emissive_link_backup[mat.name]."""
+    return f"{mat.name}:{node.name}:Strength"
+
+def emission_strength_socket(node):
+    """The socket carrying a node's strength: the gate's first input when gated."""
+    gate = emission_gate(node)
+    return gate.inputs[0] if gate else _strength_input(node)
+
+def emission_toggle_socket(node):
+    """The socket to zero to switch a node off: the gate factor when gated."""
+    gate = emission_gate(node)
+    return gate.inputs[1] if gate else _strength_input(node)
+
+def emission_enabled(node):
+    """True if the node's gate is open and its strength is linked or positive."""
+    gate = emission_gate(node)
+    socket = gate.inputs[0] if gate else _strength_input(node)
+    if not socket or (gate and gate.inputs[1].default_value <= 0):
+        return False
+    return socket.is_linked or socket.default_value > 0
+
+def install_emission_gate(mat, node):
+    """Insert the gate in front of ``node``'s strength (once); returns the gate."""
+    gate = emission_gate(node)
+    socket = _strength_input(node)
+    if gate or not socket or mat.library:
+        return gate
+    nt = mat.node_tree
+    gate = nt.nodes.new('ShaderNodeMath')
+    gate.operation = 'MULTIPLY'
+    gate.name = EMISSION_GATE_PREFIX + node.name
+    gate.label = EMISSION_GATE_LABEL
+    gate.parent = node.parent
+    gate.location = (node.location.x - 180, node.location.y - 120)
+    gate.hide = True
+    gate.inputs[1].default_value = 1.0
+    if socket.is_linked:
+        nt.links.new(socket.links[0].from_socket, gate.inputs[0])
+    else:
+        gate.inputs[0].default_value = socket.default_value
+    nt.links.new(gate.outputs[0], socket)
+    return gate
+
+def set_emission_gates(mat, nodes, factor):
+    """Write the gate factor of ``nodes``, installing gates where missing."""
+    for node in nodes:
+        gate = install_emission_gate(mat, node)
+        if gate and gate.inputs[1].default_value != factor:
+            gate.inputs[1].default_value = factor
+
+def remove_emission_gate(mat, node):
+    """Take a gate out again, restoring the original link or value.
+
+    A dimmed gate is baked into an unlinked value; a closed gate leaves the
+    socket off the legacy way (backed up in _emissive_link_backup) so the
+    regular toggle can still turn it back on. A dimmed linked strength
+    can't be kept without a node and comes back at full strength.
+    """
+    gate = emission_gate(node)
+    if gate is None:
+        return False
+    nt = mat.node_tree
+    socket = _strength_input(node)
+    source = gate.inputs[0]
+    from_socket = source.links[0].from_socket if source.is_linked else None
+    value = source.default_value
+    factor = gate.inputs[1].default_value
+    nt.nodes.remove(gate)
+    if factor <= 0:
+        store = _emissive_link_backup.setdefault(mat.name, {})
+        store[emission_backup_key(mat, node)] = ('LINK', from_socket.node.name, from_socket.name) if from_socket else ('VALUE', value)
+        socket.default_value = 0
+    elif from_socket:
+        nt.links.new(from_socket, socket)
+    else:
+        socket.default_value = value * factor
+    return True
+
+def remove_all_emission_gates():
+    """Uninstall every managed gate; returns the number removed."""
+    removed = 0
+    for mat in bpy.data.materials:
+        if not mat.use_nodes or not mat.node_tree or mat.library:
+            continue
+        for node in [n for n in mat.node_tree.nodes if n.type in {'EMISSION', 'BSDF_PRINCIPLED'}]:
+            removed += remove_emission_gate(mat, node)
+    return removed
+
+def update_emission_gates(self, context):
+    if not self.light_editor_emission_gates:
+        remove_all_emission_gates()
+
+class LE_OT_RemoveEmissionGates(bpy.types.Operator):
+    """Remove the gate nodes added for topology-free emission toggling"""
+    bl_idname = "le.remove_emission_gates"
+    bl_label = "Remove Emission Gates"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        removed = remove_all_emission_gates()
+        self.report({'INFO'}, f"Removed {removed} emission gate(s)")
+        return {'FINISHED'}
+
 class LE_OT_ToggleEmission(bpy.types.Operator):
     bl_idname = "le.toggle_emission"
     bl_label = "Toggle Emission"
@@ -1033,6 +1547,14 @@ class LE_OT_ToggleEmission(bpy.types.Operator):
                 self.report({'WARNING'}, f"No emissive nodes found in material {self.mat_name}")
                 return {'CANCELLED'}
 
+        if context.scene.light_editor_emission_gates:
+            is_on = any(emission_enabled(n) for n in nodes_to_toggle)
+            set_emission_gates(mat, nodes_to_toggle, 0.0 if is_on else 1.0)
+            for area in context.screen.areas:
+                if area.type in {'VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'}:
+                    area.tag_redraw()
+            return {'FINISHED'}
+
         # Initialize backup storage
         if mat.name not in _emissive_link_backup:
             _emissive_link_backup[mat.name] = {}
@@ -1049,7 +1571,7 @@ class LE_OT_ToggleEmission(bpy.types.Operator):
             strength_socket = node.inputs.get("Strength") if node.type == 'EMISSION' else node.inputs.get("Emission Strength")
             if not strength_socket:
                 continue
-            key = f"{mat.name}:{node.name}:Strength"
+            key = emission_backup_key(mat, node)
             if is_on:
                 # Turn off: store state and set to 0
                 if strength_socket.is_linked and strength_socket.links:
@@ -1138,6 +1660,7 @@ class LE_OT_isolate_emissive(bpy.types.Operator):
 class EMISSIVE_OT_ToggleGroupAllOff(bpy.types.Operator):
     bl_idname = "light_editor.toggle_group_emissive_all_off"
     bl_label = "Toggle Emissive Group On/Off"
+    bl_options = {'UNDO'}
 
     group_key: StringProperty()
 
@@ -1145,26 +1668,9 @@ class EMISSIVE_OT_ToggleGroupAllOff(bpy.types.Operator):
         global group_mat_checkbox_state, _emissive_link_backup
 
         is_on = group_mat_checkbox_state.get(self.group_key, True)
-        emissive_pairs = find_emissive_objects(context)
-        filtered_pairs = []
-        seen_materials = set()
-
-        # Filter based on group_key
-        if self.group_key.startswith("emissive_"):
-            coll_name = self.group_key[9:]
-            for obj, mat, node in emissive_pairs:
-                if obj.users_collection and obj.users_collection[0].name == coll_name:
-                    if mat.name not in seen_materials:
-                        filtered_pairs.append((obj, mat, node))
-                        seen_materials.add(mat.name)
-        elif self.group_key in ("kind_EMISSIVE", "all_emissives_alpha"):
-            for obj, mat, node in emissive_pairs:
-                if mat.name not in seen_materials:
-                    filtered_pairs.append((obj, mat, node))
-                    seen_materials.add(mat.name)
 
         # Toggle materials
-        for obj, mat, node in filtered_pairs:
+        for mat in get_group(context, self.group_key).material_datablocks():
             if not mat or not mat.use_nodes:
                 continue
             nt = mat.node_tree
@@ -1180,6 +1686,10 @@ class EMISSIVE_OT_ToggleGroupAllOff(bpy.types.Operator):
             if not emissive_nodes:
                 continue
 
+            if context.scene.light_editor_emission_gates:
+                set_emission_gates(mat, emissive_nodes, 0.0 if is_on else 1.0)
+                continue
+
             key = mat.name
             if is_on:
                 # --- Turn OFF ---
@@ -1192,7 +1702,7 @@ class EMISSIVE_OT_ToggleGroupAllOff(bpy.types.Operator):
 
                     # Handle Strength only
                     if strength_socket:
-                        s_key = f"{node.name}:Strength"
+                        s_key = emission_backup_key(mat, node)
                         if strength_socket.is_linked:
                             link = strength_socket.links[0]
                             store[s_key] = ('LINK', link.from_node.name, link.from_socket.name)
@@ -1210,7 +1720,7 @@ class EMISSIVE_OT_ToggleGroupAllOff(bpy.types.Operator):
 
                         # Restore Strength only
                         if strength_socket:
-                            s_key = f"{node.name}:Strength"
+                            s_key = emission_backup_key(mat, node)
                             if s_key in store:
                                 data = store[s_key]
                                 if data[0] == 'LINK':
@@ -1255,6 +1765,7 @@ class LIGHT_OT_ToggleCollection(bpy.types.Operator):
     """Exclude collection or turn off its lights."""
     bl_idname = "light_editor.toggle_collection"
     bl_label = "Collection Control"
+    bl_options = {'UNDO'}
     # Use bl_property to link the enum property for invoke_props_dialog
     bl_property = "action"
 
@@ -1271,8 +1782,8 @@ class LIGHT_OT_ToggleCollection(bpy.types.Operator):
     )
 
     def invoke(self, context, event):
-        coll_name = self.group_key[5:]
-        collection = bpy.data.collections.get(coll_name)
+        coll_name = get_group(context, self.group_key).collection
+        collection = bpy.data.collections.get(coll_name) if coll_name else None
         if not collection:
             return {'CANCELLED'}
 
@@ -1295,8 +1806,8 @@ class LIGHT_OT_ToggleCollection(bpy.types.Operator):
         layout.prop(self, "action", expand=True)
 
     def execute(self, context):
-        coll_name = self.group_key[5:]
-        collection = bpy.data.collections.get(coll_name)
+        coll_name = get_group(context, self.group_key).collection
+        collection = bpy.data.collections.get(coll_name) if coll_name else None
         if not collection:
             return {'CANCELLED'}
 
@@ -1316,11 +1827,7 @@ class LIGHT_OT_ToggleCollection(bpy.types.Operator):
             toggle_exclusion_recursive(layer_collection, new_exclude_state)
 
         elif self.action == 'TURN_OFF_LIGHTS':
-            for obj in collection.all_objects:
-                if obj.type == 'LIGHT':
-                    obj.light_enabled = False
-                    obj.hide_viewport = True
-                    obj.hide_render = True
+            set_lights_enabled((obj for obj in collection.all_objects if obj.type == 'LIGHT'), False)
 
         # Redraw
         for area in context.screen.areas:
@@ -1350,16 +1857,7 @@ class EMISSIVE_OT_IsolateGroup(bpy.types.Operator):
     def execute(self, context):
         global group_checkbox_2_state
         is_currently_active = group_checkbox_2_state.get(self.group_key, False)
-        to_keep_emissive = set()
-        emissive_pairs = find_emissive_objects(context)
-        if self.group_key.startswith("emissive_"):
-            coll_name = self.group_key[9:]
-            for obj, mat, node in emissive_pairs:
-                if obj.users_collection and obj.users_collection[0].name == coll_name:
-                    to_keep_emissive.add(mat.name)
-        elif self.group_key in ("kind_EMISSIVE", "all_emissives_alpha"):
-            for obj, mat, node in emissive_pairs:
-                to_keep_emissive.add(mat.name)
+        to_keep_emissive = set(get_group(context, self.group_key).materials)
         if not is_currently_active:
             group_checkbox_2_state[self.group_key] = True
             _unified_isolate_manager.activate(context, UnifiedIsolateMode.MATERIAL_GROUP, identifier=(set(), to_keep_emissive))
@@ -1373,24 +1871,26 @@ class LIGHT_OT_ToggleKind(bpy.types.Operator):
     """Toggle the visibility of lights of a specific kind."""
     bl_idname = "light_editor.toggle_kind"
     bl_label = "Toggle Kind Visibility"
+    bl_options = {'UNDO'}
     group_key: bpy.props.StringProperty()
 
     def execute(self, context):
         global group_checkbox_1_state, group_lights_original_state
         is_on = group_checkbox_1_state.get(self.group_key, True)
-        group_objs = self._get_group_objects(context, self.group_key)
         if is_on:
-            original_states = {}
-            for obj in group_objs:
-                if obj.type == 'LIGHT':
-                    original_states[obj.name] = obj.light_enabled
-                    obj.light_enabled = False
-            group_lights_original_state[self.group_key] = original_states
+            group_lights = get_group(context, self.group_key).light_objects(context.view_layer)
+            group_lights_original_state[self.group_key] = {obj.name: obj.light_enabled for obj in group_lights}
+            set_lights_enabled(group_lights, False)
         else:
+            # Restore the lights switched off above, even if the group's
+            # membership changed since (hiding deselects "selected_lights").
             original_states = group_lights_original_state.get(self.group_key, {})
-            for obj in group_objs:
-                if obj.type == 'LIGHT':
-                    obj.light_enabled = original_states.get(obj.name, True)
+            objects = context.view_layer.objects
+            apply_light_visibility(
+                (obj, not enabled, not enabled)
+                for obj, enabled in ((objects.get(name), enabled) for name, enabled in original_states.items())
+                if obj is not None
+            )
             if self.group_key in group_lights_original_state:
                 del group_lights_original_state[self.group_key]
         group_checkbox_1_state[self.group_key] = not is_on
@@ -1399,62 +1899,25 @@ class LIGHT_OT_ToggleKind(bpy.types.Operator):
                 area.tag_redraw()
         return {'FINISHED'}
 
-    def _get_group_objects(self, context, group_key):
-        filter_pattern = context.scene.light_editor_filter.lower()
-        all_lights = [obj for obj in context.view_layer.objects if obj.type == 'LIGHT']
-        if filter_pattern:
-            all_lights = [obj for obj in all_lights if re.search(filter_pattern, obj.name, re.I)]
-        if group_key == "all_lights_alpha":
-            return all_lights
-        if group_key.startswith("kind_"):
-            kind = group_key[5:]
-            return [obj for obj in all_lights if obj.data.type == kind]
-        return []
-
 class LE_OT_toggle_env_socket(bpy.types.Operator):
-    """Toggle the connection of an environment input socket (Surface/Volume)."""
+    """Toggle an environment input (Surface/Volume) through its control node."""
     bl_idname = "le.toggle_env_socket"
     bl_label = "Toggle Environment Input"
     socket_name: bpy.props.StringProperty()
 
     def execute(self, context):
-        global _surface_link_backup, _volume_link_backup
         world = context.scene.world
-        if not world or not world.use_nodes:
-            self.report({'WARNING'}, "No world with nodes found")
-            return {'CANCELLED'}
-        nt = world.node_tree
-        output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None)
-        if not output_node:
-            self.report({'WARNING'}, "No World Output node")
+        if not world_output(world):
+            self.report({'WARNING'}, "No world with a World Output node found")
             return {'CANCELLED'}
-        socket = output_node.inputs.get(self.socket_name)
-        if not socket:
+        if self.socket_name not in ENV_SOCKETS:
             self.report({'WARNING'}, f"No input socket named '{self.socket_name}'")
             return {'CANCELLED'}
-        if socket.is_linked:
-            link = socket.links[0]
-            from_socket = link.from_socket
-            from_node = link.from_node
-            nt.links.remove(link)
-            if self.socket_name == "Surface":
-                _surface_link_backup = (from_node.name, from_socket.name)
-            else:
-                _volume_link_backup = (from_node.name, from_socket.name)
-        else:
-            if self.socket_name == "Surface" and _surface_link_backup:
-                node_name, socket_name = _surface_link_backup
-            elif self.socket_name == "Volume" and _volume_link_backup:
-                node_name, socket_name = _volume_link_backup
-            else:
-                self.report({'INFO'}, f"No stored connection for {self.socket_name}")
-                return {'CANCELLED'}
-            from_node = nt.nodes.get(node_name)
-            from_socket = from_node.outputs.get(socket_name) if from_node else None
-            if from_node and from_socket:
-                nt.links.new(from_socket, socket)
-            else:
-                self.report({'WARNING'}, f"Stored node/socket not found for {self.socket_name}")
+        factor = 0.0 if environment_enabled(world, self.socket_name) else 1.0
+        if not set_environment_factor(world, self.socket_name, factor):
+            self.report({'INFO'}, f"Nothing connected to {self.socket_name}")
+            return {'CANCELLED'}
+        environment_checkbox_state['environment'] = environment_is_on(world)
         for area in context.screen.areas:
             if area.type == 'NODE_EDITOR':
                 area.tag_redraw()
@@ -1475,46 +1938,9 @@ class LIGHT_OT_ToggleGroupExclusive(bpy.types.Operator):
         if new_state:
             # --- Activate Isolation ---
             # a. Determine members of the group
-            to_keep_enabled = set() # For light object names
-            to_keep_emissive = set() # For material names
-            lights = [obj for obj in context.view_layer.objects if obj.type == 'LIGHT']
-            # find_emissive_objects must be defined before this point
-            emissive_pairs = find_emissive_objects(context)
-            if self.group_key.startswith("coll_"):
-                coll_name = self.group_key[5:]
-                if coll_name == "No Collection":
-                    for obj in lights:
-                        if len(obj.users_collection) == 1 and obj.users_collection[0].name == "Scene Collection":
-                            to_keep_enabled.add(obj.name)
-                    for obj, mat in emissive_pairs:
-                         if len(obj.users_collection) == 1 and obj.users_collection[0].name == "Scene Collection":
-                            to_keep_emissive.add(mat.name)
-                else:
-                    for obj in lights:
-                        if any(coll.name == coll_name for coll in obj.users_collection):
-                            to_keep_enabled.add(obj.name)
-                    for obj, mat in emissive_pairs:
-                        if any(coll.name == coll_name for coll in obj.users_collection):
-                            to_keep_emissive.add(mat.name)
-            elif self.group_key.startswith("kind_"):
-                kind = self.group_key[5:]
-                if kind == "EMISSIVE":
-                    # This case is for the Emissive Materials Kind group header
-                    for obj, mat in emissive_pairs:
-                        to_keep_emissive.add(mat.name)
-                else:
-                    # This case is for standard Light Kind group headers (POINT, SUN, etc.)
-                    for obj in lights:
-                        if obj.data.type == kind:
-                            to_keep_enabled.add(obj.name)
-            elif self.group_key == "all_lights_alpha":
-                # All Lights group
-                for obj in lights:
-                    to_keep_enabled.add(obj.name)
-            elif self.group_key == "all_emissives_alpha":
-                 # All Emissive Materials group
-                 for obj, mat in emissive_pairs:
-                    to_keep_emissive.add(mat.name)
+            group = get_group(context, self.group_key)
+            to_keep_enabled = {obj.name for obj in group.light_objects(context.view_layer)} # For light object names
+            to_keep_emissive = set(group.materials) # For material names
             # b. Activate the unified isolate manager for LIGHT_GROUP mode
             # Pass the sets of lights and emissives to keep enabled
             _unified_isolate_manager.activate(
@@ -1579,6 +2005,63 @@ class LIGHT_OT_SelectLight(bpy.types.Operator):
             self.report({'ERROR'}, f"Light '{self.name}' not found")
         return {'FINISHED'}
 
+class LE_OT_MultiEditLights(bpy.types.Operator):
+    """Set, add to or multiply a light parameter on every light in the selection or group"""
+    bl_idname = "le.multi_edit_lights"
+    bl_label = "Edit Lights"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    group_key: StringProperty(default="", options={'HIDDEN'})  # empty = selected lights
+    attribute: EnumProperty(
+        name="Parameter",
+        items=[
+            ('energy', "Power", "Light power"),
+            ('color', "Color", "Light color"),
+            ('exposure', "Exposure", "Light exposure"),
+            ('temperature', "Temperature", "Color temperature"),
+        ],
+        default='energy',
+    )
+    operation: EnumProperty(
+        name="Operation",
+        items=[
+            ('SET', "Set", "Replace the value"),
+            ('ADD', "Add", "Add to the value"),
+            ('MULTIPLY', "Multiply", "Multiply the value"),
+        ],
+        default='MULTIPLY',
+    )
+    value: FloatProperty(name="Value", default=1.0)
+    color: FloatVectorProperty(name="Color", subtype='COLOR', size=3, min=0.0, default=(1.0, 1.0, 1.0))
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "attribute")
+        layout.row().prop(self, "operation", expand=True)
+        if self.attribute == 'color':
+            layout.prop(self, "color")
+        else:
+            layout.prop(self, "value")
+
+    def execute(self, context):
+        if self.attribute not in bpy.types.Light.bl_rna.properties:
+            self.report({'WARNING'}, f"Lights have no '{self.attribute}' in this Blender version")
+            return {'CANCELLED'}
+        lights = [obj.data for obj in get_group_lights(context, self.group_key)]
+        if not lights:
+            self.report({'WARNING'}, "No lights to edit")
+            return {'CANCELLED'}
+        value = self.color[:] if self.attribute == 'color' else self.value
+        changed = edit_light_data(lights, self.attribute, self.operation, value)
+        for area in context.screen.areas:
+            if area.type in {'VIEW_3D', 'PROPERTIES'}:
+                area.tag_redraw()
+        self.report({'INFO'}, f"Edited {changed} light(s)")
+        return {'FINISHED'}
+
 def draw_socket_with_icon(layout, socket, text="", linked_only=False, icon='NODETREE'):
     """Draws a socket's value with an icon if linked, or just the value if not."""
     if socket.is_linked:
@@ -1626,6 +2109,80 @@ def group_emissive_by_material(pairs):
               for (obj_name, mat_name), nodes in grouped.items()]
     return result
 
+def get_group_lights(context, group_key):
+    """Resolve a Light Editor group key to the light objects it shows.
+
+    An empty key means the lights currently selected in the viewport. The
+    name filter applies just like it does in the panel.
+    """
+    return get_group(context, group_key or "selected_lights").light_objects(context.view_layer)
+
+def edit_light_data(lights, attribute, operation, value):
+    """Set, add to or multiply a Light attribute across many datablocks at once.
+
+    The whole bpy.data.lights column is read with one foreach_get, the rows
+    belonging to ``lights`` are edited as a NumPy slice and the column is
+    written back with one foreach_set, so the cost doesn't grow with the
+    number of RNA writes. Results are clamped to the property's hard range,
+    which foreach_set does not enforce. Returns the number of lights changed.
+    """
+    data = bpy.data.lights
+    if not len(data) or attribute not in bpy.types.Light.bl_rna.properties:
+        return 0
+    targets = {light.as_pointer() for light in lights}
+    mask = np.fromiter((light.as_pointer() in targets for light in data), dtype=bool, count=len(data))
+    if not mask.any():
+        return 0
+
+    width = 3 if attribute == 'color' else 1
+    column = np.empty(len(data) * width, dtype=np.float32)
+    data.foreach_get(attribute, column)
+    column = column.reshape(-1, width)
+
+    current = column[mask]
+    value = np.asarray(value, dtype=np.float32)
+    if operation == 'SET':
+        edited = np.broadcast_to(value, current.shape)
+    elif operation == 'ADD':
+        edited = current + value
+    else:
+        edited = current * value
+    prop = bpy.types.Light.bl_rna.properties[attribute]
+    edited = np.clip(edited, prop.hard_min, prop.hard_max)
+
+    changed = np.any(edited != current, axis=1)
+    if not changed.any():
+        return 0
+    column[mask] = edited
+    data.foreach_set(attribute, column.ravel())
+
+    # foreach_set skips RNA updates; tag the changed lights for the depsgraph.
+    for i in np.flatnonzero(mask)[changed]:
+        data[int(i)].update_tag()
+    return int(changed.sum())
+
+def get_light_contributions(scene):
+    """Cached contribution shares by session_uid, or None if missing or outdated.
+
+    The estimate depends on what the camera sees, so it's only valid for the
+    frame and camera it was computed for.
+    """
+    result = light_contribution_cache.get(scene.name)
+    if not result:
+        return None
+    if result["frame"] != scene.frame_current or result["camera"] != (scene.camera.name if scene.camera else ""):
+        return None
+    return result["shares"]
+
+def sort_lights(objs):
+    """Sort light rows by name, or by estimated contribution when chosen."""
+    scene = bpy.context.scene
+    if getattr(scene, "light_editor_sort", 'NAME') == 'CONTRIBUTION':
+        shares = get_light_contributions(scene)
+        if shares is not None:
+            return sorted(objs, key=lambda x: (-shares.get(x.session_uid, 0.0), x.name.lower()))
+    return sorted(objs, key=lambda x: x.name.lower())
+
 def draw_main_row(box, obj):
     """Draw a single light object row in the UI, with equal-width color/strength/exposure fields."""
     light = obj.data
@@ -1708,6 +2265,13 @@ def draw_main_row(box, obj):
         d.enabled = False
         d.label(text="")
 
+    # --- Contribution (only once estimated for this frame/camera) ---
+    shares = get_light_contributions(bpy.context.scene)
+    if shares is not None:
+        col_share = row.column(align=True)
+        col_share.ui_units_x = 3
+        col_share.label(text=f"{shares.get(obj.session_uid, 0.0) * 100:.1f}%")
+
 
 class LE_OT_IsolateEnvironment(bpy.types.Operator):
     """Isolate the environment lighting."""
@@ -1778,6 +2342,9 @@ class LIGHT_PT_editor(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         scene = context.scene
+        # The view layer can also be switched from the top bar, bypassing
+        # update_render_layer.
+        activate_layer_state(context.view_layer)
 
         # --- 1. Filter Type Buttons ---
         layout.row().prop(scene, "filter_light_types", expand=True)
@@ -1792,14 +2359,26 @@ class LIGHT_PT_editor(bpy.types.Panel):
         row = layout.row(align=True)
         row.prop(scene, "light_editor_filter", text="", icon="VIEWZOOM")
         row.operator("le.clear_light_filter", text="", icon='PANEL_CLOSE')
+        row.operator("le.multi_edit_lights", text="", icon='MODIFIER').group_key = ""
+        row = layout.row(align=True)
+        row.prop(scene, "light_editor_proximity", text="")
+        if scene.light_editor_proximity != 'OFF':
+            row.prop(scene, "light_editor_proximity_radius", text="Radius")
+        row.prop(scene, "light_editor_affecting_active", text="", icon='LINKED')
+        row.prop(scene, "light_editor_emission_gates", text="", icon='NODETREE')
+        row.prop(scene, "light_editor_sort", text="")
         filter_str = scene.light_editor_filter.lower()
 
         # --- 4. Gather Lights and Emissive Nodes ---
         try:
             lights = [o for o in context.view_layer.objects if o.type == 'LIGHT' and (not filter_str or re.search(filter_str, o.name, re.I))]
+            nearby = get_nearby_lights(context)
+            if nearby is not None:
+                lights = [o for o in lights if o.session_uid in nearby]
         except Exception as e:
             layout.box().label(text=f"Error filtering lights: {e}", icon='ERROR')
             lights = []
+            nearby = None
         try:
             emissive_pairs = find_emissive_objects(context)
             filtered_emissive_pairs = [(o, m, n) for o, m, n in emissive_pairs
@@ -1812,10 +2391,7 @@ class LIGHT_PT_editor(bpy.types.Panel):
             layout.box().label(text=f"Error detecting emissive materials: {e}", icon='ERROR')
             filtered_emissive_pairs = []
 
-        def is_group_selected(group_key, objects):
-            if not objects:
-                return False
-            return all(obj.select_get() for obj in objects if obj.name in context.view_layer.objects)
+        view_layer = context.view_layer
 
         # --- 5. Draw UI Based on Filter Type ---
         if scene.filter_light_types == 'NO_FILTER':
@@ -1829,17 +2405,19 @@ class LIGHT_PT_editor(bpy.types.Panel):
                               icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_a, False) else 'RADIOBUT_OFF'),
                               depress=group_checkbox_2_state.get(key_a, False))
             oA2.group_key = key_a
-            select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_a, lights) else 'RESTRICT_SELECT_OFF'
+            group = register_group(view_layer, key_a, lights)
+            select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
             op_select = ar.operator("le.select_group", text="", icon=select_icon)
             op_select.group_key = key_a
             oA3 = ar.operator("light_editor.toggle_group", text="",
                               emboss=True,
                               icon=('DOWNARROW_HLT' if not group_collapse_dict.get(key_a, False) else 'RIGHTARROW'))
             oA3.group_key = key_a
+            ar.operator("le.multi_edit_lights", text="", icon='MODIFIER').group_key = key_a
             ar.label(text="All Lights (Alphabetical)", icon='LIGHT_DATA')
             if not group_collapse_dict.get(key_a, False):
                 lb6 = ab.box()
-                for o in sorted(lights, key=lambda x: x.name.lower()):
+                for o in sort_lights(lights):
                     draw_main_row(lb6, o)
                     if o.light_expanded:
                         eb6 = lb6.box()
@@ -1853,7 +2431,8 @@ class LIGHT_PT_editor(bpy.types.Panel):
             oE2 = er7.operator("light_editor.isolate_group_emissive", text="",
                                icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_e, False) else 'RADIOBUT_OFF'))
             oE2.group_key = key_e
-            select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_e, [o for o, _, _ in filtered_emissive_pairs]) else 'RESTRICT_SELECT_OFF'
+            group = register_group(view_layer, key_e, emissive_pairs=filtered_emissive_pairs)
+            select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
             op_select = er7.operator("le.select_group", text="", icon=select_icon)
             op_select.group_key = key_e
             oE3 = er7.operator("light_editor.toggle_group", text="",
@@ -1886,7 +2465,8 @@ class LIGHT_PT_editor(bpy.types.Panel):
                         o_e2 = er.operator("light_editor.isolate_group_emissive", text="",
                                            icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_k, False) else 'RADIOBUT_OFF'))
                         o_e2.group_key = key_k
-                        select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_k, [o for o, _, _ in emissives]) else 'RESTRICT_SELECT_OFF'
+                        group = register_group(view_layer, key_k, emissive_pairs=emissives)
+                        select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
                         op_select = er.operator("le.select_group", text="", icon=select_icon)
                         op_select.group_key = key_k
                         o_e3 = er.operator("light_editor.toggle_group", text="",
@@ -1915,17 +2495,19 @@ class LIGHT_PT_editor(bpy.types.Panel):
                                            icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_k, False) else 'RADIOBUT_OFF'),
                                            depress=group_checkbox_2_state.get(key_k, False))
                         o_k2.group_key = key_k
-                        select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_k, lights_in) else 'RESTRICT_SELECT_OFF'
+                        group = register_group(view_layer, key_k, lights_in)
+                        select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
                         op_select = kr.operator("le.select_group", text="", icon=select_icon)
                         op_select.group_key = key_k
                         o_k3 = kr.operator("light_editor.toggle_group", text="",
                                            emboss=True,
                                            icon=('DOWNARROW_HLT' if not collapsed else 'RIGHTARROW'))
                         o_k3.group_key = key_k
+                        kr.operator("le.multi_edit_lights", text="", icon='MODIFIER').group_key = key_k
                         kr.label(text=f"{kind.title()} Lights", icon='LIGHT_{}'.format(kind))
                         if not collapsed:
                             lb = kb.box()
-                            for o in sorted(lights_in, key=lambda x: x.name.lower()):
+                            for o in sort_lights(lights_in):
                                 draw_main_row(lb, o)
                                 if o.light_expanded:
                                     eb = lb.box()
@@ -1936,10 +2518,11 @@ class LIGHT_PT_editor(bpy.types.Panel):
                 gather_layer_collections(context.view_layer.layer_collection, all_colls)
             except Exception:
                 all_colls = []
+            emitter_objects = {o for o, _, _ in emissive_pairs}
             relevant = [lc for lc in all_colls if lc.collection.name != "Scene Collection" and
-                        any(o.type == 'LIGHT' or any(m in [mat for _, mat, _ in emissive_pairs] for m in o.material_slots) for o in lc.collection.all_objects)]
+                        any(o.type == 'LIGHT' or o in emitter_objects for o in lc.collection.all_objects)]
             no_lights = [o for o in lights if len(o.users_collection) == 1 and o.users_collection[0].name == "Scene Collection"]
-            no_emissives = [o for o, _, _ in filtered_emissive_pairs if len(o.users_collection) == 1 and o.users_collection[0].name == "Scene Collection"]
+            no_emissives = [(o, m, n) for o, m, n in filtered_emissive_pairs if len(o.users_collection) == 1 and o.users_collection[0].name == "Scene Collection"]
             if not relevant and not no_lights and not no_emissives:
                 box = layout.box()
                 box.label(text="No Collections or Unassigned Lights/Emissives Found", icon='INFO')
@@ -1948,9 +2531,10 @@ class LIGHT_PT_editor(bpy.types.Panel):
                     coll = lc.collection
                     group_key = f"coll_{coll.name}"
                     collapsed = group_collapse_dict.get(group_key, False)
-                    group_objects = [o for o in context.view_layer.objects if
-                                    (o.type == 'LIGHT' or any(m in [mat for _, mat, _ in emissive_pairs] for m in o.material_slots)) and
-                                    any(c == coll for c in o.users_collection)]
+                    members = set(coll.all_objects)
+                    lights_in = [o for o in lights if o in members]
+                    emissives_in_collection = [(o, m, n) for o, m, n in filtered_emissive_pairs if any(c == coll for c in o.users_collection)]
+                    group = register_group(view_layer, group_key, lights_in, emissives_in_collection, collection=coll.name)
                     header_box = layout.box()
                     hr = header_box.row(align=True)
                     icon_chk = 'CHECKBOX_HLT' if not lc.exclude else 'CHECKBOX_DEHLT'
@@ -1960,25 +2544,23 @@ class LIGHT_PT_editor(bpy.types.Panel):
                                          icon=('RADIOBUT_ON' if group_checkbox_2_state.get(group_key, False) else 'RADIOBUT_OFF'),
                                          depress=group_checkbox_2_state.get(group_key, False))
                     op_iso.group_key = group_key
-                    select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(group_key, group_objects) else 'RESTRICT_SELECT_OFF'
+                    select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
                     op_select = hr.operator("le.select_group", text="", icon=select_icon)
                     op_select.group_key = group_key
                     op_tri = hr.operator("light_editor.toggle_group", text="",
                                          emboss=True,
                                          icon=('DOWNARROW_HLT' if not collapsed else 'RIGHTARROW'))
                     op_tri.group_key = group_key
+                    hr.operator("le.multi_edit_lights", text="", icon='MODIFIER').group_key = group_key
                     hr.label(text=coll.name, icon='OUTLINER_COLLECTION')
                     if not collapsed:
-                        lights_in_collection = [o for o in coll.all_objects if o.type == 'LIGHT']
-                        lights_in = [o for o in lights_in_collection if (not filter_str or re.search(filter_str, o.name, re.I))]
                         if lights_in:
                             lb = header_box.box()
-                            for o in sorted(lights_in, key=lambda x: x.name.lower()):
+                            for o in sort_lights(lights_in):
                                 draw_main_row(lb, o)
                                 if o.light_expanded:
                                     eb = lb.box()
                                     draw_extra_params(self, eb, o, o.data)
-                        emissives_in_collection = [(o, m, n) for o, m, n in filtered_emissive_pairs if any(c == coll for c in o.users_collection)]
                         if emissives_in_collection:
                             cb = header_box.box()
                             grouped_emissives = group_emissive_by_material(emissives_in_collection)
@@ -1987,7 +2569,7 @@ class LIGHT_PT_editor(bpy.types.Panel):
                 if no_lights or no_emissives:
                     key_nc = "coll_No Collection"
                     collapsed_nc = group_collapse_dict.get(key_nc, False)
-                    group_objects = no_lights + no_emissives
+                    group = register_group(view_layer, key_nc, no_lights, no_emissives)
                     nb = layout.box()
                     nr = nb.row(align=True)
                     col_disabled = nr.column(align=True)
@@ -1998,17 +2580,18 @@ class LIGHT_PT_editor(bpy.types.Panel):
                                       icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_nc, False) else 'RADIOBUT_OFF'),
                                       depress=group_checkbox_2_state.get(key_nc, False))
                     op2.group_key = key_nc
-                    select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_nc, group_objects) else 'RESTRICT_SELECT_OFF'
+                    select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
                     op_select = nr.operator("le.select_group", text="", icon=select_icon)
                     op_select.group_key = key_nc
                     op3 = nr.operator("light_editor.toggle_group", text="",
                                       emboss=True,
                                       icon=('DOWNARROW_HLT' if not collapsed_nc else 'RIGHTARROW'))
                     op3.group_key = key_nc
+                    nr.operator("le.multi_edit_lights", text="", icon='MODIFIER').group_key = key_nc
                     nr.label(text="Not In Any Collections", icon='OUTLINER_COLLECTION')
                     if not collapsed_nc:
                         lb2 = nb.box()
-                        for o in sorted(no_lights, key=lambda x: x.name.lower()):
+                        for o in sort_lights(no_lights):
                             draw_main_row(lb2, o)
                             if o.light_expanded:
                                 eb2 = lb2.box()
@@ -2020,10 +2603,12 @@ class LIGHT_PT_editor(bpy.types.Panel):
                                 draw_emissive_row(cb2, obj, mat, nodes)
         elif scene.filter_light_types == 'SELECTED':
             # Selected Lights
-            selected_lights = [o for o in lights if o.select_get()]
+            selected = selected_uids(view_layer)
+            selected_lights = [o for o in lights if o.session_uid in selected]
             if selected_lights:
                 key_sl = "selected_lights"
                 collapsed_sl = group_collapse_dict.get(key_sl, False)
+                group = register_group(view_layer, key_sl, selected_lights)
                 sb = layout.box()
                 sr = sb.row(align=True)
                 i_sl = 'CHECKBOX_HLT' if group_checkbox_1_state.get(key_sl, True) else 'CHECKBOX_DEHLT'
@@ -2033,26 +2618,28 @@ class LIGHT_PT_editor(bpy.types.Panel):
                                      icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_sl, False) else 'RADIOBUT_OFF'),
                                      depress=group_checkbox_2_state.get(key_sl, False))
                 op_sl2.group_key = key_sl
-                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_sl, selected_lights) else 'RESTRICT_SELECT_OFF'
+                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
                 op_select = sr.operator("le.select_group", text="", icon=select_icon)
                 op_select.group_key = key_sl
                 op_sl3 = sr.operator("light_editor.toggle_group", text="",
                                      emboss=True,
                                      icon=('DOWNARROW_HLT' if not collapsed_sl else 'RIGHTARROW'))
                 op_sl3.group_key = key_sl
+                sr.operator("le.multi_edit_lights", text="", icon='MODIFIER').group_key = key_sl
                 sr.label(text="Selected Lights", icon='LIGHT_DATA')
                 if not collapsed_sl:
                     sb = sb.box()
-                    for o in sorted(selected_lights, key=lambda x: x.name.lower()):
+                    for o in sort_lights(selected_lights):
                         draw_main_row(sb, o)
                         if o.light_expanded:
                             eb = sb.box()
                             draw_extra_params(self, eb, o, o.data)
             # Selected Emissive Meshes
-            selected_emissives = [(o, m, n) for o, m, n in filtered_emissive_pairs if o.select_get()]
+            selected_emissives = [(o, m, n) for o, m, n in filtered_emissive_pairs if o.session_uid in selected]
             if selected_emissives:
                 key_se = "selected_emissives"
                 collapsed_se = group_collapse_dict.get(key_se, False)
+                group = register_group(view_layer, key_se, emissive_pairs=selected_emissives)
                 se_box = layout.box()
                 se_row = se_box.row(align=True)
                 i_se = 'CHECKBOX_HLT' if group_mat_checkbox_state.get(key_se, True) else 'CHECKBOX_DEHLT'
@@ -2062,7 +2649,7 @@ class LIGHT_PT_editor(bpy.types.Panel):
                                          icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_se, False) else 'RADIOBUT_OFF'),
                                          depress=group_checkbox_2_state.get(key_se, False))
                 op_se2.group_key = key_se
-                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_se, [o for o, _, _ in selected_emissives]) else 'RESTRICT_SELECT_OFF'
+                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
                 op_select = se_row.operator("le.select_group", text="", icon=select_icon)
                 op_select.group_key = key_se
                 op_se3 = se_row.operator("light_editor.toggle_group", text="",
@@ -2078,10 +2665,11 @@ class LIGHT_PT_editor(bpy.types.Panel):
                     for obj, mat, nodes in sorted(grouped_emissives, key=lambda x: f"{x[0].name}_{x[1].name}".lower()):
                         draw_emissive_row(se_cb, obj, mat, nodes)
             # Not Selected Lights
-            not_selected_lights = [o for o in lights if not o.select_get()]
+            not_selected_lights = [o for o in lights if o.session_uid not in selected]
             if not_selected_lights:
                 key_nsl = "not_selected_lights"
                 collapsed_nsl = group_collapse_dict.get(key_nsl, False)
+                group = register_group(view_layer, key_nsl, not_selected_lights)
                 nsl_box = layout.box()
                 nsl_row = nsl_box.row(align=True)
                 i_nsl = 'CHECKBOX_HLT' if group_checkbox_1_state.get(key_nsl, True) else 'CHECKBOX_DEHLT'
@@ -2091,26 +2679,28 @@ class LIGHT_PT_editor(bpy.types.Panel):
                                            icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_nsl, False) else 'RADIOBUT_OFF'),
                                            depress=group_checkbox_2_state.get(key_nsl, False))
                 op_nsl2.group_key = key_nsl
-                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_nsl, not_selected_lights) else 'RESTRICT_SELECT_OFF'
+                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
                 op_select = nsl_row.operator("le.select_group", text="", icon=select_icon)
                 op_select.group_key = key_nsl
                 op_nsl3 = nsl_row.operator("light_editor.toggle_group", text="",
                                            emboss=True,
                                            icon=('DOWNARROW_HLT' if not collapsed_nsl else 'RIGHTARROW'))
                 op_nsl3.group_key = key_nsl
+                nsl_row.operator("le.multi_edit_lights", text="", icon='MODIFIER').group_key = key_nsl
                 nsl_row.label(text="Not Selected Lights", icon='LIGHT_DATA')
                 if not collapsed_nsl:
                     nslb = nsl_box.box()
-                    for o in sorted(not_selected_lights, key=lambda x: x.name.lower()):
+                    for o in sort_lights(not_selected_lights):
                         draw_main_row(nslb, o)
                         if o.light_expanded:
                             eb = nslb.box()
                             draw_extra_params(self, eb, o, o.data)
             # Not Selected Emissive Meshes
-            not_selected_emissives = [(o, m, n) for o, m, n in filtered_emissive_pairs if not o.select_get()]
+            not_selected_emissives = [(o, m, n) for o, m, n in filtered_emissive_pairs if o.session_uid not in selected]
             if not_selected_emissives:
                 key_nse = "not_selected_emissives"
                 collapsed_nse = group_collapse_dict.get(key_nse, False)
+                group = register_group(view_layer, key_nse, emissive_pairs=not_selected_emissives)
                 nse_box = layout.box()
                 nse_row = nse_box.row(align=True)
                 i_nse = 'CHECKBOX_HLT' if group_mat_checkbox_state.get(key_nse, True) else 'CHECKBOX_DEHLT'
@@ -2120,7 +2710,7 @@ class LIGHT_PT_editor(bpy.types.Panel):
                                            icon=('RADIOBUT_ON' if group_checkbox_2_state.get(key_nse, False) else 'RADIOBUT_OFF'),
                                            depress=group_checkbox_2_state.get(key_nse, False))
                 op_nse2.group_key = key_nse
-                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(key_nse, [o for o, _, _ in not_selected_emissives]) else 'RESTRICT_SELECT_OFF'
+                select_icon = 'RESTRICT_SELECT_ON' if is_group_selected(view_layer, group) else 'RESTRICT_SELECT_OFF'
                 op_select = nse_row.operator("le.select_group", text="", icon=select_icon)
                 op_select.group_key = key_nse
                 op_nse3 = nse_row.operator("light_editor.toggle_group", text="",
@@ -2138,18 +2728,22 @@ class LIGHT_PT_editor(bpy.types.Panel):
             # Environment
             if scene.world:
                 draw_environment_single_row(layout.box(), context, filter_str)
-            
+
+        # --- 6. Analysis Groups ---
+        from .LightAnalysis import draw_out_of_view_group, draw_contribution_group, draw_emission_cost_group
+        draw_out_of_view_group(self, layout, context)
+        draw_contribution_group(layout, context)
+        draw_emission_cost_group(layout, context)
+
 # Global UI flag for visual toggle (updated in isolate operator)
 env_isolated_ui_state = False
 
 def draw_environment_single_row(box, context, filter_str=""):
     scene = context.scene
     world = scene.world
-    nt = world.node_tree if world and world.use_nodes else None
-    output_node = next((n for n in nt.nodes if n.type == 'OUTPUT_WORLD'), None) if nt else None
-    surf_input = output_node.inputs.get("Surface") if output_node else None
-    vol_input = output_node.inputs.get("Volume") if output_node else None
-    is_on = environment_checkbox_state.get('environment', True)
+    surf_on = environment_enabled(world, "Surface")
+    vol_on = environment_enabled(world, "Volume")
+    is_on = surf_on or vol_on
     icon = 'CHECKBOX_HLT' if is_on else 'CHECKBOX_DEHLT'
 
     # ✅ Use global UI toggle instead of .is_active()
@@ -2179,19 +2773,21 @@ def draw_environment_single_row(box, context, filter_str=""):
         if show_surface:
             row = content_box.row(align=True)
             row.operator("le.toggle_env_socket",
-                         text="", icon='OUTLINER_OB_LIGHT' if surf_input and surf_input.is_linked else 'LIGHT_DATA',
-                         depress=surf_input and surf_input.is_linked).socket_name = "Surface"
+                         text="", icon='OUTLINER_OB_LIGHT' if surf_on else 'LIGHT_DATA',
+                         depress=surf_on).socket_name = "Surface"
             op = row.operator("le.isolate_environment", text="", icon='RADIOBUT_ON' if isolate_env_surface_state else 'RADIOBUT_OFF')
             op.mode = "SURFACE"
             row.prop(scene, "env_surface_label", text="")
         if show_volume:
             row = content_box.row(align=True)
             row.operator("le.toggle_env_socket",
-                         text="", icon='OUTLINER_OB_LIGHT' if vol_input and vol_input.is_linked else 'LIGHT_DATA',
-                         depress=vol_input and vol_input.is_linked).socket_name = "Volume"
+                         text="", icon='OUTLINER_OB_LIGHT' if vol_on else 'LIGHT_DATA',
+                         depress=vol_on).socket_name = "Volume"
             op = row.operator("le.isolate_environment", text="", icon='RADIOBUT_ON' if isolate_env_volume_state else 'RADIOBUT_OFF')
             op.mode = "VOLUME"
             row.prop(scene, "env_volume_label", text="")
+        from .LightAnalysis import draw_environment_analysis
+        draw_environment_analysis(content_box, context)
 
 @persistent
 def LE_update_light_enabled_on_visibility_change(scene, depsgraph=None):
@@ -2233,6 +2829,30 @@ def LE_update_light_enabled_on_visibility_change(scene, depsgraph=None):
     except Exception as e:
         pass
         
+@persistent
+def LE_update_light_spatial_index(scene, depsgraph=None):
+    """Report moved lights to the proximity indexes so only they get re-read."""
+    if depsgraph is None:
+        _light_spatial_indices.clear()
+        return
+    try:
+        for update in depsgraph.updates:
+            if update.is_updated_transform and isinstance(update.id, bpy.types.Object) and update.id.type == 'LIGHT':
+                uid = update.id.original.session_uid
+                for index in _light_spatial_indices.values():
+                    index.mark_moved(uid)
+    except Exception:
+        _light_spatial_indices.clear()
+
+@persistent
+def LE_invalidate_light_spatial_index_on_frame(scene, depsgraph=None):
+    """Drop the proximity indexes on frame change.
+
+    Animated and driven lights move without a depsgraph_update_post, so
+    the per-light move reports above never see them.
+    """
+    _light_spatial_indices.clear()
+
 @persistent
 def LE_set_initial_render_layer(dummy):
     """Point the Light Editor's render layer selector at the active view layer.
@@ -2289,6 +2909,14 @@ def LE_check_lights_enabled(dummy):
 def LE_clear_handler(dummy):
     """Clear light states on file load."""
     context = bpy.context
+    _light_spatial_indices.clear()
+    emissive_material_cache.clear()
+    _group_registry.clear()
+    invalidate_selection()
+    subscribe_selection_changes()
+    reset_layer_states()
+    schedule_layer_prefetch()
+    light_contribution_cache.clear()
     for obj in bpy.data.objects:
         if obj.type == 'LIGHT':
             if not (obj.hide_viewport or obj.hide_render):
@@ -2299,10 +2927,44 @@ def LE_clear_handler(dummy):
                     context.view_layer.objects[obj.name].light_enabled = False
 
 @persistent
-def LE_clear_emissive_cache(dummy):
-    """Clear the emissive material cache."""
-    global emissive_material_cache
+def LE_clear_emissive_cache(scene, depsgraph=None):
+    """Clear the emissive material cache when an update can change what's emissive.
+
+    This used to clear on every depsgraph tick, which also meant every view
+    layer switch rescanned all materials. The cache is per view layer now and
+    is only dropped for material, node tree, collection or object data
+    changes; the other layers are then rescanned in the background.
+    """
+    if depsgraph is not None:
+        try:
+            relevant = any(isinstance(u.id, _EMISSIVE_ID_TYPES) or
+                           (isinstance(u.id, bpy.types.Object) and u.is_updated_geometry)
+                           for u in depsgraph.updates)
+        except Exception:
+            relevant = True
+        if not relevant:
+            return
+    emissive_material_cache.clear()
+    schedule_layer_prefetch()
+
+@persistent
+def LE_invalidate_selection_cache(scene, depsgraph=None):
+    """Selecting objects tags the scene; drop the cached selection then."""
+    if depsgraph is not None:
+        try:
+            if not any(isinstance(u.id, bpy.types.Scene) for u in depsgraph.updates):
+                return
+        except Exception:
+            pass
+    invalidate_selection()
+
+@persistent
+def LE_clear_emissive_cache_on_undo(scene, depsgraph=None):
+    """Undo replaces every datablock, so cached object references are dead."""
     emissive_material_cache.clear()
+    _light_spatial_indices.clear()
+    _group_registry.clear()
+    invalidate_selection()
 
 classes = (
     LIGHT_OT_ToggleGroup,
@@ -2311,6 +2973,7 @@ classes = (
     LIGHT_OT_ToggleGroupExclusive,
     LIGHT_OT_ClearFilter,
     LIGHT_OT_SelectLight,
+    LE_OT_MultiEditLights,
     LE_OT_ShowNodes,
     LE_OT_ToggleEmission,
     LE_OT_isolate_emissive,
@@ -2322,6 +2985,7 @@ classes = (
     LIGHT_PT_editor,
     LE_OT_SelectGroup,
     LE_OT_toggle_env_socket,
+    LE_OT_RemoveEmissionGates,
 )
 
 def register():
@@ -2334,9 +2998,15 @@ def register():
         (bpy.app.handlers.load_post, LE_check_lights_enabled),
         (bpy.app.handlers.depsgraph_update_post, LE_clear_emissive_cache),
         (bpy.app.handlers.depsgraph_update_post, LE_update_light_enabled_on_visibility_change),
+        (bpy.app.handlers.depsgraph_update_post, LE_update_light_spatial_index),
+        (bpy.app.handlers.frame_change_post, LE_invalidate_light_spatial_index_on_frame),
+        (bpy.app.handlers.depsgraph_update_post, LE_invalidate_selection_cache),
+        (bpy.app.handlers.undo_post, LE_clear_emissive_cache_on_undo),
+        (bpy.app.handlers.redo_post, LE_clear_emissive_cache_on_undo),
     ):
         if handler not in handler_list:
             handler_list.append(handler)
+    subscribe_selection_changes()
 
     # Register the new render layer property
     bpy.types.Scene.light_editor_selected_render_layer = bpy.props.EnumProperty(
@@ -2398,6 +3068,42 @@ def register():
                ('COLLECTION', 'Collection', 'Filter lights by Collections', 'OUTLINER_COLLECTION', 3)),
         default='NO_FILTER'
     )
+    bpy.types.Scene.light_editor_proximity = EnumProperty(
+        name="Proximity",
+        description="Only show lights within a radius of a point of interest",
+        items=(('OFF', 'Anywhere', 'Show lights regardless of position', 'WORLD', 0),
+               ('SELECTION', 'Near Selection', 'Lights within the radius of any selected object', 'RESTRICT_SELECT_OFF', 1),
+               ('CURSOR', 'Near 3D Cursor', 'Lights within the radius of the 3D cursor', 'PIVOT_CURSOR', 2),
+               ('CAMERA', 'Near Camera', 'Lights within the radius of the active camera', 'CAMERA_DATA', 3)),
+        default='OFF'
+    )
+    bpy.types.Scene.light_editor_proximity_radius = FloatProperty(
+        name="Radius",
+        description="Proximity filter radius",
+        default=10.0,
+        min=0.0,
+        subtype='DISTANCE',
+        unit='LENGTH'
+    )
+    bpy.types.Scene.light_editor_emission_gates = BoolProperty(
+        name="Gate Emission",
+        description="Toggle emitters through a managed multiply node instead of relinking sockets, "
+                    "so EEVEE doesn't recompile shaders. Turning this off removes the nodes",
+        default=False,
+        update=update_emission_gates
+    )
+    bpy.types.Scene.light_editor_affecting_active = BoolProperty(
+        name="Affecting Active",
+        description="Only show lights whose light linking lets them illuminate the active object",
+        default=False
+    )
+    bpy.types.Scene.light_editor_sort = EnumProperty(
+        name="Sort",
+        description="Order of the light rows",
+        items=(('NAME', 'By Name', 'Sort lights alphabetically', 'SORTALPHA', 0),
+               ('CONTRIBUTION', 'By Contribution', 'Sort lights by estimated contribution to the shot', 'SORTSIZE', 1)),
+        default='NAME'
+    )
     bpy.types.Light.soft_falloff = BoolProperty(default=False)
     bpy.types.Light.max_bounce = IntProperty(default=0, min=0, max=10)
     bpy.types.Light.multiple_instance = BoolProperty(default=False)
@@ -2431,6 +3137,22 @@ def unregister():
         bpy.app.handlers.load_post.remove(LE_check_lights_enabled)
     if LE_clear_emissive_cache in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.remove(LE_clear_emissive_cache)
+    if LE_update_light_spatial_index in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(LE_update_light_spatial_index)
+    if LE_invalidate_light_spatial_index_on_frame in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.remove(LE_invalidate_light_spatial_index_on_frame)
+    if LE_invalidate_selection_cache in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(LE_invalidate_selection_cache)
+    bpy.msgbus.clear_by_owner(_selection_msgbus_owner)
+    for handler_list in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if LE_clear_emissive_cache_on_undo in handler_list:
+            handler_list.remove(LE_clear_emissive_cache_on_undo)
+    if bpy.app.timers.is_registered(prefetch_layer_caches):
+        bpy.app.timers.unregister(prefetch_layer_caches)
+    _light_spatial_indices.clear()
+    emissive_material_cache.clear()
+    _group_registry.clear()
+    invalidate_selection()
     
     # Remove the render layer handler
     if LE_set_initial_render_layer in bpy.app.handlers.load_post:
@@ -2455,6 +3177,16 @@ def unregister():
         del bpy.types.Scene.light_editor_group_by_collection
     if hasattr(bpy.types.Scene, 'filter_light_types'):
         del bpy.types.Scene.filter_light_types
+    if hasattr(bpy.types.Scene, 'light_editor_proximity'):
+        del bpy.types.Scene.light_editor_proximity
+    if hasattr(bpy.types.Scene, 'light_editor_proximity_radius'):
+        del bpy.types.Scene.light_editor_proximity_radius
+    if hasattr(bpy.types.Scene, 'light_editor_emission_gates'):
+        del bpy.types.Scene.light_editor_emission_gates
+    if hasattr(bpy.types.Scene, 'light_editor_affecting_active'):
+        del bpy.types.Scene.light_editor_affecting_active
+    if hasattr(bpy.types.Scene, 'light_editor_sort'):
+        del bpy.types.Scene.light_editor_sort
     if hasattr(bpy.types.Scene, 'collapse_all_emissives'):
         del bpy.types.Scene.collapse_all_emissives
     if hasattr(bpy.types.Scene, 'collapse_all_emissives_alpha'):
@@ -0,0 +1,441 @@
+import bpy
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from bpy.types import AddonPreferences, Operator, Panel, PropertyGroup
+from bpy.props import CollectionProperty, IntProperty, StringProperty
+
+from . import LightEditor
+from .LightRender import background_command
+from .LightDiff import snapshot_object_names
+from .LightRig import light_record
+
+# -------------------------------------------------------------------------
+# Catalog cache
+# -------------------------------------------------------------------------
+# Libraries are the .blend files (or folders of them) listed in the add-on
+# preferences. Each file is catalogued once by a background Blender that
+# links only its light datablocks and light objects and lists its collection
+# names; the catalog is stored on disk keyed by path, and reused for as long
+# as the file's mtime and size (and the catalog version) are unchanged:
+#   {path: {"version", "mtime", "size", "lights": [{"name", "data",
+#           "light_type", "energy", "color"}], "collections": [...]}}
+CACHE_FILE = "library_cache.json"
+# Bumped when cataloguing changes, so older entries are catalogued again.
+CATALOG_VERSION = 2
+# Background catalog processes running at once.
+MAX_SCAN_PROCESSES = 4
+
+_catalog = None
+
+def _cache_path():
+    return os.path.join(bpy.utils.user_resource('CONFIG', path="light_editor", create=True), CACHE_FILE)
+
+def get_catalog():
+    """The on-disk catalog, read once per session."""
+    global _catalog
+    if _catalog is None:
+        try:
+            with open(_cache_path(), encoding="utf-8") as f:
+                _catalog = json.load(f)
+        except (OSError, ValueError):
+            _catalog = {}
+    return _catalog
+
+def save_catalog():
+    path = _cache_path()
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(get_catalog(), f)
+    os.replace(path + ".tmp", path)
+
+def get_preferences(context):
+    addon = context.preferences.addons.get(__package__)
+    return addon.preferences if addon else None
+
+def library_roots(context):
+    prefs = get_preferences(context)
+    return [bpy.path.abspath(entry.path) for entry in prefs.light_libraries if entry.path] if prefs else []
+
+def library_files(context):
+    """Every .blend file the configured libraries point at, sorted (walks the disk)."""
+    files = set()
+    for path in library_roots(context):
+        if os.path.isfile(path) and path.endswith(".blend"):
+            files.add(path)
+        elif os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.update(os.path.join(root, name) for name in names if name.endswith(".blend"))
+    return sorted(files)
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return st.st_mtime, st.st_size
+
+def stale_files(paths):
+    """Files missing from the catalog or changed since they were catalogued."""
+    catalog = get_catalog()
+    stale = []
+    for path in paths:
+        try:
+            mtime, size = _file_stamp(path)
+        except OSError:
+            continue
+        entry = catalog.get(path)
+        if (not entry or entry.get("version") != CATALOG_VERSION
+                or entry["mtime"] != mtime or entry["size"] != size):
+            stale.append(path)
+    return stale
+
+# -------------------------------------------------------------------------
+# Cataloguing (runs in a background Blender)
+# -------------------------------------------------------------------------
+def catalog_library(blend_path, out_path):
+    """Write a catalog entry for one library file as JSON.
+
+    Light objects are found by the data they use. Objects named after a
+    light datablock (or owning a BB_ linking collection) are linked first;
+    only if some light data is still without an object are the remaining
+    objects linked too, since their type can't be read without loading them.
+    """
+    with bpy.data.libraries.load(blend_path, link=True) as (data_from, data_to):
+        data_to.lights = list(data_from.lights)
+        data_to.objects = snapshot_object_names(data_from.objects, set(data_from.lights), data_from.collections)
+        collections = [name for name in data_from.collections if not name.startswith("BB_")]
+    data = {light.name: light_record(light) for light in data_to.lights if light}
+    objects = [obj for obj in data_to.objects if obj and obj.type == 'LIGHT']
+
+    if set(data) - {obj.data.name for obj in objects}:
+        linked = {obj.name for obj in data_to.objects if obj}
+        with bpy.data.libraries.load(blend_path, link=True) as (data_from, data_to):
+            data_to.objects = [name for name in data_from.objects if name not in linked]
+        objects += [obj for obj in data_to.objects if obj and obj.type == 'LIGHT']
+
+    lights = []
+    used = set()
+    for obj in sorted(objects, key=lambda o: o.name):
+        light = data.get(obj.data.name, {})
+        used.add(obj.data.name)
+        lights.append({"name": obj.name, "data": obj.data.name, "light_type": light.get("light_type", ""),
+                       "energy": light.get("energy", 0.0), "color": light.get("color", [1.0, 1.0, 1.0])})
+    # Light datablocks without a catalogued object are offered on their own.
+    for name, light in data.items():
+        if name not in used:
+            lights.append({"name": name, "data": name, "light_type": light["light_type"],
+                           "energy": light.get("energy", 0.0), "color": light.get("color", [1.0, 1.0, 1.0]),
+                           "orphan": True})
+
+    mtime, size = _file_stamp(blend_path)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CATALOG_VERSION, "mtime": mtime, "size": size,
+                   "lights": sorted(lights, key=lambda l: l["name"].lower()),
+                   "collections": sorted(collections, key=str.lower)}, f)
+
+def main(argv=None):
+    """Background entry point: ``--catalog <blend> <out.json>``."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if argv and argv[0] == "--catalog":
+        catalog_library(argv[1], argv[2])
+
+# The running scan: queued paths, live processes and their output files.
+_scan = None
+
+def start_library_scan(paths):
+    """Catalogue ``paths`` in background processes; returns the number queued."""
+    global _scan
+    if not paths:
+        return 0
+    _scan = {"queue": list(paths), "running": [], "tmp": tempfile.mkdtemp(prefix="le_library_"),
+             "total": len(paths), "done": 0, "failed": 0}
+    bpy.app.timers.register(_poll_library_scan, first_interval=0.1)
+    return len(paths)
+
+def _poll_library_scan():
+    global _scan
+    if _scan is None:
+        return None
+    catalog = get_catalog()
+    still_running = []
+    for path, out, process in _scan["running"]:
+        if process.poll() is None:
+            still_running.append((path, out, process))
+            continue
+        try:
+            with open(out, encoding="utf-8") as f:
+                catalog[path] = json.load(f)
+        except (OSError, ValueError):
+            _scan["failed"] += 1
+        _scan["done"] += 1
+    _scan["running"] = still_running
+
+    while _scan["queue"] and len(_scan["running"]) < MAX_SCAN_PROCESSES:
+        path = _scan["queue"].pop(0)
+        out = os.path.join(_scan["tmp"], f"{len(_scan['queue'])}.json")
+        process = subprocess.Popen(background_command("LightLibrary", ["--catalog", path, out]),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _scan["running"].append((path, out, process))
+
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    if _scan["running"]:
+        return 0.5
+    save_catalog()
+    shutil.rmtree(_scan["tmp"], ignore_errors=True)
+    _scan = None
+    return None
+
+# -------------------------------------------------------------------------
+# Append
+# -------------------------------------------------------------------------
+# Lights ticked in the browser, as (library path, light name).
+_chosen = set()
+
+def append_library_lights(context, path, names, collections=()):
+    """Append only the named lights (and collections) from a library file.
+
+    Light objects come with their own data; catalog entries that are bare
+    light datablocks get a new object. Everything lands in the active
+    collection, appended collections under the scene collection.
+    """
+    entries = {l["name"]: l for l in get_catalog().get(path, {}).get("lights", ())}
+    object_names = [n for n in names if n in entries and not entries[n].get("orphan")]
+    data_names = [n for n in names if n in entries and entries[n].get("orphan")]
+    with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+        data_to.objects = [n for n in object_names if n in data_from.objects]
+        data_to.lights = [n for n in data_names if n in data_from.lights]
+        data_to.collections = [n for n in collections if n in data_from.collections]
+
+    target = context.collection or context.scene.collection
+    added = []
+    for obj in data_to.objects:
+        if obj:
+            target.objects.link(obj)
+            added.append(obj)
+    for light in data_to.lights:
+        if light:
+            obj = bpy.data.objects.new(light.name, light)
+            target.objects.link(obj)
+            added.append(obj)
+    for collection in data_to.collections:
+        if collection:
+            context.scene.collection.children.link(collection)
+    return added, len([c for c in data_to.collections if c])
+
+# -------------------------------------------------------------------------
+# Preferences
+# -------------------------------------------------------------------------
+class LE_LibraryPath(PropertyGroup):
+    path: StringProperty(name="Library", subtype='FILE_PATH',
+                         description="A .blend file, or a folder searched for .blend files")
+
+class LE_OT_AddLightLibrary(Operator):
+    """Add a light library path"""
+    bl_idname = "le.add_light_library"
+    bl_label = "Add Light Library"
+
+    def execute(self, context):
+        get_preferences(context).light_libraries.add()
+        return {'FINISHED'}
+
+class LE_OT_RemoveLightLibrary(Operator):
+    """Remove this light library path"""
+    bl_idname = "le.remove_light_library"
+    bl_label = "Remove Light Library"
+
+    index: IntProperty()
+
+    def execute(self, context):
+        prefs = get_preferences(context)
+        if 0 <= self.index < len(prefs.light_libraries):
+            prefs.light_libraries.remove(self.index)
+        return {'FINISHED'}
+
+class LE_AddonPreferences(AddonPreferences):
+    bl_idname = __package__
+
+    light_libraries: CollectionProperty(type=LE_LibraryPath)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text="Light Libraries")
+        for i, entry in enumerate(self.light_libraries):
+            row = layout.row(align=True)
+            row.prop(entry, "path", text="")
+            row.operator("le.remove_light_library", text="", icon='X').index = i
+        layout.operator("le.add_light_library", icon='ADD')
+
+# -------------------------------------------------------------------------
+# Operators
+# -------------------------------------------------------------------------
+class LE_OT_ScanLightLibraries(Operator):
+    """Catalogue new or changed library files (unchanged files come from the cache)"""
+    bl_idname = "le.scan_light_libraries"
+    bl_label = "Scan Light Libraries"
+
+    def execute(self, context):
+        if _scan is not None:
+            self.report({'WARNING'}, "A library scan is already running")
+            return {'CANCELLED'}
+        files = library_files(context)
+        catalog = get_catalog()
+        gone = set(catalog) - set(files)
+        for path in gone:
+            del catalog[path]
+        if gone:
+            save_catalog()
+        queued = start_library_scan(stale_files(files))
+        self.report({'INFO'}, f"Scanning {queued} library file(s)" if queued else "Light libraries are up to date")
+        return {'FINISHED'}
+
+class LE_OT_ChooseLibraryLight(Operator):
+    """Tick or untick this light for appending"""
+    bl_idname = "le.choose_library_light"
+    bl_label = "Choose Library Light"
+
+    path: StringProperty()
+    name: StringProperty()
+
+    def execute(self, context):
+        _chosen.symmetric_difference_update({(self.path, self.name)})
+        return {'FINISHED'}
+
+class LE_OT_AppendLibraryLights(Operator):
+    """Append the ticked lights, or the given collection, from the light libraries"""
+    bl_idname = "le.append_library_lights"
+    bl_label = "Append Lights"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    path: StringProperty(options={'HIDDEN'})
+    collection: StringProperty(options={'HIDDEN'})
+
+    def execute(self, context):
+        if self.collection:
+            by_path = {self.path: ([], [self.collection])}
+        else:
+            by_path = {}
+            for path, name in sorted(_chosen):
+                by_path.setdefault(path, ([], []))[0].append(name)
+        if not by_path:
+            self.report({'WARNING'}, "Tick the lights to append first")
+            return {'CANCELLED'}
+        lights = collections = 0
+        for path, (names, colls) in by_path.items():
+            if not os.path.exists(path):
+                self.report({'WARNING'}, f"Library not found: {path}")
+                continue
+            added, count = append_library_lights(context, path, names, colls)
+            lights += len(added)
+            collections += count
+        if not self.collection:
+            _chosen.clear()
+        self.report({'INFO'}, f"Appended {lights} light(s), {collections} collection(s)")
+        return {'FINISHED'}
+
+# -------------------------------------------------------------------------
+# Panel
+# -------------------------------------------------------------------------
+class LE_PT_LightLibrary(Panel):
+    bl_label = "Light Library"
+    bl_idname = "LE_PT_light_library"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Light Editor"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
+        row = layout.row(align=True)
+        row.prop(scene, "le_library_filter", text="", icon='VIEWZOOM')
+        row.operator("le.scan_light_libraries", text="", icon='FILE_REFRESH')
+        if _scan is not None:
+            layout.label(text=f"Scanning {_scan['done']}/{_scan['total']}", icon='TIME')
+        if _chosen:
+            layout.operator("le.append_library_lights", text=f"Append {len(_chosen)} Light(s)",
+                            icon='APPEND_BLEND')
+
+        # Drawn from the catalog alone, so redraws never touch the disk.
+        catalog = get_catalog()
+        pattern = scene.le_library_filter.lower()
+        roots = tuple(library_roots(context))
+        files = sorted(path for path in catalog if path.startswith(roots))
+        if not files:
+            layout.label(text="No catalogued libraries", icon='INFO')
+            return
+        for path in files:
+            entry = catalog[path]
+            lights = [l for l in entry["lights"] if not pattern or pattern in l["name"].lower()]
+            colls = [c for c in entry["collections"] if not pattern or pattern in c.lower()]
+            if pattern and not lights and not colls:
+                continue
+            # Libraries start folded, so the stored flag means "expanded".
+            key = f"lib_{path}"
+            expanded = LightEditor.group_collapse_dict.get(key, False)
+            box = layout.box()
+            row = box.row(align=True)
+            row.operator("light_editor.toggle_group", text="", emboss=True,
+                         icon='DOWNARROW_HLT' if expanded else 'RIGHTARROW').group_key = key
+            row.label(text=f"{os.path.basename(path)} ({len(lights)})", icon='FILE_BLEND')
+            if not expanded:
+                continue
+            for light in lights:
+                chosen = (path, light["name"]) in _chosen
+                row = box.row(align=True)
+                op = row.operator("le.choose_library_light", text="", depress=chosen,
+                                  icon='CHECKBOX_HLT' if chosen else 'CHECKBOX_DEHLT')
+                op.path, op.name = path, light["name"]
+                row.label(text=light["name"], icon='LIGHT_DATA' if light.get("orphan") else 'LIGHT')
+                row.label(text=f"{light['light_type'].title()} {light['energy']:.4g} W")
+            for name in colls:
+                row = box.row(align=True)
+                row.label(text=name, icon='OUTLINER_COLLECTION')
+                op = row.operator("le.append_library_lights", text="", icon='APPEND_BLEND')
+                op.path, op.collection = path, name
+
+# -------------------------------------------------------------------------
+# Registration
+# -------------------------------------------------------------------------
+classes = (
+    LE_LibraryPath,
+    LE_OT_AddLightLibrary,
+    LE_OT_RemoveLightLibrary,
+    LE_AddonPreferences,
+    LE_OT_ScanLightLibraries,
+    LE_OT_ChooseLibraryLight,
+    LE_OT_AppendLibraryLights,
+    LE_PT_LightLibrary,
+)
+
+def register():
+    bpy.types.Scene.le_library_filter = StringProperty(
+        name="Filter",
+        default="",
+        description="Filter library lights and collections by name"
+    )
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    global _scan
+    if bpy.app.timers.is_registered(_poll_library_scan):
+        bpy.app.timers.unregister(_poll_library_scan)
+    if _scan is not None:
+        shutil.rmtree(_scan["tmp"], ignore_errors=True)
+        _scan = None
+    _chosen.clear()
+    for cls in reversed(classes):
+        try:
+            bpy.utils.unregister_class(cls)
+        except (RuntimeError, ValueError):
+            pass
+    if hasattr(bpy.types.Scene, "le_library_filter"):
+        try:
+            del bpy.types.Scene.le_library_filter
+        except (AttributeError, TypeError):
+            pass
@@ -0,0 +1,720 @@
+import bpy
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from bpy.types import Operator, Panel
+from bpy.props import BoolProperty, EnumProperty, IntProperty, StringProperty
+
+from .LightEditor import (
+    find_emissive_objects,
+    apply_light_visibility,
+    gather_layer_collections,
+    emission_toggle_socket,
+    install_emission_gate,
+    set_environment_factor,
+    ENV_SOCKETS,
+)
+from .LightStates import store_light_state, recall_light_state
+
+# -------------------------------------------------------------------------
+# Solo renders
+# -------------------------------------------------------------------------
+# One still per light, lightgroup, emissive material or the environment,
+# rendered by a pool of background Blender processes. From the UI use the
+# Background Renders panel; from a shell:
+#
+#   blender -b shot.blend --python-expr "import addon_utils, importlib; \
+#       addon_utils.enable('<addon module>'); \
+#       importlib.import_module('<addon module>.LightRender').main()" \
+#       -- --output /renders/solo --workers 4 --kinds LIGHT,LIGHTGROUP
+#
+# Add --lightgroups (and --cores-per-job N) to render the lightgroup plan
+# below instead. Targets are written to manifest.json in the output folder.
+# Each worker appends a line per finished target to its own
+# progress_<pid>.jsonl, so an interrupted run resumes where it stopped. The
+# coordinator alone decides what to resume: workers render every id in the
+# manifest's "pending" list.
+MANIFEST_NAME = "manifest.json"
+# Lighting state the worker snapshots before isolating, and recalls after each
+# render. It only ever exists in the worker's in-memory copy of the file.
+BASELINE_STATE = "__solo_baseline__"
+
+TARGET_KINDS = [
+    ('LIGHT', "Lights", "One render per light"),
+    ('LIGHTGROUP', "Lightgroups", "One render per lightgroup of the view layer"),
+    ('MATERIAL', "Emissive Materials", "One render per emissive material"),
+    ('ENVIRONMENT', "Environment", "One render of the world alone"),
+]
+
+# -------------------------------------------------------------------------
+# Targets
+# -------------------------------------------------------------------------
+def _target(kind, name, lights=(), materials=(), environment=False):
+    return {
+        "id": f"{kind.lower()}_{bpy.path.clean_name(name)}",
+        "kind": kind,
+        "name": name,
+        "lights": sorted(lights),
+        "materials": sorted(materials),
+        "environment": environment,
+    }
+
+def unique_ids(targets):
+    """Make target ids unique, in place; returns ``targets``.
+
+    bpy.path.clean_name maps "Key.001" and "Key_001" to the same string, and
+    targets sharing an id would share output and progress files. Colliding
+    ids get a short hash of the full name and view layers, which stays the
+    same from run to run so resuming still finds them.
+    """
+    counts = {}
+    for target in targets:
+        counts[target["id"]] = counts.get(target["id"], 0) + 1
+    for target in targets:
+        if counts[target["id"]] > 1:
+            source = "\t".join(target.get("view_layers", [])) + "\n" + target.get("name", "")
+            target["id"] += "_" + hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+    return targets
+
+def lightgroup_target(context, name, lights, emissive):
+    """Target holding a lightgroup's lights, emissive materials and world, or None if empty."""
+    members = [obj.name for obj in lights if getattr(obj, "lightgroup", "") == name]
+    materials = set()
+    for obj in context.view_layer.objects:
+        if obj.type == 'MESH' and getattr(obj, "lightgroup", "") == name:
+            materials.update(slot.material.name for slot in obj.material_slots
+                             if slot.material and slot.material.name in emissive)
+    world = context.scene.world
+    env = bool(world and getattr(world, "lightgroup", "") == name)
+    if members or materials or env:
+        return _target('LIGHTGROUP', name, members, materials, env)
+    return None
+
+def enumerate_solo_targets(context, kinds):
+    """Isolation targets for the view layer, grouped the way the editor groups them.
+
+    Only lights that currently render are considered; a light that is off
+    would produce a black frame.
+    """
+    view_layer = context.view_layer
+    lights = [obj for obj in view_layer.objects if obj.type == 'LIGHT' and not obj.hide_render]
+    emissive = {mat.name for obj, mat, node in find_emissive_objects(context)}
+    targets = []
+
+    if 'LIGHT' in kinds:
+        targets.extend(_target('LIGHT', obj.name, lights=[obj.name]) for obj in lights)
+
+    if 'LIGHTGROUP' in kinds and hasattr(view_layer, "lightgroups"):
+        for lightgroup in view_layer.lightgroups:
+            target = lightgroup_target(context, lightgroup.name, lights, emissive)
+            if target:
+                targets.append(target)
+
+    if 'MATERIAL' in kinds:
+        targets.extend(_target('MATERIAL', name, materials=[name]) for name in sorted(emissive))
+
+    if 'ENVIRONMENT' in kinds and context.scene.world:
+        targets.append(_target('ENVIRONMENT', context.scene.world.name, environment=True))
+    return unique_ids(targets)
+
+# -------------------------------------------------------------------------
+# Worker side
+# -------------------------------------------------------------------------
+def isolate_target(context, target):
+    """Leave only the target's lights, emissive materials and world switched on.
+
+    Works on the in-memory file only: lights are hidden from render, other
+    emitters gated off and the environment controls closed. Returns
+    {gate: factor} for the gates it closed, to be reopened after the render.
+    """
+    keep = set(target["lights"])
+    apply_light_visibility((obj, obj.hide_viewport, obj.name not in keep)
+                           for obj in context.scene.objects if obj.type == 'LIGHT')
+
+    keep = set(target["materials"])
+    closed = {}
+    for obj, mat, node in find_emissive_objects(context):
+        if mat.name in keep:
+            continue
+        # A closed gate also silences a strength driven by a texture or driver.
+        gate = install_emission_gate(mat, node)
+        if gate:
+            closed.setdefault(gate, gate.inputs[1].default_value)
+            gate.inputs[1].default_value = 0.0
+            continue
+        # Linked materials can't be gated; zero what can be written.
+        socket = emission_toggle_socket(node)
+        if socket and not socket.is_linked:
+            socket.default_value = 0.0
+
+    world = context.scene.world
+    if not target["environment"]:
+        for name in ENV_SOCKETS:
+            set_environment_factor(world, name, 0.0)
+    return closed
+
+def read_progress(output_dir):
+    """Finished targets from every worker's progress file: {id: record}."""
+    done = {}
+    for entry in os.scandir(output_dir):
+        if not (entry.name.startswith("progress_") and entry.name.endswith(".jsonl")):
+            continue
+        with open(entry.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a killed worker
+                done[record["id"]] = record
+    return done
+
+def reset_progress(output_dir, keep=()):
+    """Fold the progress files into one holding only the records of ``keep``.
+
+    Targets about to be rendered again must not count as finished from an
+    earlier run, in the progress shown or in the final summary.
+    """
+    done = read_progress(output_dir)
+    for entry in os.scandir(output_dir):
+        if entry.name.startswith("progress_") and entry.name.endswith(".jsonl"):
+            os.remove(entry.path)
+    kept = [done[target_id] for target_id in keep if target_id in done]
+    if kept:
+        with open(os.path.join(output_dir, "progress_previous.jsonl"), "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in kept)
+
+def manifest_view_layer(manifest):
+    """The (scene, view layer) a manifest was written for, made the only one rendering.
+
+    A background Blender opens the file on whatever layer it was saved with,
+    which needn't be the one the targets were enumerated on.
+    """
+    scene = bpy.data.scenes.get(manifest.get("scene", "")) or bpy.context.scene
+    view_layer = scene.view_layers.get(manifest.get("view_layer", "")) or scene.view_layers[0]
+    for vl in scene.view_layers:
+        vl.use = vl == view_layer
+    return scene, view_layer
+
+def run_worker(manifest_path, shard, shards):
+    """Render this worker's share of the pending targets, recording each one."""
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    scene, view_layer = manifest_view_layer(manifest)
+    # Isolation reads context.scene/view_layer, so point them at the manifest's.
+    with bpy.context.temp_override(scene=scene, view_layer=view_layer):
+        _render_targets(bpy.context, scene, manifest_path, manifest, shard, shards)
+
+def _render_targets(context, scene, manifest_path, manifest, shard, shards):
+    output_dir = os.path.dirname(manifest_path)
+    targets = {t["id"]: t for t in manifest["targets"]}
+    mine = manifest["pending"][shard::shards]
+
+    store_light_state(context, BASELINE_STATE)
+    progress_path = os.path.join(output_dir, f"progress_{os.getpid()}.jsonl")
+    with open(progress_path, "a", encoding="utf-8") as progress:
+        for target_id in mine:
+            target = targets[target_id]
+            base = os.path.join(output_dir, target_id)
+            started = time.time()
+            closed = {}
+            try:
+                closed = isolate_target(context, target)
+                scene.render.filepath = base
+                bpy.ops.render.render(write_still=True, scene=scene.name)
+                status = "ok"
+            except Exception as e:
+                status = f"error: {e}"
+            finally:
+                recall_light_state(context, BASELINE_STATE)
+                for gate, factor in closed.items():
+                    gate.inputs[1].default_value = factor
+            record = {
+                "id": target_id,
+                "status": status,
+                "output": base + scene.render.file_extension,
+                "seconds": round(time.time() - started, 2),
+            }
+            progress.write(json.dumps(record) + "\n")
+            progress.flush()
+
+# -------------------------------------------------------------------------
+# Coordinator side
+# -------------------------------------------------------------------------
+def background_command(module, args, blend_path=None, threads=None):
+    """Command line running ``<add-on>.<module>.main(args)`` in background Blender.
+
+    The add-on is enabled in the new process first, so its properties and
+    helpers behave exactly as they do here.
+    """
+    package = __package__
+    expr = ("import addon_utils, importlib; "
+            f"addon_utils.enable({package!r}, default_set=False); "
+            f"importlib.import_module({package + '.' + module!r}).main()")
+    command = [bpy.app.binary_path, "-b"]
+    if blend_path:
+        command.append(blend_path)
+    if threads:
+        command += ["-t", str(threads)]
+    return command + ["--python-exit-code", "1", "--python-expr", expr, "--", *args]
+
+def start_solo_renders(context, output_dir, kinds, workers, resume=True):
+    """Write the manifest and launch the worker processes.
+
+    Finished targets whose image still exists are skipped when resuming.
+    Returns a job dict for poll_solo_renders, or None if nothing is pending.
+    """
+    output_dir = bpy.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    targets = enumerate_solo_targets(context, kinds)
+
+    done = read_progress(output_dir) if resume else {}
+    pending = [t["id"] for t in targets
+               if not (done.get(t["id"], {}).get("status") == "ok"
+                       and os.path.exists(done[t["id"]]["output"]))]
+    reset_progress(output_dir, [t["id"] for t in targets if t["id"] not in pending])
+    manifest = {
+        "blend": bpy.data.filepath,
+        "scene": context.scene.name,
+        "view_layer": context.view_layer.name,
+        "targets": targets,
+        "pending": pending,
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    if not pending:
+        return None
+
+    workers = max(1, min(workers, len(pending)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    processes = [subprocess.Popen(background_command("LightRender",
+                                                     ["--worker", manifest_path, str(i), str(workers)],
+                                                     bpy.data.filepath, threads),
+                                  stdout=subprocess.DEVNULL)
+                 for i in range(workers)]
+    return {"output_dir": output_dir, "manifest": manifest_path, "processes": processes, "queue": [],
+            "slots": workers, "pending": set(pending), "total": len(pending), "done": 0,
+            "started": time.time()}
+
+def poll_solo_renders(job):
+    """Refresh the job's progress and start queued workers as slots free up.
+
+    True while any worker is still running or waiting in the queue.
+    """
+    running = sum(1 for p in job["processes"] if p.poll() is None)
+    while job["queue"] and running < job["slots"]:
+        job["processes"].append(subprocess.Popen(job["queue"].pop(0), stdout=subprocess.DEVNULL))
+        running += 1
+    done = read_progress(job["output_dir"])
+    job["done"] = sum(1 for k in job["pending"] if k in done)
+    return running > 0
+
+def finish_solo_renders(job):
+    """Fold the progress files into the manifest as a summary."""
+    with open(job["manifest"], encoding="utf-8") as f:
+        manifest = json.load(f)
+    done = read_progress(job["output_dir"])
+    for target in manifest["targets"]:
+        record = done.get(target["id"])
+        target["status"] = record["status"] if record else "missing"
+        target["output"] = record["output"] if record else ""
+        target["seconds"] = record["seconds"] if record else 0.0
+    manifest["summary"] = {
+        "rendered": sum(1 for t in manifest["targets"] if t["status"] == "ok"),
+        "failed": [t["id"] for t in manifest["targets"] if t["status"] != "ok"],
+        "exit_codes": [p.returncode for p in job["processes"]],
+        "seconds": round(time.time() - job["started"], 2),
+    }
+    with open(job["manifest"], "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest["summary"]
+
+def main(argv=None):
+    """Command-line entry point, for both the coordinator and its workers."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    if argv and argv[0] == "--worker":
+        run_worker(argv[1], int(argv[2]), int(argv[3]))
+        return
+    if argv and argv[0] == "--plan-job":
+        run_plan_job(argv[1], argv[2])
+        return
+
+    import argparse
+    parser = argparse.ArgumentParser(prog="LightRender")
+    parser.add_argument("--output", default="//solo_renders/")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--kinds", default="LIGHT")
+    parser.add_argument("--no-resume", action="store_true")
+    parser.add_argument("--lightgroups", action="store_true",
+                        help="render the lightgroup plan instead of solo passes")
+    parser.add_argument("--cores-per-job", type=int, default=8)
+    parser.add_argument("--split-view-layers", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.lightgroups:
+        job = start_lightgroup_renders(bpy.context, args.output, args.cores_per_job,
+                                       args.split_view_layers, resume=not args.no_resume)
+    else:
+        job = start_solo_renders(bpy.context, args.output, set(args.kinds.upper().split(",")),
+                                 args.workers, resume=not args.no_resume)
+    if job is None:
+        print("Solo renders: nothing to render")
+        return
+    while poll_solo_renders(job):
+        print(f"Solo renders: {job['done']}/{job['total']}")
+        time.sleep(2.0)
+    summary = finish_solo_renders(job)
+    print(f"Solo renders: {summary['rendered']} rendered, {len(summary['failed'])} failed "
+          f"in {summary['seconds']}s")
+
+# -------------------------------------------------------------------------
+# Lightgroup render planner
+# -------------------------------------------------------------------------
+# Every lightgroup of a view layer comes out of one Cycles render as its own
+# AOV pass, so a view layer needs one render however many groups it has.
+# View layers that differ only in their lightgroups see the same objects
+# the same way and write the same passes; their groups can all be added to
+# one of them and rendered together. Only when lightgroup passes aren't
+# available (another engine) does a group need a solo render of its own.
+
+# View layer settings outside the use_pass_*/pass_* names that change which
+# outputs a layer writes.
+PASS_SETTINGS = {"use_freestyle", "use_denoising", "denoising_store_passes", "use_sky", "use_solid",
+                 "use_strand", "use_volumes", "use_ao"}
+
+def pass_settings(struct):
+    """Sorted (name, value) pairs of a view layer (or engine sub-struct)'s pass options."""
+    if struct is None:
+        return ()
+    settings = []
+    for prop in struct.bl_rna.properties:
+        name = prop.identifier
+        if prop.type not in {'BOOLEAN', 'INT', 'FLOAT', 'ENUM'} or getattr(prop, "is_array", False):
+            continue
+        if not (name.startswith(("use_pass_", "pass_")) or name in PASS_SETTINGS):
+            continue
+        value = getattr(struct, name)
+        settings.append((name, tuple(sorted(value)) if isinstance(value, set) else value))
+    return tuple(sorted(settings))
+
+def view_layer_signature(view_layer):
+    """What a view layer renders and which passes it writes, ignoring its lightgroups.
+
+    Pass options (Blender's, Cycles', EEVEE's), cryptomatte, AOVs and
+    Freestyle are part of it, so merging two layers never drops an output
+    one of them would have written.
+    """
+    collections = []
+    gather_layer_collections(view_layer.layer_collection, collections)
+    flags = tuple(sorted((lc.collection.name, lc.exclude, lc.holdout, lc.indirect_only)
+                         for lc in collections))
+    override = view_layer.material_override
+    world_override = getattr(view_layer, "world_override", None)
+    aovs = tuple((aov.name, aov.type) for aov in getattr(view_layer, "aovs", ()))
+    return (flags,
+            override.name if override else "",
+            world_override.name if world_override else "",
+            view_layer.samples,
+            view_layer.use_motion_blur,
+            pass_settings(view_layer),
+            pass_settings(getattr(view_layer, "cycles", None)),
+            pass_settings(getattr(view_layer, "eevee", None)),
+            aovs)
+
+def plan_lightgroup_renders(context, split_view_layers=False):
+    """Fewest render jobs that produce every lightgroup of every rendered view layer.
+
+    View layers with the same signature are merged into one representative
+    carrying the union of their lightgroups. All representatives go into
+    one job, or one job each with ``split_view_layers`` so they can render
+    in parallel. Each job lists in "covers" the (view layer, lightgroup)
+    outputs it produces and the layer they end up on.
+    """
+    scene = context.scene
+    layers = [vl for vl in scene.view_layers if vl.use and len(getattr(vl, "lightgroups", ()))]
+    if scene.render.engine != 'CYCLES':
+        lights = [obj for obj in scene.objects if obj.type == 'LIGHT' and not obj.hide_render]
+        emissive = {mat.name for obj, mat, node in find_emissive_objects(context)}
+        jobs = []
+        for vl in layers:
+            for lightgroup in vl.lightgroups:
+                target = lightgroup_target(context, lightgroup.name, lights, emissive)
+                if target:
+                    target.update(id=f"solo_{bpy.path.clean_name(vl.name)}_{bpy.path.clean_name(lightgroup.name)}",
+                                  kind='SOLO', view_layers=[vl.name],
+                                  covers=[[vl.name, lightgroup.name, vl.name]])
+                    jobs.append(target)
+        return unique_ids(jobs)
+
+    merged = {}
+    for vl in layers:
+        merged.setdefault(view_layer_signature(vl), []).append(vl)
+    groups = []
+    for members in merged.values():
+        representative = members[0].name
+        groups.append({
+            "view_layers": [representative],
+            "lightgroups": {representative: sorted({lg.name for vl in members for lg in vl.lightgroups})},
+            "covers": [[vl.name, lg.name, representative] for vl in members for lg in vl.lightgroups],
+        })
+    if not split_view_layers and len(groups) > 1:
+        groups = [{
+            "view_layers": [name for g in groups for name in g["view_layers"]],
+            "lightgroups": {k: v for g in groups for k, v in g["lightgroups"].items()},
+            "covers": [c for g in groups for c in g["covers"]],
+        }]
+    return unique_ids([dict(g, id="aov_" + "_".join(bpy.path.clean_name(n) for n in g["view_layers"]), kind='AOV')
+                       for g in groups])
+
+def run_plan_job(manifest_path, job_id):
+    """Render one planned job in this (background) process."""
+    context = bpy.context
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    scene = bpy.data.scenes.get(manifest.get("scene", "")) or context.scene
+    job = next(t for t in manifest["targets"] if t["id"] == job_id)
+    output_dir = os.path.dirname(manifest_path)
+    base = os.path.join(output_dir, job_id)
+    started = time.time()
+    try:
+        for vl in scene.view_layers:
+            vl.use = vl.name in job["view_layers"]
+        if job["kind"] == 'AOV':
+            for name, lightgroups in job["lightgroups"].items():
+                vl = scene.view_layers[name]
+                existing = {lg.name for lg in vl.lightgroups}
+                for lightgroup in lightgroups:
+                    if lightgroup not in existing:
+                        vl.lightgroups.add(name=lightgroup)
+            # One multilayer EXR holds every view layer and lightgroup pass.
+            scene.render.image_settings.file_format = 'OPEN_EXR_MULTILAYER'
+        else:
+            with context.temp_override(scene=scene, view_layer=scene.view_layers[job["view_layers"][0]]):
+                isolate_target(bpy.context, job)
+        scene.render.filepath = base
+        bpy.ops.render.render(write_still=True, scene=scene.name)
+        status = "ok"
+    except Exception as e:
+        status = f"error: {e}"
+    record = {
+        "id": job_id,
+        "status": status,
+        "output": base + scene.render.file_extension,
+        "seconds": round(time.time() - started, 2),
+    }
+    with open(os.path.join(output_dir, f"progress_{os.getpid()}.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+def start_lightgroup_renders(context, output_dir, cores_per_job, split_view_layers=False, resume=True):
+    """Plan the lightgroup renders and queue them on a local process pool.
+
+    As many jobs run at once as ``cores_per_job`` fits into the machine's
+    CPU count; each process renders with that many threads.
+    """
+    output_dir = bpy.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    jobs = plan_lightgroup_renders(context, split_view_layers)
+
+    done = read_progress(output_dir) if resume else {}
+    pending = [j["id"] for j in jobs
+               if not (done.get(j["id"], {}).get("status") == "ok"
+                       and os.path.exists(done[j["id"]]["output"]))]
+    reset_progress(output_dir, [j["id"] for j in jobs if j["id"] not in pending])
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"blend": bpy.data.filepath, "scene": context.scene.name,
+                   "targets": jobs, "pending": pending}, f, indent=2)
+    if not pending:
+        return None
+
+    cores = os.cpu_count() or 1
+    threads = max(1, min(cores_per_job, cores))
+    queue = [background_command("LightRender", ["--plan-job", manifest_path, job_id],
+                                bpy.data.filepath, threads)
+             for job_id in pending]
+    job = {"output_dir": output_dir, "manifest": manifest_path, "processes": [], "queue": queue,
+           "slots": max(1, cores // threads), "pending": set(pending), "total": len(pending),
+           "done": 0, "started": time.time()}
+    poll_solo_renders(job)
+    return job
+
+# -------------------------------------------------------------------------
+# UI
+# -------------------------------------------------------------------------
+# The running job, polled by a timer so the UI stays responsive.
+_solo_job = None
+
+def _poll_solo_job():
+    if _solo_job is None:
+        return None
+    running = poll_solo_renders(_solo_job)
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    if running:
+        return 2.0
+    _solo_job["summary"] = finish_solo_renders(_solo_job)
+    _solo_job["processes"] = []
+    return None
+
+def _job_running():
+    return bool(_solo_job and (_solo_job["queue"] or any(p.poll() is None for p in _solo_job["processes"])))
+
+class LE_OT_RenderSolo(Operator):
+    """Render every light, lightgroup or emissive material on its own in background processes"""
+    bl_idname = "le.render_solo"
+    bl_label = "Render Solo Passes"
+
+    kinds: EnumProperty(name="Targets", items=TARGET_KINDS, options={'ENUM_FLAG'}, default={'LIGHT'})
+    workers: IntProperty(name="Workers", description="Blender processes rendering in parallel",
+                         default=2, min=1, max=64)
+    output_dir: StringProperty(name="Output", subtype='DIR_PATH', default="//solo_renders/")
+    resume: BoolProperty(name="Resume", description="Skip targets finished by a previous run", default=True)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "kinds")
+        layout.prop(self, "output_dir")
+        layout.prop(self, "workers")
+        layout.prop(self, "resume")
+        if bpy.data.is_dirty:
+            layout.label(text="Unsaved changes won't be rendered", icon='ERROR')
+
+    def execute(self, context):
+        global _solo_job
+        if not bpy.data.is_saved:
+            self.report({'WARNING'}, "Save the file first, workers render it from disk")
+            return {'CANCELLED'}
+        if _job_running():
+            self.report({'WARNING'}, "Renders are already running")
+            return {'CANCELLED'}
+        _solo_job = start_solo_renders(context, self.output_dir, self.kinds, self.workers, self.resume)
+        if _solo_job is None:
+            self.report({'INFO'}, "All solo renders are already done")
+            return {'FINISHED'}
+        bpy.app.timers.register(_poll_solo_job, first_interval=2.0)
+        self.report({'INFO'}, f"Rendering {_solo_job['total']} solo pass(es) "
+                              f"in {len(_solo_job['processes'])} process(es)")
+        return {'FINISHED'}
+
+class LE_OT_RenderLightgroupPlan(Operator):
+    """Render every lightgroup of every view layer in the fewest background renders"""
+    bl_idname = "le.render_lightgroup_plan"
+    bl_label = "Render Lightgroups"
+
+    cores_per_job: IntProperty(name="Cores per Job", description="Render threads given to each Blender process",
+                               default=8, min=1, max=256)
+    split_view_layers: BoolProperty(
+        name="One Job per View Layer",
+        description="Render distinct view layers in parallel processes instead of one render",
+        default=False
+    )
+    output_dir: StringProperty(name="Output", subtype='DIR_PATH', default="//lightgroup_renders/")
+    resume: BoolProperty(name="Resume", description="Skip jobs finished by a previous run", default=True)
+
+    @classmethod
+    def poll(cls, context):
+        return any(len(getattr(vl, "lightgroups", ())) for vl in context.scene.view_layers)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "output_dir")
+        layout.prop(self, "cores_per_job")
+        layout.prop(self, "split_view_layers")
+        layout.prop(self, "resume")
+        jobs = plan_lightgroup_renders(context, self.split_view_layers)
+        outputs = sum(len(j["covers"]) for j in jobs)
+        parallel = max(1, (os.cpu_count() or 1) // self.cores_per_job)
+        layout.label(text=f"{outputs} lightgroup output(s) in {len(jobs)} render(s), "
+                          f"{min(parallel, len(jobs))} at a time", icon='INFO')
+        if bpy.data.is_dirty:
+            layout.label(text="Unsaved changes won't be rendered", icon='ERROR')
+
+    def execute(self, context):
+        global _solo_job
+        if not bpy.data.is_saved:
+            self.report({'WARNING'}, "Save the file first, workers render it from disk")
+            return {'CANCELLED'}
+        if _job_running():
+            self.report({'WARNING'}, "Renders are already running")
+            return {'CANCELLED'}
+        _solo_job = start_lightgroup_renders(context, self.output_dir, self.cores_per_job,
+                                             self.split_view_layers, self.resume)
+        if _solo_job is None:
+            self.report({'INFO'}, "All lightgroup renders are already done")
+            return {'FINISHED'}
+        bpy.app.timers.register(_poll_solo_job, first_interval=2.0)
+        self.report({'INFO'}, f"Queued {_solo_job['total']} render job(s), "
+                              f"{_solo_job['slots']} at a time")
+        return {'FINISHED'}
+
+class LE_OT_CancelSoloRenders(Operator):
+    """Stop the running render workers (finished renders are kept)"""
+    bl_idname = "le.cancel_solo_renders"
+    bl_label = "Cancel Renders"
+
+    def execute(self, context):
+        if _solo_job:
+            _solo_job["queue"].clear()
+            for p in _solo_job["processes"]:
+                if p.poll() is None:
+                    p.terminate()
+        return {'FINISHED'}
+
+class LE_PT_SoloRenders(Panel):
+    bl_label = "Background Renders"
+    bl_idname = "LE_PT_solo_renders"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Light Editor"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        row = layout.row(align=True)
+        row.operator("le.render_solo", icon='RENDER_STILL')
+        row.operator("le.render_lightgroup_plan", icon='OUTLINER_OB_LIGHT')
+        job = _solo_job
+        if not job:
+            return
+        if job["processes"]:
+            row.operator("le.cancel_solo_renders", text="", icon='CANCEL')
+            layout.label(text=f"Rendering {job['done']}/{job['total']}", icon='TIME')
+        elif "summary" in job:
+            summary = job["summary"]
+            layout.label(text=f"{summary['rendered']} rendered, {len(summary['failed'])} failed",
+                         icon='CHECKMARK' if not summary["failed"] else 'ERROR')
+
+# -------------------------------------------------------------------------
+# Registration
+# -------------------------------------------------------------------------
+classes = (
+    LE_OT_RenderSolo,
+    LE_OT_RenderLightgroupPlan,
+    LE_OT_CancelSoloRenders,
+    LE_PT_SoloRenders,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    if bpy.app.timers.is_registered(_poll_solo_job):
+        bpy.app.timers.unregister(_poll_solo_job)
+    for cls in reversed(classes):
+        try:
+            bpy.utils.unregister_class(cls)
+        except (RuntimeError, ValueError):
+            pass
@@ -0,0 +1,484 @@
+import bpy
+import json
+import numpy as np
+from mathutils import Matrix
+from bpy.types import Operator
+from bpy.props import BoolProperty, StringProperty
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+
+from .LightEditor import (
+    find_emissive_objects,
+    apply_light_visibility,
+    emission_strength_socket,
+    world_output,
+    environment_link,
+    set_environment_link,
+)
+from .Linking import ensure_bb_collection, ensure_shadow_collection, private_link_collection
+
+# -------------------------------------------------------------------------
+# Rig file format
+# -------------------------------------------------------------------------
+# JSON Lines: a header, then one self-contained record per line, so neither
+# writing nor reading ever holds the whole rig in memory.
+#   {"type": "header", "format": "light-editor-rig", "version": 1, ...}
+#   {"type": "light", "name", "light_type", "energy", "color", ...}
+#   {"type": "object", "name", "data", "matrix_world", "hide_viewport", ...}
+#   {"type": "emissive", "material", "node", "strength", "color"}
+#   {"type": "world", "name", "surface", "volume", "lightgroup"}
+#   {"type": "lightgroups", "view_layer", "names"}
+#   {"type": "link", "light", "kind", "collection", "objects", "collections"}
+RIG_FORMAT = "light-editor-rig"
+RIG_VERSION = 1
+
+# Light attributes present on every light type, as (name, width). These are
+# written back with one foreach_set per attribute on import.
+COMMON_LIGHT_ATTRIBUTES = [
+    ("energy", 1), ("color", 3), ("exposure", 1), ("shadow_soft_size", 1), ("use_shadow", 1),
+    ("specular_factor", 1), ("diffuse_factor", 1), ("volume_factor", 1),
+]
+# Subtype attributes, set one light at a time (foreach can't mix subtypes).
+TYPE_LIGHT_ATTRIBUTES = {
+    'POINT': (),
+    'SUN': ("angle",),
+    'SPOT': ("spot_size", "spot_blend", "show_cone"),
+    'AREA': ("shape", "size", "size_y", "spread"),
+}
+
+def common_light_attributes():
+    props = bpy.types.Light.bl_rna.properties
+    return [(attr, width) for attr, width in COMMON_LIGHT_ATTRIBUTES if attr in props]
+
+def _plain(value):
+    """JSON-friendly copy of an RNA value (arrays become lists)."""
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return [float(v) for v in value]
+
+def _linking_collections(obj):
+    light_linking = getattr(obj, "light_linking", None)
+    if light_linking is None:
+        return ()
+    return (("receiver", light_linking.receiver_collection),
+            ("blocker", light_linking.blocker_collection))
+
+def _link_members(collection):
+    """[(name, link_state)] for a light/shadow linking collection's objects and children."""
+    objects = [[item.name, co.light_linking.link_state]
+               for co, item in zip(collection.collection_objects, collection.objects)]
+    children = [[item.name, cc.light_linking.link_state]
+                for cc, item in zip(collection.collection_children, collection.children)]
+    return objects, children
+
+# -------------------------------------------------------------------------
+# Export
+# -------------------------------------------------------------------------
+def light_record(light):
+    record = {"type": "light", "name": light.name, "light_type": light.type}
+    for attr, width in common_light_attributes():
+        record[attr] = _plain(getattr(light, attr))
+    for attr in TYPE_LIGHT_ATTRIBUTES.get(light.type, ()):
+        if hasattr(light, attr):
+            record[attr] = _plain(getattr(light, attr))
+    return record
+
+def object_record(obj):
+    return {
+        "type": "object",
+        "name": obj.name,
+        "data": obj.data.name,
+        # Column-major, the order foreach_get/foreach_set use.
+        "matrix_world": [v for col in obj.matrix_world.col for v in col],
+        "hide_viewport": obj.hide_viewport,
+        "hide_render": obj.hide_render,
+        "light_enabled": getattr(obj, "light_enabled", not (obj.hide_viewport or obj.hide_render)),
+        "lightgroup": getattr(obj, "lightgroup", ""),
+    }
+
+def emissive_record(mat, node):
+    strength = emission_strength_socket(node)
+    color = node.inputs.get("Color") if node.type == 'EMISSION' else node.inputs.get("Emission Color")
+    record = {"type": "emissive", "material": mat.name, "node": node.name}
+    if strength and not strength.is_linked:
+        record["strength"] = float(strength.default_value)
+    if color and not color.is_linked:
+        record["color"] = _plain(color.default_value)
+    return record
+
+def world_record(world):
+    return {
+        "type": "world",
+        "name": world.name,
+        "surface": environment_link(world, "Surface"),
+        "volume": environment_link(world, "Volume"),
+        "lightgroup": getattr(world, "lightgroup", ""),
+    }
+
+def link_records(obj):
+    for kind, collection in _linking_collections(obj):
+        if collection is None:
+            continue
+        objects, children = _link_members(collection)
+        yield {"type": "link", "light": obj.name, "kind": kind, "collection": collection.name,
+               "objects": objects, "collections": children}
+
+def iter_rig_records(context):
+    """Yield the scene's lighting rig one record at a time."""
+    scene = context.scene
+    yield {"type": "header", "format": RIG_FORMAT, "version": RIG_VERSION,
+           "blender": list(bpy.app.version), "scene": scene.name}
+
+    objs = [obj for obj in scene.objects if obj.type == 'LIGHT']
+    for light in sorted({obj.data for obj in objs}, key=lambda data: data.name):
+        yield light_record(light)
+    for obj in objs:
+        yield object_record(obj)
+
+    seen = set()
+    for obj, mat, node in find_emissive_objects(context):
+        if (mat.name, node.name) not in seen:
+            seen.add((mat.name, node.name))
+            yield emissive_record(mat, node)
+
+    if scene.world:
+        yield world_record(scene.world)
+    for view_layer in scene.view_layers:
+        if hasattr(view_layer, "lightgroups"):
+            yield {"type": "lightgroups", "view_layer": view_layer.name,
+                   "names": [lg.name for lg in view_layer.lightgroups]}
+    for obj in objs:
+        yield from link_records(obj)
+
+def export_rig(context, filepath):
+    """Stream the rig to a JSON Lines file. Returns the number of records."""
+    count = 0
+    with open(filepath, "w", encoding="utf-8") as f:
+        for record in iter_rig_records(context):
+            f.write(json.dumps(record, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+def read_rig_records(filepath):
+    """Yield records from a rig file, checking its header first."""
+    with open(filepath, encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != RIG_FORMAT:
+            raise ValueError(f"{filepath} is not a lighting rig file")
+        if header.get("version", 0) > RIG_VERSION:
+            raise ValueError(f"{filepath} was written by a newer version of the add-on")
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# -------------------------------------------------------------------------
+# Import
+# -------------------------------------------------------------------------
+class ColumnBatch:
+    """Collects (name, value) writes to one attribute of a bpy.data collection.
+
+    Values are kept as flat lists and resolved to indices only in apply(),
+    after any datablocks have been created (creating one re-sorts the
+    collection). apply() then reads the column once, writes it once, and
+    returns the indices whose value actually changed.
+    """
+    def __init__(self, collection, attr, width, dtype=np.float32):
+        self.collection = collection
+        self.attr = attr
+        self.width = width
+        self.dtype = dtype
+        self.names = []
+        self.values = []
+
+    def add(self, name, value):
+        self.names.append(name)
+        if self.width == 1:
+            self.values.append(value)
+        else:
+            self.values.extend(value)
+
+    def apply(self, dry_run=False):
+        collection = self.collection
+        if not self.names or not len(collection):
+            return np.empty(0, dtype=np.int64)
+        index = {item.name: i for i, item in enumerate(collection)}
+        rows = np.array([index.get(name, -1) for name in self.names], dtype=np.int64)
+        values = np.asarray(self.values, dtype=self.dtype).reshape(-1, self.width)
+        found = rows >= 0
+        rows, values = rows[found], values[found]
+
+        current = np.empty(len(collection) * self.width, dtype=self.dtype)
+        collection.foreach_get(self.attr, current)
+        current = current.reshape(-1, self.width)
+        if self.dtype is bool:
+            diff = np.any(current[rows] != values, axis=1)
+        else:
+            # Tolerant, so float noise from a previous round trip isn't a change.
+            diff = ~np.all(np.isclose(current[rows], values, rtol=1e-6, atol=1e-7), axis=1)
+        if diff.any() and not dry_run:
+            current[rows[diff]] = values[diff]
+            collection.foreach_set(self.attr, current.ravel())
+        return np.unique(rows[diff])
+
+def import_rig(context, filepath, create_missing=True, dry_run=False):
+    """Apply a rig file to the scene, writing only what differs.
+
+    Light values are gathered per attribute while the file streams by and
+    written with one foreach_set each at the end. Transforms are compared
+    per light and only the lights that moved get a new matrix_world, so no
+    other object in the file is touched. Everything else is compared and
+    set item by item. Returns {category: change count}.
+    With ``dry_run`` nothing is written and the counts are what would change.
+    """
+    scene = context.scene
+    lights, objects = bpy.data.lights, bpy.data.objects
+    light_batches = {attr: ColumnBatch(lights, attr, width, bool if attr == "use_shadow" else np.float32)
+                     for attr, width in common_light_attributes()}
+    matrices = []
+    visibility = []
+    changes = {"created": 0, "lights": 0, "light_types": 0, "objects": 0, "visibility": 0,
+               "emissive": 0, "world": 0, "lightgroups": 0, "links": 0, "missing": 0}
+
+    def set_if_changed(target, attr, value, key):
+        current = _plain(getattr(target, attr))
+        if current == value or (isinstance(current, list) and np.allclose(current, value)):
+            return
+        if not dry_run:
+            setattr(target, attr, value)
+        changes[key] += 1
+
+    for record in read_rig_records(filepath):
+        kind = record["type"]
+        if kind == "light":
+            light = lights.get(record["name"])
+            if light is None:
+                if not create_missing:
+                    changes["missing"] += 1
+                    continue
+                changes["created"] += 1
+                if dry_run:
+                    continue
+                light = lights.new(record["name"], record["light_type"])
+            if light.type != record["light_type"]:
+                set_if_changed(light, "type", record["light_type"], "light_types")
+            for attr, batch in light_batches.items():
+                if attr in record:
+                    batch.add(light.name, record[attr])
+            for attr in TYPE_LIGHT_ATTRIBUTES.get(record["light_type"], ()):
+                if attr in record and hasattr(light, attr):
+                    set_if_changed(light, attr, record[attr], "lights")
+
+        elif kind == "object":
+            obj = objects.get(record["name"])
+            if obj is None:
+                data = lights.get(record["data"])
+                if not create_missing or data is None:
+                    changes["missing"] += 1
+                    continue
+                changes["created"] += 1
+                if dry_run:
+                    continue
+                obj = objects.new(record["name"], data)
+                scene.collection.objects.link(obj)
+            if obj.type != 'LIGHT':
+                changes["missing"] += 1
+                continue
+            matrices.append((obj.name, record["matrix_world"]))
+            visibility.append((obj.name, record["hide_viewport"], record["hide_render"]))
+            if hasattr(obj, "lightgroup"):
+                set_if_changed(obj, "lightgroup", record["lightgroup"], "lightgroups")
+
+        elif kind == "emissive":
+            mat = bpy.data.materials.get(record["material"])
+            node = mat.node_tree.nodes.get(record["node"]) if mat and mat.use_nodes else None
+            if node is None:
+                changes["missing"] += 1
+                continue
+            strength = emission_strength_socket(node)
+            color = node.inputs.get("Color") if node.type == 'EMISSION' else node.inputs.get("Emission Color")
+            if "strength" in record and strength and not strength.is_linked:
+                set_if_changed(strength, "default_value", record["strength"], "emissive")
+            if "color" in record and color and not color.is_linked:
+                set_if_changed(color, "default_value", record["color"], "emissive")
+
+        elif kind == "world":
+            world = scene.world
+            if not world_output(world):
+                continue
+            for name in ("Surface", "Volume"):
+                stored = record.get(name.lower(), "")
+                if environment_link(world, name) == stored:
+                    continue
+                if dry_run or set_environment_link(world, name, stored):
+                    changes["world"] += 1
+            if hasattr(world, "lightgroup"):
+                set_if_changed(world, "lightgroup", record["lightgroup"], "lightgroups")
+
+        elif kind == "lightgroups":
+            view_layer = scene.view_layers.get(record["view_layer"])
+            if view_layer is None or not hasattr(view_layer, "lightgroups"):
+                continue
+            existing = {lg.name for lg in view_layer.lightgroups}
+            for name in record["names"]:
+                if name not in existing:
+                    changes["lightgroups"] += 1
+                    if not dry_run:
+                        view_layer.lightgroups.add(name=name)
+
+        elif kind == "link":
+            changes["links"] += _apply_link_record(record, dry_run)
+
+    # Batched writes: one foreach_set per attribute, then tag what changed.
+    touched = set()
+    for batch in light_batches.values():
+        touched.update(batch.apply(dry_run).tolist())
+    changes["lights"] += len(touched)
+    if not dry_run:
+        for i in touched:
+            lights[i].update_tag()
+
+    # Stored column-major; Matrix() takes rows.
+    for name, values in matrices:
+        obj = objects.get(name)
+        if obj is None:
+            continue
+        target = np.asarray(values, dtype=np.float32).reshape(4, 4).T
+        current = np.array(obj.matrix_world, dtype=np.float32)
+        if np.allclose(current, target, rtol=1e-6, atol=1e-7):
+            continue
+        changes["objects"] += 1
+        if not dry_run:
+            obj.matrix_world = Matrix(target.tolist())
+
+    visibility_changes = []
+    for name, hide_viewport, hide_render in visibility:
+        obj = objects.get(name)
+        if obj and (obj.hide_viewport != hide_viewport or obj.hide_render != hide_render):
+            visibility_changes.append((obj, hide_viewport, hide_render))
+    changes["visibility"] += len(visibility_changes)
+    if not dry_run:
+        apply_light_visibility(visibility_changes)
+    return changes
+
+def _apply_link_record(record, dry_run):
+    """Make a light's BB_ linking collection hold exactly the recorded members.
+
+    A collection other lights share is copied first (see
+    Linking.private_link_collection), so importing one light's set never
+    changes theirs.
+    """
+    light = bpy.data.objects.get(record["light"])
+    if light is None:
+        return 0
+    collection = dict(_linking_collections(light)).get(record["kind"])
+    if collection is None:
+        if dry_run:
+            return len(record["objects"]) + len(record["collections"])
+        collection = (ensure_bb_collection(light) if record["kind"] == "receiver"
+                      else ensure_shadow_collection(light))
+        if record["kind"] == "receiver" and light.light_linking.receiver_collection is None:
+            light.light_linking.receiver_collection = collection
+    elif not dry_run and collection.users > 1:
+        if not _apply_link_record(record, True):
+            return 0
+        collection = private_link_collection(light, 'RECEIVER' if record["kind"] == "receiver" else 'BLOCKER',
+                                             collection)
+
+    changed = 0
+    for members, wanted_list, lookup in (
+            (collection.objects, record["objects"], bpy.data.objects),
+            (collection.children, record["collections"], bpy.data.collections)):
+        wanted = dict(wanted_list)
+        for item in list(members):
+            if item.name not in wanted:
+                changed += 1
+                if not dry_run:
+                    members.unlink(item)
+        present = {item.name for item in members}
+        for name in wanted:
+            if name not in present and lookup.get(name) is not None:
+                changed += 1
+                if not dry_run:
+                    members.link(lookup[name])
+
+    # Include/exclude state lives on the membership entries.
+    states = dict(record["objects"])
+    for co, item in zip(collection.collection_objects, collection.objects):
+        state = states.get(item.name)
+        if state and co.light_linking.link_state != state:
+            changed += 1
+            if not dry_run:
+                co.light_linking.link_state = state
+    states = dict(record["collections"])
+    for cc, item in zip(collection.collection_children, collection.children):
+        state = states.get(item.name)
+        if state and cc.light_linking.link_state != state:
+            changed += 1
+            if not dry_run:
+                cc.light_linking.link_state = state
+    return changed
+
+# -------------------------------------------------------------------------
+# Operators
+# -------------------------------------------------------------------------
+class LE_OT_ExportRig(Operator, ExportHelper):
+    """Save every light, emissive, world link, lightgroup and link collection to a rig file"""
+    bl_idname = "le.export_rig"
+    bl_label = "Export Lighting Rig"
+
+    filename_ext = ".jsonl"
+    filter_glob: StringProperty(default="*.jsonl", options={'HIDDEN'})
+
+    def execute(self, context):
+        count = export_rig(context, self.filepath)
+        self.report({'INFO'}, f"Exported {count - 1} rig record(s)")
+        return {'FINISHED'}
+
+class LE_OT_ImportRig(Operator, ImportHelper):
+    """Apply a lighting rig file, changing only what differs from the scene"""
+    bl_idname = "le.import_rig"
+    bl_label = "Import Lighting Rig"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = ".jsonl"
+    filter_glob: StringProperty(default="*.jsonl", options={'HIDDEN'})
+    create_missing: BoolProperty(
+        name="Create Missing Lights",
+        description="Add lights from the rig that don't exist in this scene",
+        default=True
+    )
+    dry_run: BoolProperty(
+        name="Preview Only",
+        description="Report what would change without changing anything",
+        default=False
+    )
+
+    def execute(self, context):
+        try:
+            changes = import_rig(context, self.filepath, self.create_missing, self.dry_run)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        summary = ", ".join(f"{count} {key}" for key, count in changes.items() if count)
+        verb = "Would change" if self.dry_run else "Changed"
+        self.report({'INFO'}, f"{verb}: {summary}" if summary else "Rig already matches the scene")
+        return {'FINISHED'}
+
+# -------------------------------------------------------------------------
+# Registration
+# -------------------------------------------------------------------------
+classes = (
+    LE_OT_ExportRig,
+    LE_OT_ImportRig,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        try:
+            bpy.utils.unregister_class(cls)
+        except (RuntimeError, ValueError):
+            pass
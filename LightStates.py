@@ -0,0 +1,334 @@
+import bpy
+import numpy as np
+from bpy.types import Operator, Panel
+from bpy.props import StringProperty
+
+from . import LightEditor
+from .LightEditor import (
+    find_emissive_objects,
+    apply_light_visibility,
+    emission_strength_socket,
+    world_output,
+    environment_link,
+    set_environment_link,
+    environment_is_on,
+)
+
+# -------------------------------------------------------------------------
+# Storage
+# -------------------------------------------------------------------------
+# States live in the .blend as ID properties on the scene:
+#   scene["le_light_states"][<state name>] = {
+#       "light_names": [...], "energy": [...], "color": [...], "exposure": [...],
+#       "object_names": [...], "hide_viewport": [...], "hide_render": [...],
+#       "emissive_materials": [...], "emissive_nodes": [...], "emissive_strength": [...],
+#       "world_surface": "node\tsocket", "world_volume": "node\tsocket",
+#   }
+# Every per-item value is a packed array aligned with its names list, so a
+# state costs a handful of ID properties no matter how many lights it covers.
+STATES_PROP = "le_light_states"
+
+def _light_attributes():
+    """Light datablock attributes captured in a state, as (name, width) pairs."""
+    attrs = [("energy", 1), ("color", 3)]
+    if "exposure" in bpy.types.Light.bl_rna.properties:
+        attrs.append(("exposure", 1))
+    return attrs
+
+def _strength_socket(node):
+    return emission_strength_socket(node)
+
+def get_light_states(scene):
+    """Return the scene's state group, or None when no state was ever saved."""
+    return scene.get(STATES_PROP)
+
+# -------------------------------------------------------------------------
+# Capture
+# -------------------------------------------------------------------------
+def capture_light_state(context):
+    """Snapshot the scene's lighting into a dict of packed arrays."""
+    state = {}
+
+    # Light datablocks: one foreach_get per attribute over bpy.data.lights.
+    lights = bpy.data.lights
+    if len(lights):
+        state["light_names"] = [light.name for light in lights]
+        for attr, width in _light_attributes():
+            values = np.empty(len(lights) * width, dtype=np.float32)
+            lights.foreach_get(attr, values)
+            state[attr] = values.tolist()
+
+    # Light objects: the visibility flags light_enabled is derived from.
+    objs = [obj for obj in context.scene.objects if obj.type == 'LIGHT']
+    if objs:
+        state["object_names"] = [obj.name for obj in objs]
+        state["hide_viewport"] = [int(obj.hide_viewport) for obj in objs]
+        state["hide_render"] = [int(obj.hide_render) for obj in objs]
+
+    # Emissive sockets: unlinked strengths only, linked ones are driven by nodes.
+    materials, nodes, strengths = [], [], []
+    seen = set()
+    for obj, mat, node in find_emissive_objects(context):
+        key = (mat.name, node.name)
+        socket = _strength_socket(node)
+        if key in seen or not socket or socket.is_linked:
+            continue
+        seen.add(key)
+        materials.append(mat.name)
+        nodes.append(node.name)
+        strengths.append(float(socket.default_value))
+    if strengths:
+        state["emissive_materials"] = materials
+        state["emissive_nodes"] = nodes
+        state["emissive_strength"] = strengths
+
+    # World output shaders ("" when switched off).
+    world = context.scene.world
+    if world_output(world):
+        for name in ("Surface", "Volume"):
+            state[f"world_{name.lower()}"] = environment_link(world, name)
+
+    return state
+
+def store_light_state(context, name):
+    """Capture the current lighting and save it under ``name`` (overwriting)."""
+    scene = context.scene
+    if STATES_PROP not in scene:
+        scene[STATES_PROP] = {}
+    scene[STATES_PROP][name] = capture_light_state(context)
+
+# -------------------------------------------------------------------------
+# Recall
+# -------------------------------------------------------------------------
+def _match_names(stored_names, collection):
+    """Map stored positions onto current collection indices, by name."""
+    index = {item.name: i for i, item in enumerate(collection)}
+    src, dst = [], []
+    for i, name in enumerate(stored_names):
+        j = index.get(name)
+        if j is not None:
+            src.append(i)
+            dst.append(j)
+    return np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)
+
+def _recall_light_data(state):
+    """Write stored energy/color/exposure back with one foreach_set per attribute.
+
+    Only attributes that actually differ are written, and only lights whose
+    values changed are tagged for a depsgraph update.
+    """
+    names = state.get("light_names")
+    lights = bpy.data.lights
+    if not names or not len(lights):
+        return 0
+    src, dst = _match_names(names, lights)
+    if not len(dst):
+        return 0
+
+    touched = np.zeros(len(lights), dtype=bool)
+    for attr, width in _light_attributes():
+        stored = state.get(attr)
+        if stored is None:
+            continue
+        stored = np.asarray(stored, dtype=np.float32).reshape(-1, width)
+        current = np.empty(len(lights) * width, dtype=np.float32)
+        lights.foreach_get(attr, current)
+        current = current.reshape(-1, width)
+        diff = np.any(current[dst] != stored[src], axis=1)
+        if not diff.any():
+            continue
+        current[dst[diff]] = stored[src[diff]]
+        lights.foreach_set(attr, current.ravel())
+        touched[dst[diff]] = True
+
+    # foreach_set bypasses RNA updates, so tag what changed for the depsgraph.
+    for i in np.flatnonzero(touched):
+        lights[int(i)].update_tag()
+    return int(touched.sum())
+
+def _recall_objects(state):
+    """Restore light visibility, touching only objects whose flags differ."""
+    names = state.get("object_names")
+    objects = bpy.data.objects
+    if not names or not len(objects):
+        return 0
+    src, dst = _match_names(names, objects)
+    if not len(dst):
+        return 0
+
+    stored_vp = np.asarray(state["hide_viewport"], dtype=bool)[src]
+    stored_rp = np.asarray(state["hide_render"], dtype=bool)[src]
+    current_vp = np.empty(len(objects), dtype=bool)
+    current_rp = np.empty(len(objects), dtype=bool)
+    objects.foreach_get("hide_viewport", current_vp)
+    objects.foreach_get("hide_render", current_rp)
+    diff = (current_vp[dst] != stored_vp) | (current_rp[dst] != stored_rp)
+
+    # hide_viewport needs its RNA update to resync bases, so the (few) changed
+    # objects go through the bulk visibility layer rather than foreach_set.
+    changes = []
+    for k in np.flatnonzero(diff):
+        obj = objects[int(dst[k])]
+        if obj.type == 'LIGHT':
+            changes.append((obj, stored_vp[k], stored_rp[k]))
+    return apply_light_visibility(changes)
+
+def _recall_emissive(state):
+    strengths = state.get("emissive_strength")
+    if not strengths:
+        return 0
+    changed = 0
+    for mat_name, node_name, value in zip(state["emissive_materials"], state["emissive_nodes"], strengths):
+        mat = bpy.data.materials.get(mat_name)
+        if not mat or not mat.use_nodes:
+            continue
+        node = mat.node_tree.nodes.get(node_name)
+        socket = _strength_socket(node) if node else None
+        if not socket or socket.is_linked or socket.default_value == value:
+            continue
+        socket.default_value = value
+        changed += 1
+    return changed
+
+def _recall_world(context, state):
+    world = context.scene.world
+    if not world_output(world):
+        return 0
+    changed = 0
+    for name in ("Surface", "Volume"):
+        stored = state.get(f"world_{name.lower()}")
+        if stored is not None and set_environment_link(world, name, stored):
+            changed += 1
+    if changed:
+        LightEditor.environment_checkbox_state['environment'] = environment_is_on(world)
+    return changed
+
+def recall_light_state(context, name):
+    """Apply a saved state, writing only what differs. Returns the change count."""
+    states = get_light_states(context.scene)
+    if not states or name not in states:
+        return None
+    state = states[name]
+    return (_recall_light_data(state)
+            + _recall_objects(state)
+            + _recall_emissive(state)
+            + _recall_world(context, state))
+
+# -------------------------------------------------------------------------
+# Operators
+# -------------------------------------------------------------------------
+class LE_OT_CaptureLightState(Operator):
+    """Save the current lights, emissives and world links as a named state"""
+    bl_idname = "le.capture_light_state"
+    bl_label = "Capture Lighting State"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    state_name: StringProperty()
+
+    def execute(self, context):
+        name = self.state_name.strip()
+        if not name:
+            self.report({'WARNING'}, "Enter a name for the lighting state")
+            return {'CANCELLED'}
+        store_light_state(context, name)
+        self.report({'INFO'}, f"Captured lighting state '{name}'")
+        return {'FINISHED'}
+
+class LE_OT_RecallLightState(Operator):
+    """Restore this lighting state, changing only what differs"""
+    bl_idname = "le.recall_light_state"
+    bl_label = "Recall Lighting State"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    state_name: StringProperty()
+
+    def execute(self, context):
+        changed = recall_light_state(context, self.state_name)
+        if changed is None:
+            self.report({'WARNING'}, f"Lighting state '{self.state_name}' not found")
+            return {'CANCELLED'}
+        for area in context.screen.areas:
+            if area.type in {'VIEW_3D', 'NODE_EDITOR', 'PROPERTIES'}:
+                area.tag_redraw()
+        self.report({'INFO'}, f"Recalled '{self.state_name}': {changed} change(s)")
+        return {'FINISHED'}
+
+class LE_OT_RemoveLightState(Operator):
+    """Delete this lighting state"""
+    bl_idname = "le.remove_light_state"
+    bl_label = "Remove Lighting State"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    state_name: StringProperty()
+
+    def execute(self, context):
+        states = get_light_states(context.scene)
+        if not states or self.state_name not in states:
+            return {'CANCELLED'}
+        del states[self.state_name]
+        return {'FINISHED'}
+
+# -------------------------------------------------------------------------
+# Panel
+# -------------------------------------------------------------------------
+class LE_PT_LightStates(Panel):
+    bl_label = "Lighting States"
+    bl_idname = "LE_PT_light_states"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_category = "Light Editor"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+
+        row = layout.row(align=True)
+        row.prop(scene, "le_light_state_name", text="")
+        row.operator("le.capture_light_state", text="", icon='ADD').state_name = scene.le_light_state_name
+
+        row = layout.row(align=True)
+        row.operator("le.export_rig", text="Export Rig", icon='EXPORT')
+        row.operator("le.import_rig", text="Import Rig", icon='IMPORT')
+
+        states = get_light_states(scene)
+        if not states:
+            layout.label(text="No lighting states saved", icon='INFO')
+            return
+        box = layout.box()
+        for name in sorted(states.keys(), key=str.lower):
+            row = box.row(align=True)
+            row.operator("le.recall_light_state", text=name, icon='LIGHT').state_name = name
+            row.operator("le.capture_light_state", text="", icon='FILE_REFRESH').state_name = name
+            row.operator("le.remove_light_state", text="", icon='X').state_name = name
+
+# -------------------------------------------------------------------------
+# Registration
+# -------------------------------------------------------------------------
+classes = (
+    LE_OT_CaptureLightState,
+    LE_OT_RecallLightState,
+    LE_OT_RemoveLightState,
+    LE_PT_LightStates,
+)
+
+def register():
+    bpy.types.Scene.le_light_state_name = StringProperty(
+        name="State Name",
+        default="State",
+        description="Name used when capturing a new lighting state"
+    )
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        try:
+            bpy.utils.unregister_class(cls)
+        except (RuntimeError, ValueError):
+            pass
+    if hasattr(bpy.types.Scene, "le_light_state_name"):
+        try:
+            del bpy.types.Scene.le_light_state_name
+        except (AttributeError, TypeError):
+            pass
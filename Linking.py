@@ -1,4 +1,6 @@
 import bpy
+import fnmatch
+import re
 from bpy.app.handlers import persistent
 
 # -------------------------------------------------------------------
@@ -30,6 +32,12 @@ def ensure_bb_collection(light):
     """
     prop_name = "light_linking_receiver_collection"
     expected_name = f"BB_Light Linking for {light.name}"
+
+    # A light may already use another (e.g. shared) receiver collection.
+    assigned = getattr(getattr(light, "light_linking", None), "receiver_collection", None)
+    if assigned:
+        light[prop_name] = assigned.name
+        return assigned
     
     bb_collection = bpy.data.collections.get(expected_name)
     if bb_collection:
@@ -63,6 +71,11 @@ def ensure_shadow_collection(light):
     """
     prop_name = "shadow_linking_blocker_collection"
     expected_name = f"BB_Shadow Linking for {light.name}"
+
+    assigned = getattr(getattr(light, "light_linking", None), "blocker_collection", None)
+    if assigned:
+        light[prop_name] = assigned.name
+        return assigned
     
     shadow_collection = bpy.data.collections.get(expected_name)
     if shadow_collection:
@@ -77,6 +90,497 @@ def ensure_shadow_collection(light):
         light[prop_name] = expected_name
     return new_collection
 
+# -------------------------------------------------------------------
+#   Link Matrix: sparse light x member membership
+# -------------------------------------------------------------------
+LINK_KINDS = ('RECEIVER', 'BLOCKER')
+
+def link_collection(light, kind):
+    """The light's receiver or blocker collection, or None."""
+    ll = getattr(light, "light_linking", None)
+    if ll is None:
+        return None
+    return ll.receiver_collection if kind == 'RECEIVER' else ll.blocker_collection
+
+def link_members(coll):
+    """(member type, ID, link state) for every direct member of a link collection."""
+    for item in getattr(coll, "collection_objects", ()):
+        yield 'OBJECT', item.object, item.light_linking.link_state
+    for item in getattr(coll, "collection_children", ()):
+        yield 'COLLECTION', item.collection, item.light_linking.link_state
+
+class LinkMatrix:
+    """Which objects and collections every light is linked to.
+
+    Built in one pass over all receiver and blocker collections. Each member
+    gets a column number; a (light, kind) row is then two int bitsets over
+    those columns: the members, and the subset whose link state is EXCLUDE.
+    Rows of lights without a link collection aren't stored at all.
+    """
+    def __init__(self):
+        self.columns = []        # [(member type, name)]
+        self.column_index = {}   # {(member type, name): column}
+        self.rows = {}           # {(light name, kind): (members, excluded)}
+        self._key = None
+
+    def invalidate(self):
+        self._key = None
+
+    def column(self, member_type, name):
+        key = (member_type, name)
+        i = self.column_index.get(key)
+        if i is None:
+            i = self.column_index[key] = len(self.columns)
+            self.columns.append(key)
+        return i
+
+    def scan_collection(self, coll):
+        members = excluded = 0
+        for member_type, member, state in link_members(coll):
+            if member is None:
+                continue
+            bit = 1 << self.column(member_type, member.name)
+            members |= bit
+            if state == 'EXCLUDE':
+                excluded |= bit
+        return members, excluded
+
+    def ensure(self, scene):
+        """Rebuild when the scene or the number of objects/collections changed."""
+        key = (scene.name, len(bpy.data.objects), len(bpy.data.collections))
+        if key == self._key:
+            return self
+        self.columns.clear()
+        self.column_index.clear()
+        self.rows.clear()
+        for light in scene.objects:
+            if light.type != 'LIGHT':
+                continue
+            for kind in LINK_KINDS:
+                coll = link_collection(light, kind)
+                if coll is not None:
+                    self.rows[(light.name, kind)] = self.scan_collection(coll)
+        self._key = key
+        return self
+
+    def cell(self, light_name, kind, column):
+        """'INCLUDE', 'EXCLUDE' or None for one matrix cell."""
+        members, excluded = self.rows.get((light_name, kind), (0, 0))
+        bit = 1 << column
+        if not members & bit:
+            return None
+        return 'EXCLUDE' if excluded & bit else 'INCLUDE'
+
+    def lights_in_column(self, kind, column):
+        bit = 1 << column
+        return [light for (light, k), (members, _) in self.rows.items() if k == kind and members & bit]
+
+_link_matrix = LinkMatrix()
+
+def get_link_matrix(scene):
+    return _link_matrix.ensure(scene)
+
+# -------------------------------------------------------------------
+#   Inverse Link Index: which lights reach an object
+# -------------------------------------------------------------------
+class LinkIndex:
+    """Object name -> {(light name, kind): link state}, the inverse of LinkMatrix.
+
+    Nested collections are flattened through all_objects: an object reached
+    through a child collection takes that child's link state, a direct member
+    keeps its own. After the first build only the rows whose collections (or
+    any collection nested in them) changed are rescanned. Rows are keyed by
+    light name, so a light renamed (or deleted) since it was scanned makes
+    the whole index stale; see stale_lights().
+    """
+    def __init__(self):
+        self.by_object = {}      # {object name: {(light name, kind): link state}}
+        self._rows = {}          # {(light name, kind): {object name: link state}}
+        self._includes = set()   # rows with at least one INCLUDE member
+        self._watch = {}         # {collection name: {(light name, kind)}}
+        self._sets = {}          # {(kind, frozenset of (object, state)): {(light name, kind)}}
+        self._row_sets = {}      # {(light name, kind): key into _sets}
+        self._lights = {}        # {light name: session_uid} of every scanned light
+        self._key = None
+
+    def invalidate(self):
+        self._key = None
+
+    @property
+    def built(self):
+        return self._key is not None
+
+    def ensure(self, scene):
+        """Full rebuild when the scene or the object/collection counts changed."""
+        key = (scene.name, len(bpy.data.objects), len(bpy.data.collections))
+        if key != self._key:
+            self.by_object.clear()
+            self._rows.clear()
+            self._includes.clear()
+            self._watch.clear()
+            self._sets.clear()
+            self._row_sets.clear()
+            self._lights.clear()
+            for light in scene.objects:
+                if light.type == 'LIGHT':
+                    self.update_light(light)
+            self._key = key
+        return self
+
+    def _drop(self, row):
+        for name in self._rows.pop(row, ()):
+            entries = self.by_object.get(name)
+            if entries:
+                entries.pop(row, None)
+                if not entries:
+                    del self.by_object[name]
+        self._includes.discard(row)
+        for rows in self._watch.values():
+            rows.discard(row)
+        signature = self._row_sets.pop(row, None)
+        if signature is not None:
+            rows = self._sets[signature]
+            rows.discard(row)
+            if not rows:
+                del self._sets[signature]
+
+    def update_light(self, light):
+        """Rescan both link collections of one light."""
+        self._lights[light.name] = light.session_uid
+        for kind in LINK_KINDS:
+            row = (light.name, kind)
+            self._drop(row)
+            coll = link_collection(light, kind)
+            if coll is None:
+                continue
+            self._watch.setdefault(coll.name, set()).add(row)
+            members = {}
+            # Direct objects come first, so they win over the same object
+            # reached through a child collection.
+            for member_type, member, state in link_members(coll):
+                if member is None:
+                    continue
+                if state == 'INCLUDE':
+                    self._includes.add(row)
+                if member_type == 'OBJECT':
+                    members[member.name] = state
+                    continue
+                for child in (member, *member.children_recursive):
+                    self._watch.setdefault(child.name, set()).add(row)
+                for obj in member.all_objects:
+                    members.setdefault(obj.name, state)
+            for name, state in members.items():
+                self.by_object.setdefault(name, {})[row] = state
+            self._rows[row] = members
+            signature = (kind, frozenset(members.items()))
+            self._sets.setdefault(signature, set()).add(row)
+            self._row_sets[row] = signature
+
+    def update_collections(self, scene, names):
+        """Rescan the lights whose link collections contain any of ``names``."""
+        rows = set()
+        for name in names:
+            rows |= self._watch.get(name, set())
+        for light_name in {light_name for light_name, _ in rows}:
+            light = scene.objects.get(light_name)
+            if light is not None:
+                self.update_light(light)
+            else:
+                self._lights.pop(light_name, None)
+                for kind in LINK_KINDS:
+                    self._drop((light_name, kind))
+
+    def stale_lights(self, scene):
+        """True if a scanned light no longer exists under the name its rows use."""
+        objects = scene.objects
+        for name, uid in self._lights.items():
+            light = objects.get(name)
+            if light is None or light.session_uid != uid:
+                return True
+        return False
+
+    def members(self, light_name, kind):
+        """Flattened {object name: link state} of one light's set."""
+        return self._rows.get((light_name, kind), {})
+
+    def lights_with_set(self, kind, members):
+        """Names of the lights whose flattened set equals ``members``."""
+        return sorted(light for light, _ in self._sets.get((kind, frozenset(members.items())), ()))
+
+    def shared_sets(self):
+        """(signature, rows) for every non-empty set used by more than one light."""
+        return [(signature, set(rows)) for signature, rows in self._sets.items()
+                if signature[1] and len(rows) > 1]
+
+    def links_for(self, obj_name):
+        return sorted((light, kind, state) for (light, kind), state in self.by_object.get(obj_name, {}).items())
+
+    def receives_light(self, light_name, obj_name):
+        """Cycles' rule: without a receiver collection every object is lit;
+        once any member is INCLUDE, only included objects are."""
+        row = (light_name, 'RECEIVER')
+        members = self._rows.get(row)
+        if members is None:
+            return True
+        state = members.get(obj_name)
+        if state is None:
+            return row not in self._includes
+        return state == 'INCLUDE'
+
+_link_index = LinkIndex()
+
+def light_links_for(obj, scene=None):
+    """Every link reaching ``obj`` as sorted (light name, 'RECEIVER'/'BLOCKER', link state).
+
+    For scripts: ``Linking.light_links_for(bpy.context.object)``.
+    """
+    scene = scene or bpy.context.scene
+    return _link_index.ensure(scene).links_for(obj.name)
+
+def lights_affecting(obj, scene=None):
+    """Names of the scene's lights whose light linking lets them illuminate ``obj``."""
+    scene = scene or bpy.context.scene
+    index = _link_index.ensure(scene)
+    return {light.name for light in scene.objects
+            if light.type == 'LIGHT' and index.receives_light(light.name, obj.name)}
+
+# -------------------------------------------------------------------
+#   Link Collection Audit
+# -------------------------------------------------------------------
+LINK_PREFIXES = ("BB_Light Linking for ", "BB_Shadow Linking for ")
+LINK_PROPS = {
+    'RECEIVER': "light_linking_receiver_collection",
+    'BLOCKER': "shadow_linking_blocker_collection",
+}
+
+def audit_link_collections():
+    """Find link data that can go, in one pass over objects and collections.
+
+    Returns a dict of lists:
+      orphans     - BB_ collections with no users at all (not a link
+                    collection, not in the scene tree, not instanced)
+      empty       - (object, kind, collection) link sets without any member
+      stale_props - (object, property) BB_ custom properties that don't
+                    name the object's current link collection
+      duplicates  - (collection, object) direct members that are also
+                    reached, with the same link state, through a child
+    """
+    used = set()
+    empty = []
+    stale_props = []
+    for obj in bpy.data.objects:
+        for kind in LINK_KINDS:
+            coll = link_collection(obj, kind)
+            if coll is not None:
+                used.add(coll.name)
+                if not coll.objects and not coll.children:
+                    empty.append((obj.name, kind, coll.name))
+            prop = LINK_PROPS[kind]
+            if prop in obj and (coll is None or obj[prop] != coll.name):
+                stale_props.append((obj.name, prop))
+
+    orphans = []
+    duplicates = []
+    for coll in bpy.data.collections:
+        if coll.name not in used:
+            # The BB_ name alone doesn't make it unused: it may be linked
+            # into the scene tree or used as an instance collection.
+            if coll.name.startswith(LINK_PREFIXES) and not coll.library and not coll.users:
+                orphans.append(coll.name)
+            continue
+        direct = {}
+        for member_type, member, state in link_members(coll):
+            if member is None:
+                continue
+            if member_type == 'OBJECT':
+                direct[member.name] = state
+                continue
+            for obj in member.all_objects:
+                if direct.get(obj.name) == state:
+                    duplicates.append((coll.name, obj.name))
+    return {"orphans": orphans, "empty": empty, "stale_props": stale_props,
+            "duplicates": sorted(set(duplicates))}
+
+def purge_link_collections(audit):
+    """Remove everything an audit found; collections go in one batch_remove."""
+    for coll_name, obj_name in audit["duplicates"]:
+        coll = bpy.data.collections.get(coll_name)
+        obj = bpy.data.objects.get(obj_name)
+        if coll and obj and coll.objects.get(obj_name):
+            coll.objects.unlink(obj)
+    doomed = {coll for coll in map(bpy.data.collections.get, audit["orphans"])
+              if coll is not None and not coll.users}
+    emptied = set()
+    for obj_name, kind, coll_name in audit["empty"]:
+        obj = bpy.data.objects.get(obj_name)
+        if obj is None:
+            continue
+        if kind == 'RECEIVER':
+            obj.light_linking.receiver_collection = None
+        else:
+            obj.light_linking.blocker_collection = None
+        emptied.add(coll_name)
+        if LINK_PROPS[kind] in obj:
+            del obj[LINK_PROPS[kind]]
+    # An empty set is only deleted once no other light still points at it.
+    doomed.update(coll for coll in map(bpy.data.collections.get, emptied)
+                  if coll is not None and not coll.users and not coll.library)
+    for obj_name, prop in audit["stale_props"]:
+        obj = bpy.data.objects.get(obj_name)
+        if obj is not None and prop in obj:
+            del obj[prop]
+    doomed.discard(None)
+    if doomed:
+        bpy.data.batch_remove(doomed)
+    _link_matrix.invalidate()
+    _link_index.invalidate()
+
+# -------------------------------------------------------------------
+#   Shared Link Sets
+# -------------------------------------------------------------------
+# Lights with the same flattened membership can point at one collection:
+# Cycles syncs each distinct set once, and the number of sets it supports
+# is limited. Sets are compared through LinkIndex signatures, and every
+# edit goes through edit_link_set() so changing one light never changes
+# the lights it shares a collection with.
+def _set_link_collection(light, kind, coll):
+    if kind == 'RECEIVER':
+        light.light_linking.receiver_collection = coll
+    else:
+        light.light_linking.blocker_collection = coll
+    light[LINK_PROPS[kind]] = coll.name
+
+def link_collection_name(light, kind):
+    return ("BB_Light Linking for " if kind == 'RECEIVER' else "BB_Shadow Linking for ") + light.name
+
+def _new_link_collection(light, kind):
+    """The light's BB_ collection by name, or a new one; never calls an operator.
+
+    For timers and handlers, where the operators ensure_bb_collection uses
+    would change the selection and active object outside any undo step.
+    """
+    name = link_collection_name(light, kind)
+    return bpy.data.collections.get(name) or bpy.data.collections.new(name)
+
+def private_link_collection(light, kind, coll):
+    """``coll``, or a copy of it assigned to ``light`` if other lights share it.
+
+    Copy-on-write: the other lights keep the set as it was.
+    """
+    if coll.users <= 1:
+        return coll
+    private = coll.copy()
+    private.name = link_collection_name(light, kind)
+    _set_link_collection(light, kind, private)
+    return private
+
+def _remove_if_orphaned(coll):
+    if coll is not None and not coll.users and not coll.library and coll.name.startswith(LINK_PREFIXES):
+        bpy.data.collections.remove(coll)
+
+def dedupe_link_sets(scene):
+    """Merge identical link sets into one shared collection per set.
+
+    The collection that already has the most users is kept, so the fewest
+    pointers move. Returns (lights rewired, collections removed).
+    """
+    index = _link_index.ensure(scene)
+    rewired = 0
+    freed = set()
+    for (kind, _signature), rows in index.shared_sets():
+        lights = [light for light in map(scene.objects.get, sorted(name for name, _ in rows))
+                  if light is not None and not light.library]
+        colls = {}
+        for light in lights:
+            coll = link_collection(light, kind)
+            colls.setdefault(coll.name, coll)
+        if len(colls) < 2:
+            continue
+        keep = min(colls.values(), key=lambda c: (-c.users, c.name))
+        for light in lights:
+            coll = link_collection(light, kind)
+            if coll != keep:
+                _set_link_collection(light, kind, keep)
+                freed.add(coll.name)
+                rewired += 1
+    doomed = [coll for coll in map(bpy.data.collections.get, freed)
+              if coll is not None and not coll.users and not coll.library]
+    if doomed:
+        bpy.data.batch_remove(doomed)
+    _link_matrix.invalidate()
+    _link_index.invalidate()
+    return rewired, len(doomed)
+
+def edit_link_set(light, kind, cells, scene=None, use_operators=True):
+    """Apply (member type, member ID, link) edits to one light's link set.
+
+    Adding objects so that the result equals another light's set just
+    points this light at that collection. Otherwise a collection shared with
+    other lights is copied before it is changed. Without ``use_operators`` a
+    missing collection is created directly in bpy.data, leaving the
+    selection alone. Returns the number of memberships that changed.
+    """
+    scene = scene or bpy.context.scene
+    index = _link_index.ensure(scene)
+    current = index.members(light.name, kind)
+    coll = link_collection(light, kind)
+
+    if all(member_type == 'OBJECT' and link for member_type, _, link in cells):
+        # Objects the set already reaches, directly or through a child
+        # collection, would only be duplicate memberships.
+        cells = [cell for cell in cells if cell[1].name not in current]
+        if not cells:
+            return 0
+        wanted = dict(current)
+        wanted.update((member.name, 'INCLUDE') for _, member, _ in cells)
+        for other in map(scene.objects.get, index.lights_with_set(kind, wanted)):
+            shared = link_collection(other, kind) if other is not None else None
+            if shared is not None and shared != coll:
+                _set_link_collection(light, kind, shared)
+                _remove_if_orphaned(coll)
+                index.update_light(light)
+                return len(cells)
+
+    if coll is None:
+        if not any(link for _, _, link in cells):
+            return 0
+        if not use_operators:
+            coll = _new_link_collection(light, kind)
+        elif kind == 'RECEIVER':
+            coll = ensure_bb_collection(light)
+        else:
+            coll = ensure_shadow_collection(light)
+        _set_link_collection(light, kind, coll)
+    coll = private_link_collection(light, kind, coll)
+
+    changed = 0
+    for member_type, member, link in cells:
+        target = coll.objects if member_type == 'OBJECT' else coll.children
+        present = target.get(member.name) is not None
+        if link and not present:
+            target.link(member)
+            changed += 1
+        elif not link and present:
+            target.unlink(member)
+            changed += 1
+    index.update_light(light)
+    return changed
+
+def _member_id(member_type, name):
+    return (bpy.data.objects if member_type == 'OBJECT' else bpy.data.collections).get(name)
+
+def apply_link_changes(kind, changes):
+    """Link or unlink matrix cells in one batch.
+
+    ``changes`` maps a light object to a list of (member type, member ID,
+    link) tuples. Each light's link collection is looked up (or created)
+    once however many cells change, and the matrix is rebuilt once at the
+    end. Returns the number of memberships that actually changed.
+    """
+    changed = sum(edit_link_set(light, kind, cells) for light, cells in changes.items())
+    _link_matrix.invalidate()
+    return changed
+
 # -------------------------------------------------------------------
 #   Property Groups for List Items
 # -------------------------------------------------------------------
@@ -397,25 +901,8 @@ class LL_OT_Link(bpy.types.Operator):
                 self.report({'ERROR'}, f"Light must be visible for linking: {light.name}")
                 continue
 
-            bpy.ops.object.select_all(action='DESELECT')
-            light.select_set(True)
-            context.view_layer.objects.active = light
-
-            new_group = ensure_bb_collection(light)
-            # Here is where we can show "Please create a light group first" if we fail:
-            if not new_group:
-                # Instead of the old message:
-                # self.report({'WARNING'}, f"Failed to create or retrieve linking group for {light.name}")
-                self.report({'WARNING'}, "Please create a light group first.")
-                continue
-
-            linked_meshes = 0
-            for obj in all_meshes:
-                if not new_group.objects.get(obj.name):
-                    new_group.objects.link(obj)
-                    linked_meshes += 1
-
-            total_linked_meshes += linked_meshes
+            # Reuses another light's collection when the result is identical.
+            total_linked_meshes += edit_link_set(light, 'RECEIVER', [('OBJECT', obj, True) for obj in all_meshes], scene)
 
         self.report({'INFO'}, f"Linked {len(selected_lights)} light(s) to {total_linked_meshes} mesh(es)")
         return {'FINISHED'}
@@ -447,21 +934,10 @@ class LL_OT_Unlink(bpy.types.Operator):
 
         total_removed = 0
         for light in selected_lights:
-            group_name = f"BB_Light Linking for {light.name}"
-            linking_group = bpy.data.collections.get(group_name)
-            if not linking_group:
+            if link_collection(light, 'RECEIVER') is None:
                 self.report({'WARNING'}, f"No BB_ linking group found for {light.name}")
                 continue
-
-            removed = 0
-            for obj in list(linking_group.objects):
-                if obj.name in [m_obj.name for m_obj in all_meshes]:
-                    linking_group.objects.unlink(obj)
-                    removed += 1
-
-            total_removed += removed
-            if "light_linking_receiver_collection" in light:
-                del light["light_linking_receiver_collection"]
+            total_removed += edit_link_set(light, 'RECEIVER', [('OBJECT', obj, False) for obj in all_meshes], scene)
 
         self.report({'INFO'}, f"Unlinked objects from {len(selected_lights)} light(s); removed {total_removed} object(s)")
         return {'FINISHED'}
@@ -500,23 +976,7 @@ class LL_OT_ShadowLink(bpy.types.Operator):
                 self.report({'ERROR'}, f"Light must be visible for linking: {light.name}")
                 continue
 
-            bpy.ops.object.select_all(action='DESELECT')
-            light.select_set(True)
-            context.view_layer.objects.active = light
-
-            new_group = ensure_shadow_collection(light)
-            if not new_group:
-                self.report({'WARNING'}, "Failed to create or retrieve shadow linking group for {light.name}")
-                continue
-
-            linked_meshes = 0
-            for obj in all_meshes:
-                if not new_group.objects.get(obj.name):
-                    new_group.objects.link(obj)
-                    linked_meshes += 1
-
-            light["shadow_linking_blocker_collection"] = new_group.name
-            total_linked_meshes += linked_meshes
+            total_linked_meshes += edit_link_set(light, 'BLOCKER', [('OBJECT', obj, True) for obj in all_meshes], scene)
 
         self.report({'INFO'}, f"Shadow Linked {len(selected_lights)} light(s) to {total_linked_meshes} mesh(es)")
         return {'FINISHED'}
@@ -548,26 +1008,312 @@ class LL_OT_ShadowUnlink(bpy.types.Operator):
 
         total_removed = 0
         for light in selected_lights:
-            expected_name = f"BB_Shadow Linking for {light.name}"
-            linking_group = bpy.data.collections.get(expected_name)
-            if not linking_group:
-                self.report({'INFO'}, f"No shadow linking group '{expected_name}' found for light '{light.name}'")
+            if link_collection(light, 'BLOCKER') is None:
+                self.report({'INFO'}, f"No shadow linking group found for light '{light.name}'")
                 continue
+            total_removed += edit_link_set(light, 'BLOCKER', [('OBJECT', obj, False) for obj in all_meshes], scene)
+
+        self.report({'INFO'}, f"Shadow Unlinked objects from {len(selected_lights)} light(s); removed {total_removed} object(s)")
+        return {'FINISHED'}
+
+# -------------------------------------------------------------------
+#   Link Matrix Operators
+# -------------------------------------------------------------------
+_kind_items = [
+    ('RECEIVER', "Light", "Light linking: which objects receive light"),
+    ('BLOCKER', "Shadow", "Shadow linking: which objects block light"),
+]
+_member_type_items = [
+    ('OBJECT', "Object", ""),
+    ('COLLECTION', "Collection", ""),
+]
 
-            removed = 0
-            for obj in list(linking_group.objects):
-                if obj.name in [m_obj.name for m_obj in all_meshes]:
-                    try:
-                        linking_group.objects.unlink(obj)
-                        removed += 1
-                    except Exception as e:
-                        print(f"DEBUG: Error unlinking {obj.name}: {e}")
+class LL_OT_MatrixToggle(bpy.types.Operator):
+    bl_idname = "ll_editor.matrix_toggle"
+    bl_label = "Toggle Link"
+    bl_description = "Link or unlink this light and object"
+    bl_options = {'REGISTER', 'UNDO'}
 
-            total_removed += removed
-            if "shadow_linking_blocker_collection" in light:
-                del light["shadow_linking_blocker_collection"]
+    light: bpy.props.StringProperty()
+    member: bpy.props.StringProperty()
+    member_type: bpy.props.EnumProperty(items=_member_type_items)
+    kind: bpy.props.EnumProperty(items=_kind_items)
 
-        self.report({'INFO'}, f"Shadow Unlinked objects from {len(selected_lights)} light(s); removed {total_removed} object(s)")
+    def execute(self, context):
+        light = bpy.data.objects.get(self.light)
+        member = _member_id(self.member_type, self.member)
+        if not light or not member:
+            self.report({'WARNING'}, "Light or linked item no longer exists")
+            return {'CANCELLED'}
+        matrix = get_link_matrix(context.scene)
+        column = matrix.column_index.get((self.member_type, self.member))
+        linked = column is not None and matrix.cell(light.name, self.kind, column) is not None
+        apply_link_changes(self.kind, {light: [(self.member_type, member, not linked)]})
+        force_redraw(context)
+        return {'FINISHED'}
+
+class LL_OT_MatrixBulk(bpy.types.Operator):
+    bl_idname = "ll_editor.matrix_bulk"
+    bl_label = "Link Row/Column"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    light: bpy.props.StringProperty(description="Row to edit; empty edits the member's column")
+    member: bpy.props.StringProperty()
+    member_type: bpy.props.EnumProperty(items=_member_type_items)
+    kind: bpy.props.EnumProperty(items=_kind_items)
+    link: bpy.props.BoolProperty(default=True)
+
+    @classmethod
+    def description(cls, context, properties):
+        verb = "Link" if properties.link else "Unlink"
+        if properties.light:
+            return f"{verb} {properties.light} and every object shown in the matrix"
+        return f"{verb} {properties.member} and every light shown in the matrix"
+
+    def execute(self, context):
+        scene = context.scene
+        matrix = get_link_matrix(scene)
+        columns = matrix_columns(scene, matrix)
+        if self.light:
+            light = bpy.data.objects.get(self.light)
+            if not light:
+                return {'CANCELLED'}
+            cells = [(t, m, self.link) for t, m in
+                     ((t, _member_id(t, n)) for t, n in columns) if m is not None]
+            changes = {light: cells}
+        else:
+            member = _member_id(self.member_type, self.member)
+            if not member:
+                return {'CANCELLED'}
+            changes = {light: [(self.member_type, member, self.link)] for light in matrix_lights(scene)}
+        count = apply_link_changes(self.kind, changes)
+        force_redraw(context)
+        self.report({'INFO'}, f"{'Linked' if self.link else 'Unlinked'} {count} pair(s)")
+        return {'FINISHED'}
+
+class LL_OT_AuditLinks(bpy.types.Operator):
+    bl_idname = "ll_editor.audit_links"
+    bl_label = "Clean Up Link Collections"
+    bl_description = (
+        "Find orphaned BB_ link collections, empty link sets, stale link properties and "
+        "duplicate memberships, then remove them"
+    )
+    bl_options = {'REGISTER', 'UNDO'}
+
+    max_rows = 12
+
+    def invoke(self, context, event):
+        self._audit = audit_link_collections()
+        if not any(self._audit.values()):
+            self.report({'INFO'}, "Link collections are clean")
+            return {'CANCELLED'}
+        return context.window_manager.invoke_props_dialog(self, width=420)
+
+    def draw(self, context):
+        audit = self._audit
+        rows = ([('TRASH', f"Orphan: {name}") for name in audit["orphans"]]
+                + [('COLLECTION_NEW', f"Empty {kind.lower()} set: {obj} ({coll})") for obj, kind, coll in audit["empty"]]
+                + [('PROPERTIES', f"Stale property: {obj}[\"{prop}\"]") for obj, prop in audit["stale_props"]]
+                + [('DUPLICATE', f"Duplicate: {obj} in {coll}") for coll, obj in audit["duplicates"]])
+        layout = self.layout
+        layout.label(text=f"{len(rows)} item(s) will be removed:")
+        box = layout.box()
+        for icon, text in rows[:self.max_rows]:
+            box.label(text=text, icon=icon)
+        if len(rows) > self.max_rows:
+            box.label(text=f"... and {len(rows) - self.max_rows} more")
+
+    def execute(self, context):
+        audit = getattr(self, "_audit", None) or audit_link_collections()
+        purge_link_collections(audit)
+        force_redraw(context)
+        self.report({'INFO'}, f"Removed {len(audit['orphans'])} orphan and {len(audit['empty'])} empty set(s), "
+                              f"{len(audit['stale_props'])} stale propert(ies), "
+                              f"{len(audit['duplicates'])} duplicate membership(s)")
+        return {'FINISHED'}
+
+class LL_OT_DedupeLinkSets(bpy.types.Operator):
+    bl_idname = "ll_editor.dedupe_link_sets"
+    bl_label = "Share Identical Link Sets"
+    bl_description = (
+        "Point lights whose light or shadow linking resolves to exactly the same objects "
+        "at one shared collection and remove the copies"
+    )
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        rewired, removed = dedupe_link_sets(context.scene)
+        force_redraw(context)
+        self.report({'INFO'}, f"Rewired {rewired} light(s), removed {removed} duplicate collection(s)")
+        return {'FINISHED'}
+
+# -------------------------------------------------------------------
+#   Auto-Linking Rules
+# -------------------------------------------------------------------
+# A rule links the lights matching a name glob (optionally only those in
+# one lightgroup) to objects matching a name glob, or to objects inside
+# collections matching one. Rules are compiled once per edit of the rule
+# list, and only objects added since the last evaluation are checked: the
+# depsgraph handler compares the object count and picks the new objects
+# out of depsgraph.updates, so ordinary edits cost a len() call.
+class LL_LinkRule(bpy.types.PropertyGroup):
+    enabled: bpy.props.BoolProperty(name="Enabled", default=True)
+    light_pattern: bpy.props.StringProperty(
+        name="Lights",
+        description="Glob matched against light names",
+        default="*"
+    )
+    lightgroup: bpy.props.StringProperty(
+        name="Lightgroup",
+        description="Only lights assigned to this lightgroup (leave empty for any)"
+    )
+    target_type: bpy.props.EnumProperty(
+        name="Targets",
+        items=[
+            ('COLLECTION', "Collection", "Objects inside collections matching the glob, nested ones included"),
+            ('OBJECT', "Object", "Objects whose name matches the glob"),
+        ],
+        default='COLLECTION'
+    )
+    target_pattern: bpy.props.StringProperty(
+        name="Target Name",
+        description="Glob matched against collection or object names"
+    )
+    kind: bpy.props.EnumProperty(name="Link", items=_kind_items, default='RECEIVER')
+
+_compiled_rules = {}   # {scene name: (rule signature, compiled rules)}
+
+def compile_link_rules(scene):
+    """Enabled rules as (light match, lightgroup, target type, target match, kind)."""
+    signature = tuple((r.enabled, r.light_pattern, r.lightgroup, r.target_type, r.target_pattern, r.kind)
+                      for r in scene.ll_link_rules)
+    cached = _compiled_rules.get(scene.name)
+    if cached and cached[0] == signature:
+        return cached[1]
+    rules = [(re.compile(fnmatch.translate(light_pattern or "*")).match, lightgroup, target_type,
+              re.compile(fnmatch.translate(target_pattern)).match, kind)
+             for enabled, light_pattern, lightgroup, target_type, target_pattern, kind in signature
+             if enabled and target_pattern]
+    _compiled_rules[scene.name] = (signature, rules)
+    return rules
+
+def apply_link_rules(scene, objects):
+    """Link ``objects`` to the lights of every rule they match; returns new links."""
+    rules = compile_link_rules(scene)
+    objects = [obj for obj in objects if obj.type not in {'LIGHT', 'CAMERA'}]
+    if not rules or not objects:
+        return 0
+    lights = [obj for obj in scene.objects if obj.type == 'LIGHT' and not obj.library]
+    linked = 0
+    for light_match, lightgroup, target_type, target_match, kind in rules:
+        rule_lights = [light for light in lights if light_match(light.name)
+                       and (not lightgroup or getattr(light, "lightgroup", "") == lightgroup)]
+        if not rule_lights:
+            continue
+        if target_type == 'OBJECT':
+            targets = [obj for obj in objects if target_match(obj.name)]
+        else:
+            colls = set()
+            for coll in bpy.data.collections:
+                if target_match(coll.name):
+                    colls.add(coll.name)
+                    colls.update(child.name for child in coll.children_recursive)
+            targets = [obj for obj in objects if any(c.name in colls for c in obj.users_collection)]
+        if not targets:
+            continue
+        cells = [('OBJECT', obj, True) for obj in targets]
+        for light in rule_lights:
+            linked += edit_link_set(light, kind, cells, scene, use_operators=False)
+    if linked:
+        _link_matrix.invalidate()
+    return linked
+
+class _AddedObjectWatcher:
+    """Tracks which objects already existed when the rules last ran."""
+    def __init__(self):
+        self.known = None
+        self.count = 0
+        self.pending = set()
+
+    def reset(self):
+        self.known = None
+        self.pending.clear()
+
+    def collect(self, depsgraph):
+        count = len(bpy.data.objects)
+        if self.known is None:
+            self.known = {obj.session_uid for obj in bpy.data.objects}
+            self.count = count
+            return
+        if count <= self.count:
+            self.count = count
+            return
+        added = {update.id.original for update in depsgraph.updates
+                 if isinstance(update.id, bpy.types.Object) and update.id.original.session_uid not in self.known}
+        if len(added) < count - self.count:
+            # Objects added outside the evaluated scene don't show up in
+            # the updates; fall back to a full comparison.
+            added = {obj for obj in bpy.data.objects if obj.session_uid not in self.known}
+        self.known.update(obj.session_uid for obj in added)
+        self.pending.update(obj.name for obj in added)
+        self.count = count
+
+_added_objects = _AddedObjectWatcher()
+
+def _apply_pending_link_rules():
+    """Timer: rules edit collections, which isn't safe inside the depsgraph handler."""
+    names, _added_objects.pending = _added_objects.pending, set()
+    scene = bpy.context.scene
+    objects = [obj for obj in map(bpy.data.objects.get, names) if obj is not None]
+    if scene is not None and objects:
+        if apply_link_rules(scene, objects):
+            force_redraw(bpy.context)
+    return None
+
+@persistent
+def LL_auto_link_added_objects(scene, depsgraph=None):
+    if depsgraph is None or not any(rule.enabled for rule in getattr(scene, "ll_link_rules", ())):
+        return
+    _added_objects.collect(depsgraph)
+    if _added_objects.pending and not bpy.app.timers.is_registered(_apply_pending_link_rules):
+        bpy.app.timers.register(_apply_pending_link_rules, first_interval=0.0)
+
+class LL_OT_AddLinkRule(bpy.types.Operator):
+    bl_idname = "ll_editor.add_link_rule"
+    bl_label = "Add Linking Rule"
+    bl_description = "Add a rule that links new objects to lights automatically"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scene = context.scene
+        scene.ll_link_rules.add()
+        scene.ll_link_rule_index = len(scene.ll_link_rules) - 1
+        return {'FINISHED'}
+
+class LL_OT_RemoveLinkRule(bpy.types.Operator):
+    bl_idname = "ll_editor.remove_link_rule"
+    bl_label = "Remove Linking Rule"
+    bl_description = "Remove the active linking rule (existing links stay)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scene = context.scene
+        if not 0 <= scene.ll_link_rule_index < len(scene.ll_link_rules):
+            return {'CANCELLED'}
+        scene.ll_link_rules.remove(scene.ll_link_rule_index)
+        scene.ll_link_rule_index = min(scene.ll_link_rule_index, len(scene.ll_link_rules) - 1)
+        return {'FINISHED'}
+
+class LL_OT_ApplyLinkRules(bpy.types.Operator):
+    bl_idname = "ll_editor.apply_link_rules"
+    bl_label = "Apply Rules to All"
+    bl_description = "Evaluate the linking rules against every object in the scene, not just new ones"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        linked = apply_link_rules(context.scene, context.scene.objects)
+        force_redraw(context)
+        self.report({'INFO'}, f"Rules added {linked} link(s)")
         return {'FINISHED'}
 
 # -------------------------------------------------------------------
@@ -594,6 +1340,98 @@ class LL_UL_CollectionList_UI(bpy.types.UIList):
         row.prop(item, "selected", text="")
         row.label(text=item.name)
 
+class LL_UL_LinkRules_UI(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "enabled", text="")
+        light_text = item.light_pattern + (f" [{item.lightgroup}]" if item.lightgroup else "")
+        row.label(text=f"{light_text} → {item.target_pattern or '?'}",
+                  icon='LIGHT' if item.kind == 'RECEIVER' else 'SHADING_SOLID')
+
+def draw_link_rules(layout, context):
+    scene = context.scene
+    box = layout.box()
+    row = box.row()
+    row.template_list("LL_UL_LinkRules_UI", "", scene, "ll_link_rules", scene, "ll_link_rule_index", rows=3)
+    col = row.column(align=True)
+    col.operator("ll_editor.add_link_rule", text="", icon='ADD')
+    col.operator("ll_editor.remove_link_rule", text="", icon='REMOVE')
+    if 0 <= scene.ll_link_rule_index < len(scene.ll_link_rules):
+        rule = scene.ll_link_rules[scene.ll_link_rule_index]
+        col = box.column(align=True)
+        col.prop(rule, "light_pattern")
+        col.prop_search(rule, "lightgroup", context.view_layer, "lightgroups", icon='LIGHT')
+        col.row(align=True).prop(rule, "target_type", expand=True)
+        col.prop(rule, "target_pattern")
+        col.row(align=True).prop(rule, "kind", expand=True)
+    box.operator("ll_editor.apply_link_rules", icon='FILE_REFRESH')
+
+# -------------------------------------------------------------------
+#   Link Matrix Drawing
+# -------------------------------------------------------------------
+MATRIX_COLUMNS = 8
+_cell_icons = {None: 'CHECKBOX_DEHLT', 'INCLUDE': 'CHECKBOX_HLT', 'EXCLUDE': 'REMOVE'}
+
+def matrix_lights(scene):
+    return sorted((obj for obj in scene.objects if obj.type == 'LIGHT'), key=lambda o: o.name)
+
+def matrix_columns(scene, matrix):
+    """Members already linked to some light, plus the ones ticked in the lists."""
+    columns = list(matrix.columns)
+    seen = set(columns)
+    for items, member_type, attr in ((scene.ll_mesh_items, 'OBJECT', "obj"),
+                                     (scene.ll_collection_items, 'COLLECTION', "coll")):
+        for item in items:
+            if item.selected and getattr(item, attr):
+                key = (member_type, getattr(item, attr).name)
+                if key not in seen:
+                    seen.add(key)
+                    columns.append(key)
+    return columns
+
+def draw_link_matrix(layout, context):
+    scene = context.scene
+    kind = scene.ll_matrix_kind
+    matrix = get_link_matrix(scene)
+    columns = matrix_columns(scene, matrix)
+    lights = matrix_lights(scene)
+
+    box = layout.box()
+    row = box.row(align=True)
+    row.prop(scene, "ll_matrix_kind", expand=True)
+    row.prop(scene, "ll_matrix_column_offset", text="Column")
+    if not columns or not lights:
+        box.label(text="Tick meshes or collections above to add columns", icon='INFO')
+        return
+
+    start = min(scene.ll_matrix_column_offset, max(0, len(columns) - 1))
+    page = columns[start:start + MATRIX_COLUMNS]
+    split_factor = 0.3
+
+    header = box.split(factor=split_factor, align=True)
+    header.label(text=f"{start + 1}-{start + len(page)} of {len(columns)}")
+    cells = header.row(align=True)
+    for member_type, name in page:
+        col = cells.column(align=True)
+        col.label(text=name[:6], icon='OBJECT_DATA' if member_type == 'OBJECT' else 'OUTLINER_COLLECTION')
+        for link, icon in ((True, 'ADD'), (False, 'X')):
+            op = col.operator("ll_editor.matrix_bulk", text="", icon=icon)
+            op.member, op.member_type, op.kind, op.link = name, member_type, kind, link
+
+    for light in lights:
+        row = box.split(factor=split_factor, align=True)
+        row.label(text=light.name, icon='LIGHT')
+        cells = row.row(align=True)
+        for member_type, name in page:
+            column = matrix.column_index.get((member_type, name))
+            state = matrix.cell(light.name, kind, column) if column is not None else None
+            op = cells.operator("ll_editor.matrix_toggle", text="", icon=_cell_icons[state],
+                                depress=state is not None)
+            op.light, op.member, op.member_type, op.kind = light.name, name, member_type, kind
+        for link, icon in ((True, 'ADD'), (False, 'X')):
+            op = cells.operator("ll_editor.matrix_bulk", text="", icon=icon)
+            op.light, op.kind, op.link = light.name, kind, link
+
 # -------------------------------------------------------------------
 #   Panel – UI Layout
 # -------------------------------------------------------------------
@@ -657,8 +1495,60 @@ class LL_PT_Panel(bpy.types.Panel):
         shadow_link_row.operator("ll_editor.shadow_link", text="Shadow Link")
         shadow_link_row.operator("ll_editor.shadow_unlink", text="Shadow Unlink")
 
+        clean_row = layout.row(align=True)
+        clean_row.operator("ll_editor.audit_links", icon='BRUSH_DATA')
+        clean_row.operator("ll_editor.dedupe_link_sets", icon='LINKED')
+
+        layout.separator()
+        layout.prop(scene, "ll_show_matrix", text="Link Matrix", icon='VIEW_ORTHO')
+        if scene.ll_show_matrix:
+            draw_link_matrix(layout, context)
+
+        layout.prop(scene, "ll_show_rules", text="Auto-Link Rules", icon='AUTO')
+        if scene.ll_show_rules:
+            draw_link_rules(layout, context)
+
+@persistent
+def LL_update_link_indexes(scene, depsgraph=None):
+    """Keep the link matrix and inverse index in step with collection edits.
+
+    Assigning a light's receiver/blocker collection only tags the light
+    object, so non-transform light updates count too. The matrix is simply
+    marked stale; the inverse index only rescans the lights involved.
+    """
+    if depsgraph is None:
+        _link_matrix.invalidate()
+        _link_index.invalidate()
+        return
+    collections = set()
+    lights = []
+    for update in depsgraph.updates:
+        id_ = update.id
+        if isinstance(id_, bpy.types.Collection):
+            collections.add(id_.original.name)
+        elif isinstance(id_, bpy.types.Object) and id_.type == 'LIGHT' and not update.is_updated_transform:
+            lights.append(id_.original)
+    if not collections and not lights:
+        return
+    _link_matrix.invalidate()
+    if not _link_index.built:
+        return
+    try:
+        if _link_index.stale_lights(scene):
+            # A renamed light would keep its old rows; rebuild on next use.
+            _link_index.invalidate()
+            return
+        _link_index.update_collections(scene, collections)
+        for light in lights:
+            _link_index.update_light(light)
+    except (ReferenceError, AttributeError):
+        _link_index.invalidate()
+
 @persistent
 def LL_clear_handler(dummy):
+    _link_matrix.invalidate()
+    _link_index.invalidate()
+    _added_objects.reset()
     update_light_items(bpy.context.scene, bpy.context)
     update_mesh_items(bpy.context.scene, bpy.context)
     update_collection_items(bpy.context.scene, bpy.context)
@@ -684,9 +1574,18 @@ classes = [
     LL_OT_Unlink,
     LL_OT_ShadowLink,
     LL_OT_ShadowUnlink,
+    LL_OT_MatrixToggle,
+    LL_OT_MatrixBulk,
+    LL_OT_AuditLinks,
+    LL_OT_DedupeLinkSets,
+    LL_LinkRule,
+    LL_OT_AddLinkRule,
+    LL_OT_RemoveLinkRule,
+    LL_OT_ApplyLinkRules,
     LL_UL_LightList_UI,
     LL_UL_MeshList_UI,
     LL_UL_CollectionList_UI,
+    LL_UL_LinkRules_UI,
 ]
 
 
@@ -710,8 +1609,35 @@ def register():
         min=1,
         max=50
     )
+    bpy.types.Scene.ll_show_matrix = bpy.props.BoolProperty(
+        name="Link Matrix",
+        description="Show every light against the objects it is linked to",
+        default=False
+    )
+    bpy.types.Scene.ll_matrix_kind = bpy.props.EnumProperty(
+        name="Matrix",
+        items=_kind_items,
+        default='RECEIVER'
+    )
+    bpy.types.Scene.ll_link_rules = bpy.props.CollectionProperty(type=LL_LinkRule)
+    bpy.types.Scene.ll_link_rule_index = bpy.props.IntProperty(default=-1)
+    bpy.types.Scene.ll_show_rules = bpy.props.BoolProperty(
+        name="Auto-Link Rules",
+        description="Show the rules that link newly added objects to lights",
+        default=False
+    )
+    bpy.types.Scene.ll_matrix_column_offset = bpy.props.IntProperty(
+        name="First Column",
+        description="First matrix column shown",
+        default=0,
+        min=0
+    )
 
     bpy.app.handlers.load_post.append(LL_clear_handler)
+    if LL_update_link_indexes not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(LL_update_link_indexes)
+    if LL_auto_link_added_objects not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(LL_auto_link_added_objects)
 
 
 def unregister():
@@ -720,7 +1646,8 @@ def unregister():
     for prop in (
         "ll_light_items", "ll_mesh_items", "ll_collection_items",
         "ll_light_index", "ll_mesh_index", "ll_collection_index",
-        "ll_list_rows",
+        "ll_list_rows", "ll_show_matrix", "ll_matrix_kind", "ll_matrix_column_offset",
+        "ll_link_rules", "ll_link_rule_index", "ll_show_rules",
     ):
         if hasattr(bpy.types.Scene, prop):
             try:
@@ -741,6 +1668,16 @@ def unregister():
 
     if LL_clear_handler in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(LL_clear_handler)
+    if LL_update_link_indexes in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(LL_update_link_indexes)
+    if LL_auto_link_added_objects in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(LL_auto_link_added_objects)
+    if bpy.app.timers.is_registered(_apply_pending_link_rules):
+        bpy.app.timers.unregister(_apply_pending_link_rules)
+    _added_objects.reset()
+    _compiled_rules.clear()
+    _link_matrix.invalidate()
+    _link_index.invalidate()
 
 
 
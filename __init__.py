@@ -15,11 +15,25 @@ import bpy
 from . import LightEditor
 from . import Linking
 from . import LightGroup
+from . import LightStates
+from . import LightAnalysis
+from . import LightAnimation
+from . import LightRender
+from . import LightRig
+from . import LightDiff
+from . import LightLibrary
 
 def register():
     LightEditor.register()
     Linking.register()
     LightGroup.register()
+    LightStates.register()
+    LightAnalysis.register()
+    LightAnimation.register()
+    LightRender.register()
+    LightRig.register()
+    LightDiff.register()
+    LightLibrary.register()
 
 def unregister():
     # Unregister in reverse order (best practice). Each module is unregistered
@@ -27,7 +41,7 @@ def unregister():
     # classes they left registered break the next enable with
     # "already registered as a subclass".
     import traceback
-    for module in (LightGroup, Linking, LightEditor):
+    for module in (LightLibrary, LightDiff, LightRig, LightRender, LightAnimation, LightAnalysis, LightStates, LightGroup, Linking, LightEditor):
         try:
             module.unregister()
         except Exception: